@@ -0,0 +1,9 @@
+from django.contrib.staticfiles import apps as staticfiles_apps
+
+
+class CoreStaticFilesConfig(staticfiles_apps.StaticFilesConfig):
+    # Used in INSTALLED_APPS in place of django.contrib.staticfiles, never for the core app itself.
+    default = False
+    # static/css/input.css is the Tailwind source compiled into output.css; its
+    # `@import "tailwindcss"` cannot be resolved by the manifest storage, and it is never served.
+    ignore_patterns = [*staticfiles_apps.StaticFilesConfig.ignore_patterns, 'css/input.css']
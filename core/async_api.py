@@ -0,0 +1,66 @@
+"""
+Plumbing for the async (ASGI) API views.
+DRF's APIView only runs synchronously, so these views are plain Django coroutines that
+reuse DRF's configured authenticators, parsers and serializers and answer with JSON.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def _drf_request(request):
+    return Request(
+        request,
+        parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+        authenticators=[authenticator() for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+
+
+def api_response(data=None, status=status.HTTP_200_OK):
+    """A JSON response rendered byte-for-byte like DRF's Response with JSONRenderer."""
+    if data is None:
+        return HttpResponse(status=status)
+    return HttpResponse(JSONRenderer().render(data), content_type='application/json', status=status)
+
+
+def error_response(request, exc):
+    """Renders an APIException the way DRF's default exception handler would."""
+    response = api_response({"detail": exc.detail}, status=exc.status_code)
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        # Like APIView: 401 only when the first authenticator can issue a challenge.
+        header = request.authenticators[0].authenticate_header(request) if request.authenticators else None
+        if header:
+            response['WWW-Authenticate'] = header
+        else:
+            response.status_code = status.HTTP_403_FORBIDDEN
+    return response
+
+
+def async_api_view(methods, authenticated=False):
+    """
+    Turns a coroutine into an API endpoint accepting `methods`.
+    The view receives a DRF Request whose user was resolved by the configured
+    authenticators in a worker thread, since they query the database synchronously.
+    """
+    def decorator(view):
+        @csrf_exempt
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            drf_request = _drf_request(request)
+            if request.method not in methods:
+                return error_response(drf_request, exceptions.MethodNotAllowed(request.method))
+            try:
+                user = await sync_to_async(lambda: drf_request.user)()
+                if authenticated and not user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+            except exceptions.APIException as exc:
+                return error_response(drf_request, exc)
+            return await view(drf_request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,373 @@
+"""
+Query-budget and latency benchmarks for every route in core/urls.py.
+
+`run_suite` seeds a fixed dataset, requests each case through the test client and
+records its status, SQL query count, median wall time and peak traced memory.
+Every request runs in a transaction that is rolled back, so writes (create, edit,
+delete, logout, ...) see the same data each time. `compare` checks the results
+against the committed baseline; the `bench_endpoints` command wraps both.
+"""
+import copy
+import hashlib
+import io
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from allauth.account.forms import default_token_generator
+from allauth.account.models import EmailAddress, EmailConfirmationHMAC
+from allauth.account.utils import user_pk_to_url_str
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.template import Context, Template
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.metrics import registry
+from users.authentication import local_user_cache
+
+User = get_user_model()
+
+BASELINE_PATH = settings.BASE_DIR / 'benchmarks' / 'endpoints.json'
+
+# Fixed dataset every run is measured against.
+DATASET = {'users': 20, 'listings': 2000, 'seed': 0}
+PASSWORD = 'SeedPassword123!'
+
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+
+# Routes with no meaningful local benchmark, with the reason.
+SKIPPED_ROUTES = {
+    'google_login': 'redirects to Google',
+    'google_callback': 'needs a Google authorization code',
+    'google_login_by_token': 'needs a Google ID token',
+}
+
+
+class Case:
+    """
+    One request to benchmark. `kwargs` and `data` may be callables taking the
+    fixture dict, for values only known once the dataset exists.
+    """
+
+    def __init__(self, route, method='get', auth=None, kwargs=None, data=None, json_body=False, name=None):
+        self.route = route
+        self.name = name or route
+        self.method = method
+        self.auth = auth  # None, 'session' (web), 'jwt' (API cookie) or 'metrics' (scrape token)
+        self.kwargs = kwargs
+        self.data = data
+        self.json_body = json_body
+
+    def request(self, client, fixture):
+        kwargs = self.kwargs(fixture) if callable(self.kwargs) else self.kwargs
+        data = self.data(fixture) if callable(self.data) else self.data
+        url = reverse(self.route, kwargs=kwargs)
+        if self.method == 'get':
+            return client.get(url, data)
+        if self.json_body:
+            return getattr(client, self.method)(url, json.dumps(data or {}), content_type='application/json')
+        return getattr(client, self.method)(url, data or {})
+
+
+def _own(fixture):
+    return {'pk': fixture['listing'].pk}
+
+
+def _listing_form(fixture):
+    return {'title': 'Benchmark edit', 'description': 'Edited', 'price': '12.50', 'version': fixture['listing'].version}
+
+
+CASES = [
+    # Web
+    Case('landing'),
+    Case('metrics', auth='metrics'),
+    Case('listings:index'),
+    Case('listings:index', name='listings:index?q', data={'q': 'camera'}),
+    Case('listings:index', name='listings:index?price', data={'min_price': '10', 'max_price': '100'}),
+    Case('listings:create', auth='session'),
+    Case('listings:create', name='listings:create POST', method='post', auth='session',
+         data={'title': 'Benchmark', 'description': 'New', 'price': '9.99'}),
+    Case('listings:edit', auth='session', kwargs=_own),
+    Case('listings:edit', name='listings:edit POST', method='post', auth='session', kwargs=_own, data=_listing_form),
+    Case('listings:delete', auth='session', kwargs=_own),
+    Case('listings:delete', name='listings:delete POST', method='post', auth='session', kwargs=_own),
+    Case('users:profile', auth='session'),
+    # Mobile API
+    Case('listings_api:api_listings_list'),
+    Case('listings_api:api_listings_list', name='listings_api:api_listings_list?price_asc',
+         data={'ordering': 'price_asc'}),
+    Case('listings_api:api_listings_price_facets'),
+    Case('listings_api:api_listings_export', auth='jwt', kwargs={'export_format': 'csv'}),
+    Case('listings_api:api_listings_search', data={'q': 'camera'}),
+    Case('listings_api:api_listings_detail', kwargs=_own),
+    Case('listings_api:api_listings_create', method='post', auth='jwt', json_body=True,
+         data={'title': 'Benchmark', 'description': 'New', 'price': '9.99'}),
+    Case('listings_api:api_listings_bulk_create', method='post', auth='jwt', json_body=True,
+         data=[{'title': f'Bulk {i}', 'description': 'New', 'price': '5.00'} for i in range(20)]),
+    Case('listings_api:api_listings_bulk_edit', method='put', auth='jwt', json_body=True,
+         data=lambda f: [{'id': pk, 'price': '6.00'} for pk in f['own_ids']]),
+    Case('listings_api:api_listings_bulk_delete', method='delete', auth='jwt', json_body=True,
+         data=lambda f: {'ids': f['own_ids']}),
+    Case('listings_api:api_listings_edit', method='put', auth='jwt', kwargs=_own, json_body=True,
+         data=lambda f: {'title': 'Benchmark edit', 'price': '12.50', 'version': f['listing'].version}),
+    Case('listings_api:api_listings_delete', method='delete', auth='jwt', kwargs=_own),
+    Case('users_api:api_profile', auth='jwt'),
+    # Async API mirror
+    Case('listings_async_api:api_listings_list'),
+    Case('listings_async_api:api_listings_detail', kwargs=_own),
+    Case('listings_async_api:api_listings_create', method='post', auth='jwt', json_body=True,
+         data={'title': 'Benchmark', 'description': 'New', 'price': '9.99'}),
+    Case('listings_async_api:api_listings_edit', method='put', auth='jwt', kwargs=_own, json_body=True,
+         data=lambda f: {'title': 'Benchmark edit', 'price': '12.50', 'version': f['listing'].version}),
+    Case('listings_async_api:api_listings_delete', method='delete', auth='jwt', kwargs=_own),
+    Case('users_async_api:api_profile', auth='jwt'),
+    Case('async_auth:rest_login', method='post', json_body=True,
+         data=lambda f: {'email': f['user'].email, 'password': PASSWORD}),
+    Case('async_auth:rest_password_change', method='post', auth='jwt', json_body=True,
+         data={'new_password1': 'Changed-Password-456', 'new_password2': 'Changed-Password-456'}),
+    # /auth/*
+    Case('rest_login', method='post', json_body=True, data=lambda f: {'email': f['user'].email, 'password': PASSWORD}),
+    Case('rest_logout', method='post', auth='jwt'),
+    Case('rest_password_change', method='post', auth='jwt', json_body=True,
+         data={'old_password': PASSWORD, 'new_password1': 'Changed-Password-456', 'new_password2': 'Changed-Password-456'}),
+    Case('rest_password_reset', method='post', json_body=True, data=lambda f: {'email': f['user'].email}),
+    Case('rest_register', method='post', json_body=True,
+         data={'email': 'bench-new@example.com', 'password1': 'Fresh-Password-789', 'password2': 'Fresh-Password-789'}),
+    Case('token_refresh', method='post', json_body=True, data=lambda f: {'refresh': f['refresh']}),
+    Case('token_verify', method='post', json_body=True, data=lambda f: {'token': f['access']}),
+    # allauth web pages
+    Case('account_login'),
+    Case('account_login', name='account_login POST', method='post',
+         data=lambda f: {'login': f['user'].email, 'password': PASSWORD}),
+    Case('account_signup'),
+    Case('account_logout', auth='session'),
+    Case('account_change_password', auth='session'),
+    Case('account_set_password', auth='session'),
+    Case('account_reset_password'),
+    Case('account_reset_password_done'),
+    Case('account_reset_password_from_key', kwargs=lambda f: f['reset_key']),
+    Case('account_reset_password_from_key_done'),
+    Case('account_email_verification_sent'),
+    Case('account_confirm_email', kwargs=lambda f: {'key': f['confirmation_key']}),
+]
+
+
+def build_fixture():
+    """Seeds the fixed dataset and returns the objects the cases refer to."""
+    call_command(
+        'seed_marketplace', users=DATASET['users'], listings=DATASET['listings'], seed=DATASET['seed'],
+        email_prefix='bench-user-', password=PASSWORD, stdout=io.StringIO(),
+    )
+    user = User.objects.get(email='bench-user-0@example.com')
+    listing = user.listings.filter(is_active=True).order_by('-created_at', '-id').first()
+    refresh = RefreshToken.for_user(user)
+    return {
+        'user': user,
+        'listing': listing,
+        'own_ids': list(user.listings.order_by('-id').values_list('id', flat=True)[:10]),
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+        'reset_key': {'uidb36': user_pk_to_url_str(user), 'key': default_token_generator.make_token(user)},
+        'confirmation_key': EmailConfirmationHMAC(EmailAddress.objects.get(user=user)).key,
+    }
+
+
+def _client(auth, fixture):
+    if auth == 'metrics':
+        return Client(headers={'Authorization': f'Bearer {settings.METRICS_TOKEN}'})
+    client = Client()
+    if auth == 'session':
+        client.force_login(fixture['user'])
+    elif auth == 'jwt':
+        client.cookies[settings.REST_AUTH['JWT_AUTH_COOKIE']] = fixture['access']
+    return client
+
+
+def _request(case, fixture, measure=nullcontext):
+    """Runs the case once inside a rolled-back transaction; only the request itself is measured."""
+    with transaction.atomic():
+        client = _client(case.auth, fixture)
+        with measure():
+            response = case.request(client, fixture)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        transaction.set_rollback(True)
+    return response
+
+
+@contextmanager
+def _timed(timings):
+    start = time.perf_counter()
+    yield
+    timings.append(time.perf_counter() - start)
+
+
+@contextmanager
+def _traced_peak(result):
+    tracemalloc.start()
+    try:
+        yield
+        result['peak_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def measure_case(case, fixture, runs=5, timing=True, memory=True):
+    """Warm-up request, then query count, median wall time over `runs` and peak memory."""
+    cache.clear()
+    local_user_cache.clear()
+    _request(case, fixture)
+
+    queries = CaptureQueriesContext(connection)
+    response = _request(case, fixture, lambda: queries)
+    result = {'status': response.status_code, 'queries': len(queries.captured_queries)}
+
+    if timing:
+        timings = []
+        for _ in range(runs):
+            _request(case, fixture, lambda: _timed(timings))
+        result['time_ms'] = round(statistics.median(timings) * 1000, 2)
+    if memory:
+        _request(case, fixture, lambda: _traced_peak(result))
+    return result
+
+
+def production_templates():
+    """settings.TEMPLATES with the cached loader that DEBUG=False selects, whatever DEBUG is here."""
+    templates = copy.deepcopy(settings.TEMPLATES)
+    for backend in templates:
+        loaders = backend.get('OPTIONS', {}).get('loaders')
+        if loaders and not (isinstance(loaders[0], (list, tuple)) and loaders[0][0] == CACHED_LOADER):
+            backend['OPTIONS']['loaders'] = [(CACHED_LOADER, loaders)]
+    return templates
+
+
+def run_suite(runs=5, timing=True, memory=True, only=None):
+    """
+    Seeds the dataset, measures every case and rolls everything back. Returns {case name: result}.
+    Runs with DEBUG off and the cached template loader whatever the environment sets: DEBUG keeps
+    every SQL statement in memory and re-reads templates per render, which would move the numbers.
+    """
+    results = {}
+    # /metrics sums every snapshot in its directory, so it gets a private, empty one. The
+    # periodic snapshot write is switched off: it would land in whichever request is traced
+    # when the interval runs out (/metrics still writes its own before reading). Pages render
+    # whether or not collectstatic has run.
+    with tempfile.TemporaryDirectory() as metrics_dir, \
+            override_settings(DEBUG=False, TEMPLATES=production_templates(), STATIC_MANIFEST_OPTIONAL=True), \
+            override_settings(METRICS_DIR=metrics_dir, METRICS_TOKEN='benchmark', METRICS_FLUSH_INTERVAL=float('inf')), \
+            transaction.atomic():
+        registry.clear()
+        fixture = build_fixture()
+        for case in CASES:
+            if only and case.name not in only:
+                continue
+            results[case.name] = measure_case(case, fixture, runs=runs, timing=timing, memory=memory)
+        transaction.set_rollback(True)
+    return results
+
+
+def uncovered_routes():
+    """Named routes in core/urls.py (outside the admin) with neither a case nor a skip reason."""
+    covered = {case.route for case in CASES} | set(SKIPPED_ROUTES)
+    names = []
+
+    def walk(patterns, namespace):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                if pattern.namespace == 'admin':
+                    continue
+                inner = ':'.join(filter(None, [namespace, pattern.namespace]))
+                walk(pattern.url_patterns, inner)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                names.append(f'{namespace}:{pattern.name}' if namespace else pattern.name)
+
+    walk(get_resolver().url_patterns, '')
+    return sorted(set(names) - covered)
+
+
+_CALIBRATION_ITEMS = [
+    {'id': i, 'title': f'Listing {i}', 'price': f'{i}.00', 'tags': ['camera', 'lens', 'tripod']}
+    for i in range(2000)
+]
+_CALIBRATION_TEMPLATE = '{% for item in items %}{{ item.title|upper }} {{ item.price }} {{ item.tags|join:"," }}{% endfor %}'
+
+
+def calibrate(runs=15):
+    """
+    Fastest ms of a fixed CPU-bound workload shaped like the suite: a JSON round trip, a template
+    render and a PBKDF2 hash. compare() scales the baseline's times by the ratio of this to the
+    baseline's own figure, so a faster or slower machine does not pass or fail the suite by itself.
+    The minimum, not the median, because it is the run least disturbed by other processes.
+    """
+    template = Template(_CALIBRATION_TEMPLATE)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        template.render(Context({'items': json.loads(json.dumps(_CALIBRATION_ITEMS))}))
+        hashlib.pbkdf2_hmac('sha256', b'calibration', b'benchmark', 20_000)
+        timings.append(time.perf_counter() - start)
+    return round(min(timings) * 1000, 2)
+
+
+def machine_speed(baseline, calibration_ms):
+    """How much slower (>1) or faster (<1) this machine is than the one that recorded the baseline."""
+    if not calibration_ms or not baseline.get('calibration_ms'):
+        return 1.0
+    return calibration_ms / baseline['calibration_ms']
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_baseline(results, path=BASELINE_PATH, calibration_ms=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {'dataset': DATASET, 'database': connection.vendor, 'calibration_ms': calibration_ms, 'cases': results}
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(results, baseline, query_tolerance=0, time_tolerance=0.5, time_slack_ms=2.0,
+            memory_tolerance=0.25, memory_slack_kb=64.0, calibration_ms=None):
+    """
+    Returns a list of human-readable regressions. Query counts may not grow beyond
+    query_tolerance; time and memory may grow by a relative tolerance plus a small
+    absolute slack, so sub-millisecond noise does not fail the suite. Baseline times
+    are first scaled by machine_speed() when calibration_ms is given.
+    """
+    speed = machine_speed(baseline, calibration_ms)
+    if baseline.get('dataset') != DATASET:
+        return [f"Baseline was recorded for dataset {baseline.get('dataset')}, not {DATASET}; update it."]
+    if baseline.get('database') != connection.vendor:
+        # Query counts differ between backends (e.g. the SQLite FTS statements).
+        return [f"Baseline was recorded on {baseline.get('database')}, not {connection.vendor}."]
+    failures = []
+    for name, result in results.items():
+        expected = baseline['cases'].get(name)
+        if expected is None:
+            failures.append(f"{name}: no baseline entry; run bench_endpoints --update-baseline")
+            continue
+        if result['status'] != expected['status']:
+            failures.append(f"{name}: status {result['status']} (baseline {expected['status']})")
+        if result['queries'] > expected['queries'] + query_tolerance:
+            failures.append(f"{name}: {result['queries']} queries (baseline {expected['queries']})")
+        expected_ms = expected['time_ms'] * speed
+        if 'time_ms' in result and result['time_ms'] > expected_ms * (1 + time_tolerance) + time_slack_ms:
+            failures.append(f"{name}: {result['time_ms']:.1f} ms (baseline {expected_ms:.1f} ms on this machine)")
+        if 'peak_kb' in result and (
+            result['peak_kb'] > expected['peak_kb'] * (1 + memory_tolerance) + memory_slack_kb
+        ):
+            failures.append(f"{name}: {result['peak_kb']:.0f} KiB peak (baseline {expected['peak_kb']:.0f} KiB)")
+    return failures
@@ -6,4 +6,5 @@ def global_settings(request):
     """
     return {
         'APP_NAME': getattr(settings, 'APP_NAME', 'BaseSPA'),
+        'FRAGMENT_CACHE_TIMEOUT': settings.FRAGMENT_CACHE_TIMEOUT,
     }
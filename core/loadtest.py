@@ -0,0 +1,140 @@
+"""
+Multi-process HTTP load generator behind the loadtest_* management commands.
+
+Each process runs `concurrency` threads over keep-alive connections, so the client
+side is not limited to one GIL. Processes share one wall-clock measuring window
+and send their latencies back to the parent, which merges them per target label.
+"""
+import http.client
+import multiprocessing
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class Target:
+    """A GET request to drive, reported under `label` (several targets may share one)."""
+
+    def __init__(self, label, url):
+        parts = urlsplit(url)
+        if parts.scheme != "http" or not parts.hostname:
+            raise ValueError(f"Only absolute http:// URLs are supported: {url}")
+        self.label = label
+        self.address = (parts.hostname, parts.port or 80)
+        self.path = parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def _thread_worker(targets, headers, offset, measure_from, stop_at, results, lock):
+    connections = {}
+    latencies, errors = {}, {}
+    i = offset
+    while time.time() < stop_at:
+        target = targets[i % len(targets)]
+        i += 1
+        started_at = time.time()
+        start = time.perf_counter()
+        conn = connections.get(target.address)
+        if conn is None:
+            conn = connections[target.address] = http.client.HTTPConnection(*target.address, timeout=30)
+        try:
+            conn.request("GET", target.path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            connections.pop(target.address)
+            ok = False
+        if started_at >= measure_from:
+            if ok:
+                latencies.setdefault(target.label, []).append(time.perf_counter() - start)
+            else:
+                errors[target.label] = errors.get(target.label, 0) + 1
+    for conn in connections.values():
+        conn.close()
+    with lock:
+        for label, values in latencies.items():
+            results[0].setdefault(label, []).extend(values)
+        for label, count in errors.items():
+            results[1][label] = results[1].get(label, 0) + count
+
+
+def _process_worker(args):
+    targets, headers, concurrency, process_index, measure_from, stop_at = args
+    results, lock = ({}, {}), threading.Lock()
+    threads = [
+        threading.Thread(
+            target=_thread_worker,
+            args=(targets, headers, process_index * concurrency + n, measure_from, stop_at, results, lock),
+        )
+        for n in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def run(targets, processes=1, concurrency=8, duration=15.0, warmup=2.0, headers=None):
+    """
+    Drives the targets round-robin for warmup + duration seconds and returns
+    ({label: [latency seconds]}, {label: error count}) for the measured window.
+    """
+    # Start once every process is up, so slow process start-up does not eat into the window.
+    measure_from = time.time() + 1.0 + warmup
+    stop_at = measure_from + duration
+    jobs = [(targets, headers or {}, concurrency, n, measure_from, stop_at) for n in range(processes)]
+    if processes == 1:
+        outcomes = [_process_worker(jobs[0])]
+    else:
+        with multiprocessing.get_context("spawn").Pool(processes) as pool:
+            outcomes = pool.map(_process_worker, jobs)
+
+    latencies, errors = {}, {}
+    for process_latencies, process_errors in outcomes:
+        for label, values in process_latencies.items():
+            latencies.setdefault(label, []).extend(values)
+        for label, count in process_errors.items():
+            errors[label] = errors.get(label, 0) + count
+    return latencies, errors
+
+
+def summarize(latencies, duration):
+    """Throughput and latency percentiles (milliseconds) for one list of latencies."""
+    latencies = sorted(latencies)
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    else:
+        cuts = latencies * 99
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / duration,
+        "p50": cuts[49] * 1000,
+        "p95": cuts[94] * 1000,
+        "p99": cuts[98] * 1000,
+        "max": latencies[-1] * 1000,
+    }
+
+
+def write_report(stdout, style, latencies, errors, duration):
+    """Prints one row per label plus a total row."""
+    rows = [(label, latencies.get(label, [])) for label in sorted(set(latencies) | set(errors))]
+    width = max(len(label) for label, _ in rows + [("endpoint", None)])
+    stdout.write(
+        f"{'endpoint':<{width}} {'requests':>9} {'errors':>7} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    rows.append(("total", [value for values in latencies.values() for value in values]))
+    for label, values in rows:
+        failed = sum(errors.values()) if label == "total" else errors.get(label, 0)
+        if not values:
+            stdout.write(f"{label:<{width}} {0:>9} {failed:>7}")
+            continue
+        s = summarize(values, duration)
+        line = (
+            f"{label:<{width}} {s['requests']:>9} {failed:>7} {s['rps']:>9.1f} "
+            f"{s['p50']:>8.1f} {s['p95']:>8.1f} {s['p99']:>8.1f}"
+        )
+        stdout.write(style.SUCCESS(line) if label == "total" else line)
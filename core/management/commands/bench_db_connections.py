@@ -0,0 +1,66 @@
+import copy
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.utils import load_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures what one request pays for its database connection: connect, SELECT 1, close, "
+        "once with a fresh connection per request (no pool) and once borrowing from the psycopg "
+        "connection pool. Needs DATABASE_URL to point at PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Simulated requests per scenario.")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        settings_dict = connections[options["database"]].settings_dict
+        if settings_dict["ENGINE"] != "django.db.backends.postgresql":
+            raise CommandError("Connection pooling needs PostgreSQL; point DATABASE_URL at a PostgreSQL server.")
+        pool_options = settings_dict["OPTIONS"].get("pool") or {"min_size": 2, "max_size": 4}
+
+        self.stdout.write(f"{options['requests']} requests per scenario, pool options: {pool_options}")
+        self.stdout.write(f"{'scenario':<16} {'p50 ms':>8} {'p95 ms':>8} {'req/s':>8}")
+        for label, pool in (("no pool", None), ("psycopg pool", pool_options)):
+            self.run_scenario(label, settings_dict, pool, options["requests"])
+
+    def run_scenario(self, label, settings_dict, pool, requests):
+        scenario_settings = copy.deepcopy(settings_dict)
+        scenario_settings["OPTIONS"].pop("pool", None)
+        if pool:
+            scenario_settings["OPTIONS"]["pool"] = pool
+        # A private alias, so the pool is separate from the one the default connection uses.
+        alias = f"bench-{'pool' if pool else 'direct'}"
+        conn = load_backend(scenario_settings["ENGINE"]).DatabaseWrapper(scenario_settings, alias)
+        try:
+            # Warm-up: opens the pool's min_size connections outside the timings.
+            self.simulate_request(conn)
+            timings = []
+            started = time.perf_counter()
+            for _ in range(requests):
+                start = time.perf_counter()
+                self.simulate_request(conn)
+                timings.append(time.perf_counter() - start)
+            elapsed = time.perf_counter() - started
+        finally:
+            conn.close()
+            if pool:
+                conn.close_pool()
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, round(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{label:<16} {statistics.median(timings) * 1000:>8.2f} {p95 * 1000:>8.2f} {requests / elapsed:>8.0f}"
+        )
+
+    def simulate_request(self, conn):
+        conn.ensure_connection()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        # What request_finished does: with a pool this hands the connection back instead.
+        conn.close()
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks every route in core/urls.py against a fixed seeded dataset in a throwaway "
+        "test database: status, SQL queries, median wall time and peak traced memory. Fails when "
+        "a result regresses past the tolerances relative to the committed baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Timed requests per case (median is kept).")
+        parser.add_argument("--case", action="append", help="Only run this case (repeatable).")
+        parser.add_argument("--baseline", type=Path, default=benchmarks.BASELINE_PATH)
+        parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline.")
+        parser.add_argument("--query-tolerance", type=int, default=0, help="Extra queries allowed per case.")
+        parser.add_argument("--time-tolerance", type=float, default=0.5, help="Allowed relative wall-time growth.")
+        parser.add_argument("--memory-tolerance", type=float, default=0.25, help="Allowed relative memory growth.")
+
+    def handle(self, *args, **options):
+        uncovered = benchmarks.uncovered_routes()
+        if uncovered:
+            raise CommandError(
+                "Routes without a benchmark case (add one to core.benchmarks.CASES or SKIPPED_ROUTES): "
+                + ", ".join(uncovered)
+            )
+
+        calibration_ms = benchmarks.calibrate()
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = benchmarks.run_suite(runs=options["runs"], only=options["case"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        baseline = None
+        if options["baseline"].exists():
+            baseline = benchmarks.load_baseline(options["baseline"])
+        self.report(results, baseline)
+        if baseline is not None:
+            speed = benchmarks.machine_speed(baseline, calibration_ms)
+            self.stdout.write(f"Calibration {calibration_ms:.1f} ms: baseline times are scaled by {speed:.2f}.")
+
+        if options["update_baseline"]:
+            if options["case"]:
+                raise CommandError("--update-baseline needs a full run; drop --case.")
+            benchmarks.write_baseline(results, options["baseline"], calibration_ms)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+        if baseline is None:
+            raise CommandError(f"No baseline at {options['baseline']}; run with --update-baseline first.")
+
+        failures = benchmarks.compare(
+            results, baseline,
+            query_tolerance=options["query_tolerance"],
+            time_tolerance=options["time_tolerance"],
+            memory_tolerance=options["memory_tolerance"],
+            calibration_ms=calibration_ms,
+        )
+        if failures:
+            raise CommandError("Benchmark regressions:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} cases within budget."))
+
+    def report(self, results, baseline):
+        expected = (baseline or {}).get("cases", {})
+        width = max(len(name) for name in results)
+        self.stdout.write(f"{'case':<{width}} {'status':>6} {'queries':>12} {'ms':>16} {'peak KiB':>18}")
+        for name, result in results.items():
+            before = expected.get(name, {})
+            queries = f"{result['queries']}" + (f" ({before['queries']})" if before else "")
+            ms = f"{result['time_ms']:.1f}" + (f" ({before['time_ms']:.1f})" if before else "")
+            peak = f"{result['peak_kb']:.0f}" + (f" ({before['peak_kb']:.0f})" if before else "")
+            self.stdout.write(f"{name:<{width}} {result['status']:>6} {queries:>12} {ms:>16} {peak:>18}")
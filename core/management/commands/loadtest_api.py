@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests running API endpoints over keep-alive HTTP connections and reports "
+        "requests/sec and latency percentiles. Run it against the WSGI and the ASGI "
+        "deployments (e.g. gunicorn core.wsgi vs uvicorn core.asgi) to compare them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+", help="Endpoints to request, round-robin.")
+        parser.add_argument("--concurrency", type=int, default=32, help="Simultaneous connections per process.")
+        parser.add_argument("--processes", type=int, default=1, help="Client processes.")
+        parser.add_argument("--duration", type=float, default=15.0, help="Measured seconds.")
+        parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before measuring.")
+        parser.add_argument(
+            "--header", action="append", default=[], metavar="NAME: VALUE",
+            help="Extra request header, e.g. 'Cookie: jwt-auth=...'. Repeatable.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            targets = [loadtest.Target(url, url) for url in options["urls"]]
+        except ValueError as e:
+            raise CommandError(str(e))
+        headers = dict(header.split(":", 1) for header in options["header"])
+        headers = {name.strip(): value.strip() for name, value in headers.items()}
+
+        latencies, errors = loadtest.run(
+            targets, processes=options["processes"], concurrency=options["concurrency"],
+            duration=options["duration"], warmup=options["warmup"], headers=headers,
+        )
+        if not latencies:
+            raise CommandError("No requests completed during the measured window.")
+        self.stdout.write(
+            f"{options['processes']} x {options['concurrency']} connections, {options['duration']:.0f}s measured"
+        )
+        loadtest.write_report(self.stdout, self.style, latencies, errors, options["duration"])
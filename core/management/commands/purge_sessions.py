@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.sessions import clear_expired_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired sessions in small batches, oldest first, so the session table does not "
+        "bloat and no single DELETE holds locks for long. Run it from cron; --max-seconds bounds "
+        "each run and the next run picks up where it stopped. Works with any database-backed engine."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Rows per DELETE (default SESSION_CLEANUP_BATCH_SIZE).")
+        parser.add_argument("--max-seconds", type=float, default=60.0, help="Stop after this long (0 = no limit).")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        deleted = clear_expired_sessions(
+            batch_size=options["batch_size"], max_seconds=options["max_seconds"], pause=options["pause"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired sessions."))
@@ -1,38 +1,219 @@
-import time
+import argparse
+import ctypes
+import ctypes.util
 import os
-import glob
+import re
+import select
+import struct
+import time
+from datetime import datetime
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 
+# Django's file-based EmailBackend writes this line after every message.
+SEPARATOR = "-" * 79 + "\n"
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_CLOEXEC = os.O_CLOEXEC
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Blocks in the kernel until files in the directory change; no polling while idle."""
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CREATE | IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self.directory = directory
+
+    def wait(self, timeout=None):
+        """Returns the names of files that changed, or an empty set on timeout."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        names, offset = set(), 0
+        while offset < len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            names.add(os.fsdecode(data[offset:offset + length].rstrip(b"\0")))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class StatWatcher:
+    """
+    Fallback for platforms without inotify. Rescans the directory only when its
+    mtime changes (a file was added) and otherwise just stats the files being followed.
+    """
+
+    def __init__(self, directory, interval=1.0):
+        self.directory = directory
+        self.interval = interval
+        self.dir_mtime = os.stat(directory).st_mtime_ns
+        self.sizes = {}
+
+    def track(self, name, size):
+        self.sizes[name] = size
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            dir_mtime = os.stat(self.directory).st_mtime_ns
+            if dir_mtime != self.dir_mtime:
+                self.dir_mtime = dir_mtime
+                with os.scandir(self.directory) as entries:
+                    changed.update(entry.name for entry in entries if entry.name not in self.sizes)
+            for name, size in self.sizes.items():
+                try:
+                    if os.stat(os.path.join(self.directory, name)).st_size != size:
+                        changed.add(name)
+                except FileNotFoundError:
+                    pass
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class MailFile:
+    """Reads a mail log incrementally and yields each message once its separator is written."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.pending = ""
+
+    def read_messages(self):
+        with open(self.path, encoding="utf-8", errors="replace", newline="") as f:
+            f.seek(self.offset)
+            chunk = f.read()
+            self.offset = f.tell()
+        self.pending += chunk
+        *messages, self.pending = self.pending.split(SEPARATOR)
+        return messages
+
+
+def parse_since(value):
+    """Accepts a relative age like 30s, 15m, 2h, 1d or an ISO 8601 timestamp."""
+    match = re.fullmatch(r"(\d+)([smhd])", value)
+    if match:
+        amount, unit = int(match[1]), match[2]
+        seconds = amount * {"s": 1, "m": 60, "h": 3600, "d": 86400}[unit]
+        return time.time() - seconds
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise CommandError(f"Invalid --since value: {value!r} (use e.g. 15m, 2h or 2026-01-31T09:00).")
+
 
 class Command(BaseCommand):
-    help = "Polls dev_emails directory every 10 seconds and prints new emails to the terminal."
+    help = (
+        "Prints e-mails written by the file-based EmailBackend as soon as they land in "
+        "EMAIL_FILE_PATH (inotify on Linux, stat polling elsewhere)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", help="Directory to watch (defaults to EMAIL_FILE_PATH).")
+        parser.add_argument("--since", help="Also print e-mails already written since 15m, 2h, an ISO time, ...")
+        parser.add_argument(
+            "--follow", action=argparse.BooleanOptionalAction, default=True,
+            help="Keep watching for new e-mails (default). Use --no-follow to print --since output and exit.",
+        )
+        parser.add_argument("--grep", help="Only print e-mails matching this regular expression (case-insensitive).")
+        parser.add_argument("--poll", action="store_true", help="Use stat polling even where inotify exists.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Polling interval for the stat fallback.")
 
     def handle(self, *args, **options):
-        email_dir = getattr(settings, "EMAIL_FILE_PATH", None)
+        email_dir = options["path"] or getattr(settings, "EMAIL_FILE_PATH", None)
         if not email_dir:
             self.stderr.write("EMAIL_FILE_PATH is not configured in settings.")
             return
-
         email_dir = str(email_dir)
-        self.stdout.write(self.style.SUCCESS(f"Watching for new emails in: {email_dir}"))
-        self.stdout.write("Press Ctrl+C to stop.\n")
+        if not os.path.isdir(email_dir):
+            raise CommandError(f"{email_dir} is not a directory.")
+        self.pattern = re.compile(options["grep"], re.IGNORECASE) if options["grep"] else None
+
+        # Files already present are skipped (from their current end) unless --since asks for them.
+        since = parse_since(options["since"]) if options["since"] else None
+        self.files = {}
+        with os.scandir(email_dir) as entries:
+            existing = sorted((entry for entry in entries if entry.name.endswith(".log")), key=lambda e: e.name)
+        for entry in existing:
+            mail_file = self.files[entry.name] = MailFile(entry.path)
+            if since is not None and entry.stat().st_mtime >= since:
+                self.print_messages(entry.name, mail_file.read_messages())
+            else:
+                mail_file.offset = entry.stat().st_size
 
-        seen = set(glob.glob(os.path.join(email_dir, "*.log")))
+        if not options["follow"]:
+            return
 
+        watcher = self.make_watcher(email_dir, options)
+        self.stdout.write(self.style.SUCCESS(f"Watching for new emails in: {email_dir} ({type(watcher).__name__})"))
+        self.stdout.write("Press Ctrl+C to stop.\n")
         try:
             while True:
-                time.sleep(10)
-                current = set(glob.glob(os.path.join(email_dir, "*.log")))
-                new_files = current - seen
-                for filepath in sorted(new_files):
-                    self.stdout.write("\n" + "=" * 72)
-                    self.stdout.write(self.style.WARNING(f"📧  New email: {os.path.basename(filepath)}"))
-                    self.stdout.write("=" * 72)
-                    with open(filepath, encoding="utf-8") as f:
-                        self.stdout.write(f.read())
-                    self.stdout.write("=" * 72 + "\n")
-                seen = current
+                for name in sorted(watcher.wait()):
+                    self.read_file(email_dir, name, watcher)
         except KeyboardInterrupt:
             self.stdout.write("\nStopped watching for emails.")
+        finally:
+            watcher.close()
+
+    def make_watcher(self, email_dir, options):
+        watcher = None
+        if not options["poll"]:
+            try:
+                watcher = InotifyWatcher(email_dir)
+            except OSError:
+                pass
+        if watcher is None:
+            watcher = StatWatcher(email_dir, interval=options["interval"])
+            for name, mail_file in self.files.items():
+                watcher.track(name, mail_file.offset)
+        return watcher
+
+    def read_file(self, email_dir, name, watcher):
+        if not name.endswith(".log"):
+            return
+        mail_file = self.files.setdefault(name, MailFile(os.path.join(email_dir, name)))
+        try:
+            messages = mail_file.read_messages()
+        except FileNotFoundError:
+            self.files.pop(name)
+            return
+        if isinstance(watcher, StatWatcher):
+            watcher.track(name, mail_file.offset)
+        self.print_messages(name, messages)
+
+    def print_messages(self, name, messages):
+        for message in messages:
+            if self.pattern and not self.pattern.search(message):
+                continue
+            self.stdout.write("\n" + "=" * 72)
+            self.stdout.write(self.style.WARNING(f"📧  New email: {name}"))
+            self.stdout.write("=" * 72)
+            self.stdout.write(message)
+            self.stdout.write("=" * 72 + "\n")
@@ -0,0 +1,362 @@
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, and os.kill(pid, 0) is no liveness probe there.
+    fcntl = None
+
+# Workers share their totals through METRICS_DIR only where the directory can be locked and
+# other workers probed; elsewhere /metrics reports the process that serves it.
+FILE_AGGREGATION = fcntl is not None and os.name == 'posix'
+
+# name -> (help text, bucket upper bounds). Every histogram is labelled by URL name.
+HISTOGRAMS = {
+    'http_request_duration_seconds': (
+        'Time spent producing the response.',
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    ),
+    'http_request_db_queries': (
+        'SQL statements executed per request.',
+        (0, 1, 2, 3, 5, 10, 20, 50, 100),
+    ),
+    'http_request_db_duration_seconds': (
+        'Time spent in SQL statements per request.',
+        (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+    ),
+    'http_response_size_bytes': (
+        'Response body size (streaming responses are not measured).',
+        (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+    ),
+}
+
+# name -> (help text, label names).
+COUNTERS = {
+    'http_requests_total': ('Requests by URL name, method and status code.', ('view', 'method', 'status')),
+    'db_pool_requests_total': ('Connections borrowed from the database pool.', ('alias',)),
+    'db_pool_wait_seconds_total': ('Time spent waiting for a pooled connection.', ('alias',)),
+    'db_pool_timeouts_total': ('Requests that timed out waiting for a pooled connection.', ('alias',)),
+    'db_pool_connections_opened_total': ('Database connections opened by the pool.', ('alias',)),
+}
+
+# psycopg_pool pop_stats() key -> (counter, scale).
+POOL_COUNTERS = {
+    'requests_num': ('db_pool_requests_total', 1),
+    'requests_wait_ms': ('db_pool_wait_seconds_total', 0.001),
+    'requests_errors': ('db_pool_timeouts_total', 1),
+    'connections_num': ('db_pool_connections_opened_total', 1),
+}
+
+# Point-in-time values; only snapshots of live processes are summed.
+GAUGES = {
+    'password_hashing_queued': 'Password hashes waiting for a hashing thread.',
+    'password_hashing_running': 'Password hashes being computed.',
+    'db_pool_size': 'Connections held by the database pools, busy or idle.',
+    'db_pool_available': 'Idle connections ready in the database pools.',
+    'db_pool_in_use': 'Connections lent out by the database pools.',
+    'db_pool_max': 'Configured maximum size of the database pools.',
+    'db_pool_requests_waiting': 'Requests queued for a pooled connection.',
+}
+
+
+# Counters and histograms of exited workers, folded together so the directory does not grow.
+ARCHIVE_NAME = 'metrics-archive.json'
+
+
+class MetricsRegistry:
+    """
+    Aggregates per-request numbers in memory and periodically writes them to
+    METRICS_DIR/metrics-<pid>-<start>.json. Readers merge every process's file, so the
+    totals are the same whichever worker serves /metrics. The start time in the name
+    keeps a worker that reuses a dead worker's pid from overwriting its totals.
+    """
+
+    def __init__(self, directory=None):
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._reset()
+
+    def clear(self):
+        """Drops everything this process recorded (used by tests)."""
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self.started = time.time_ns()
+        self._archived = False
+        self._histograms = {}
+        self._counters = {}
+        self._flushed_at = 0.0
+
+    @property
+    def directory(self):
+        return str(self._directory or settings.METRICS_DIR)
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f'metrics-{self.pid}-{self.started}.json')
+
+    def _check_fork(self):
+        # A forked worker must not re-report what its parent had already recorded.
+        if os.getpid() != self.pid:
+            self._reset()
+
+    def observe(self, name, labels, value):
+        bounds = HISTOGRAMS[name][1]
+        key = (name, labels)
+        with self._lock:
+            self._check_fork()
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = {'buckets': [0] * len(bounds), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(bounds):
+                if value <= bound:
+                    entry['buckets'][i] += 1
+                    break
+            entry['sum'] += value
+            entry['count'] += 1
+
+    def inc(self, name, labels, amount=1):
+        key = (name, labels)
+        with self._lock:
+            self._check_fork()
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def snapshot(self):
+        pool_gauges = self._record_pool_stats()
+        with self._lock:
+            self._check_fork()
+            return {
+                'pid': self.pid,
+                'histograms': [
+                    [name, list(labels), dict(entry, buckets=list(entry['buckets']))]
+                    for (name, labels), entry in self._histograms.items()
+                ],
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'gauges': {**_current_gauges(), **pool_gauges},
+            }
+
+    def _record_pool_stats(self):
+        """Adds the pools' counters since the last snapshot and returns their current gauges."""
+        gauges = {}
+        for alias, stats in _pool_stats():
+            for key, (name, scale) in POOL_COUNTERS.items():
+                if stats.get(key):
+                    self.inc(name, (alias,), stats[key] * scale)
+            size, available = stats.get('pool_size', 0), stats.get('pool_available', 0)
+            for name, value in (
+                ('db_pool_size', size), ('db_pool_available', available), ('db_pool_in_use', size - available),
+                ('db_pool_max', stats.get('pool_max', 0)), ('db_pool_requests_waiting', stats.get('requests_waiting', 0)),
+            ):
+                gauges[name] = gauges.get(name, 0) + value
+        return gauges
+
+    def flush(self, force=False):
+        """Writes this process's snapshot, at most once per METRICS_FLUSH_INTERVAL unless forced."""
+        if not FILE_AGGREGATION:
+            return
+        now = time.monotonic()
+        if not force and now - self._flushed_at < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self._flushed_at = now
+        snapshot = self.snapshot()
+        os.makedirs(self.directory, exist_ok=True)
+        if not self._archived:
+            # Once per worker, on its first write: fold in what exited workers left behind.
+            self._archived = True
+            archive_exited(self.directory, self.path)
+        _write_json(self.directory, self.path, snapshot)
+
+    def flush_at_exit(self):
+        if os.getpid() == self.pid and (self._counters or self._histograms):
+            self.flush(force=True)
+
+    def collect(self):
+        """Flushes this process, then merges every process's snapshot in the directory."""
+        histograms, counters, gauges = {}, {}, {}
+        if not FILE_AGGREGATION:
+            snapshot = self.snapshot()
+            _merge(snapshot, histograms, counters)
+            return histograms, counters, snapshot['gauges']
+        self.flush(force=True)
+        for snapshot in _live_snapshots(self.directory):
+            _merge(snapshot, histograms, counters)
+            if snapshot['pid'] and _is_alive(snapshot['pid']):
+                for name, value in snapshot.get('gauges', {}).items():
+                    gauges[name] = gauges.get(name, 0) + value
+        return histograms, counters, gauges
+
+
+def _merge(snapshot, histograms, counters):
+    for name, labels, entry in snapshot['histograms']:
+        if name not in HISTOGRAMS:
+            continue
+        merged = histograms.setdefault((name, tuple(labels)), {
+            'buckets': [0] * len(HISTOGRAMS[name][1]), 'sum': 0.0, 'count': 0,
+        })
+        merged['buckets'] = [a + b for a, b in zip(merged['buckets'], entry['buckets'])]
+        merged['sum'] += entry['sum']
+        merged['count'] += entry['count']
+    for name, labels, value in snapshot['counters']:
+        key = (name, tuple(labels))
+        counters[key] = counters.get(key, 0) + value
+
+
+def archive_exited(directory, own_path):
+    """
+    Folds the counters and histograms of every exited worker's file into ARCHIVE_NAME and
+    deletes those files, so totals never go down and the directory does not keep growing.
+    The archive lists the files it already holds until they are gone, so a crash between
+    writing it and deleting them cannot count them twice.
+    """
+    with open(os.path.join(directory, '.metrics.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        archive = _read_archive(directory)
+        histograms, counters = {}, {}
+        _merge(archive, histograms, counters)
+        exited = [name for name in archive['merged'] if os.path.exists(os.path.join(directory, name))]
+        for name, snapshot in _read_snapshots(directory):
+            path = os.path.join(directory, name)
+            if name == ARCHIVE_NAME or name in exited or path == own_path:
+                continue
+            # The same pid under another start time is a previous worker whose pid this one reuses.
+            if _is_alive(snapshot['pid']) and snapshot['pid'] != os.getpid():
+                continue
+            _merge(snapshot, histograms, counters)
+            exited.append(name)
+        _write_json(directory, os.path.join(directory, ARCHIVE_NAME), {
+            'pid': None,
+            'histograms': [
+                [name, list(labels), entry] for (name, labels), entry in histograms.items()
+            ],
+            'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+            'merged': exited,
+        })
+        for name in exited:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+
+
+def _read_archive(directory):
+    for name, snapshot in _read_snapshots(directory):
+        if name == ARCHIVE_NAME:
+            return snapshot
+    return {'pid': None, 'histograms': [], 'counters': [], 'merged': []}
+
+
+def _live_snapshots(directory):
+    """Every snapshot to sum: the archive plus the files it does not already hold."""
+    snapshots = dict(_read_snapshots(directory))
+    archive = snapshots.get(ARCHIVE_NAME)
+    for name in archive['merged'] if archive else ():
+        snapshots.pop(name, None)
+    return snapshots.values()
+
+
+def _write_json(directory, path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-', suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def _current_gauges():
+    from users.hashers import get_hashing_stats
+
+    stats = get_hashing_stats()
+    return {'password_hashing_queued': stats['queued'], 'password_hashing_running': stats['running']}
+
+
+def _pool_stats():
+    """Yields (alias, stats) for each pooled PostgreSQL connection this thread has set up."""
+    from django.db import connections
+
+    for conn in connections.all(initialized_only=True):
+        if conn.vendor != 'postgresql' or not conn.settings_dict['OPTIONS'].get('pool'):
+            continue
+        # pop_stats() resets the pool's counters, so each call reports what happened since the last.
+        yield conn.alias, conn.pool.pop_stats()
+
+
+def _read_snapshots(directory):
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        return
+    for name in names:
+        if not (name.startswith('metrics-') and name.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                yield name, json.load(f)
+        except (OSError, ValueError):
+            # Removed or being replaced by its writer; it will be complete on the next scrape.
+            continue
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_number(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf'
+        return repr(value)
+    return str(value)
+
+
+def render_prometheus(histograms, counters, gauges):
+    """Renders merged metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name, (help_text, label_names) in COUNTERS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f'{name}{_format_labels(label_names, labels)} {_format_number(value)}')
+    for name, (help_text, bounds) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (metric, labels), entry in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(bounds + (math.inf,), entry['buckets'] + [entry['count'] - sum(entry['buckets'])]):
+                cumulative += count
+                le = _format_number(float(bound))
+                lines.append(f'{name}_bucket{_format_labels(("view",), labels, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(("view",), labels)} {_format_number(entry["sum"])}')
+            lines.append(f'{name}_count{_format_labels(("view",), labels)} {entry["count"]}')
+    for name, help_text in GAUGES.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {gauges.get(name, 0)}']
+    return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush_at_exit)
@@ -0,0 +1,235 @@
+import mimetypes
+import os
+import time
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .metrics import registry
+from .storage import COMPRESSED_SUFFIXES
+
+
+class QueryStats:
+    """execute_wrapper hook counting the SQL statements of one request and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+# The QueryStats of the request being handled. sync_to_async copies the context into the
+# thread an async view's ORM calls run in, whose connections the middleware never sees.
+_request_queries = ContextVar('request_queries', default=None)
+
+
+def _count_query(execute, sql, params, many, context):
+    queries = _request_queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    return queries(execute, sql, params, many, context)
+
+
+def install_query_counter(connection):
+    """Adds the request query counter to a connection's execute_wrappers, once."""
+    if _count_query not in connection.execute_wrappers:
+        # First in the list: execute_wrapper() blocks pop the last entry when they exit.
+        connection.execute_wrappers.insert(0, _count_query)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    install_query_counter(connection)
+
+
+connection_created.connect(_on_connection_created)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records query count, DB time, total latency and response size per resolved
+    URL name into core.metrics. Put it first so the timing covers the other middleware.
+    Sync and async: under ASGI it must not push async views onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Connections opened before this module was imported missed connection_created.
+        for connection in connections.all(initialized_only=True):
+            install_query_counter(connection)
+        queries = QueryStats()
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self.record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    async def __acall__(self, request):
+        queries = QueryStats()
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self.record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    def record(self, request, response, duration, queries):
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        registry.inc('http_requests_total', (view, request.method, str(response.status_code)))
+        registry.observe('http_request_duration_seconds', (view,), duration)
+        registry.observe('http_request_db_queries', (view,), queries.count)
+        registry.observe('http_request_db_duration_seconds', (view,), queries.duration)
+        if not response.streaming:
+            registry.observe('http_response_size_bytes', (view,), len(response.content))
+        # At most one small file write per METRICS_FLUSH_INTERVAL, cheap enough for the event loop.
+        registry.flush()
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in header.split(','):
+        coding, *params = part.split(';')
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFile:
+    """One collected file: the path and response headers of each stored encoding."""
+
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.last_modified = stat.st_mtime
+        content_type, _ = mimetypes.guess_type(path)
+        max_age = 365 * 24 * 3600 if immutable else settings.STATIC_MAX_AGE
+        common = {
+            'Content-Type': content_type or 'application/octet-stream',
+            'Cache-Control': f'public, max-age={max_age}' + (', immutable' if immutable else ''),
+            'Last-Modified': http_date(stat.st_mtime),
+        }
+        self.variants = {}
+        for encoding, suffix in (('identity', ''), *COMPRESSED_SUFFIXES.items()):
+            if encoding != 'identity' and not os.path.exists(path + suffix):
+                continue
+            size = os.path.getsize(path + suffix)
+            headers = {**common, 'Content-Length': str(size), 'ETag': f'"{stat.st_mtime_ns:x}-{encoding}-{size:x}"'}
+            if encoding != 'identity':
+                headers['Content-Encoding'] = encoding
+            self.variants[encoding] = (path + suffix, headers)
+        if len(self.variants) > 1:
+            for _, headers in self.variants.values():
+                headers['Vary'] = 'Accept-Encoding'
+
+    def choose(self, accept_encoding):
+        """Picks brotli, then gzip, then the plain file, among what Accept-Encoding allows."""
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and encoding in accepted:
+                return self.variants[encoding]
+        return self.variants['identity']
+
+
+class StaticFilesMiddleware:
+    """
+    Serves files collected into STATIC_ROOT ahead of sessions, auth and the URLconf.
+    The directory is indexed once at start-up (restart after collectstatic), the
+    precompressed .br/.gz variant is chosen by Accept-Encoding, and the body is a
+    FileResponse so WSGI servers can send it with sendfile(). Names that carry a
+    content hash from the manifest are cached for a year as immutable.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        root = settings.STATIC_ROOT
+        if not settings.STATIC_SERVE_ENABLED or not root or not os.path.isdir(root):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.prefix = urlsplit(settings.STATIC_URL).path
+        hashed = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        variant_suffixes = set(COMPRESSED_SUFFIXES.values())
+        self.files = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                original, suffix = os.path.splitext(path)
+                if suffix in variant_suffixes and os.path.exists(original):
+                    continue
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                self.files[name] = StaticFile(path, immutable=name in hashed)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        static_file = self.match(request)
+        if static_file is not None:
+            return self.serve(request, static_file)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # The index is in memory and serve() only opens the file, so no thread is needed.
+        static_file = self.match(request)
+        if static_file is not None:
+            return self.serve(request, static_file)
+        return await self.get_response(request)
+
+    def match(self, request):
+        if request.method in ('GET', 'HEAD') and request.path.startswith(self.prefix):
+            return self.files.get(request.path[len(self.prefix):])
+        return None
+
+    def serve(self, request, static_file):
+        path, headers = static_file.choose(request.headers.get('Accept-Encoding', ''))
+        response = get_conditional_response(
+            request, etag=headers['ETag'], last_modified=static_file.last_modified,
+            response=HttpResponse(headers=headers),
+        )
+        if response.status_code == 304 or request.method == 'HEAD':
+            return response
+        response = FileResponse(open(path, 'rb'), content_type=headers['Content-Type'])
+        del response.headers['Content-Disposition']
+        for name, value in headers.items():
+            response.headers[name] = value
+        return response
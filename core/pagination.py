@@ -0,0 +1,119 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    """
+    A single page of results produced by keyset pagination.
+    Cursors are opaque strings that can be handed back to `paginate_keyset`.
+    """
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def encode_cursor(obj, direction='next', key='created_at'):
+    """Builds an opaque cursor pointing at the (key, id) position of obj."""
+    value = getattr(obj, key)
+    value = value.isoformat() if hasattr(value, 'isoformat') else str(value)
+    payload = {'d': direction, 'k': key, 'v': value, 'i': obj.pk}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, key='created_at'):
+    """Decodes a cursor into (direction, value, id). Raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        direction = payload['d']
+        value = model._meta.get_field(key).to_python(payload['v'])
+        pk = int(payload['i'])
+    except (ValueError, TypeError, KeyError, ValidationError) as e:
+        raise ValueError("Invalid pagination cursor.") from e
+    if direction not in ('next', 'prev') or payload.get('k') != key or value is None:
+        raise ValueError("Invalid pagination cursor.")
+    return direction, value, pk
+
+
+def clamp_page_size(page_size):
+    """Returns a usable page size, falling back to the default and capping at the maximum."""
+    default = settings.LISTINGS_PAGE_SIZE
+    try:
+        page_size = int(page_size) if page_size is not None else default
+    except (TypeError, ValueError):
+        page_size = default
+    if page_size <= 0:
+        page_size = default
+    return min(page_size, settings.LISTINGS_MAX_PAGE_SIZE)
+
+
+def _keyset_plan(queryset, cursor, key, descending):
+    """Returns (direction, sliceable queryset) for the page the cursor points at."""
+    forward = [f'-{key}', '-id'] if descending else [key, 'id']
+    backward = [key, 'id'] if descending else [f'-{key}', '-id']
+    if not cursor:
+        return None, queryset.order_by(*forward)
+
+    direction, value, pk = decode_cursor(cursor, queryset.model, key)
+    # "after" means further along the forward ordering.
+    after = 'lt' if descending else 'gt'
+    before = 'gt' if descending else 'lt'
+    if direction == 'next':
+        seek = Q(**{f'{key}__{after}': value}) | Q(**{key: value, f'id__{after}': pk})
+        return direction, queryset.filter(seek).order_by(*forward)
+    seek = Q(**{f'{key}__{before}': value}) | Q(**{key: value, f'id__{before}': pk})
+    return direction, queryset.filter(seek).order_by(*backward)
+
+
+def _keyset_page(rows, direction, page_size, key):
+    """Builds the KeysetPage from up to page_size + 1 fetched rows."""
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction is None:
+        next_cursor = encode_cursor(rows[-1], 'next', key) if has_more else None
+        return KeysetPage(rows, next_cursor=next_cursor)
+    if direction == 'next':
+        next_cursor = encode_cursor(rows[-1], 'next', key) if rows and has_more else None
+        prev_cursor = encode_cursor(rows[0], 'prev', key) if rows else None
+    else:
+        rows = rows[::-1]
+        next_cursor = encode_cursor(rows[-1], 'next', key) if rows else None
+        prev_cursor = encode_cursor(rows[0], 'prev', key) if rows and has_more else None
+    return KeysetPage(rows, next_cursor=next_cursor, prev_cursor=prev_cursor)
+
+
+def paginate_keyset(queryset, cursor=None, page_size=None, key='created_at', descending=True, row_factory=None):
+    """
+    Paginates a queryset on (key, id) using seek conditions instead of OFFSET,
+    so any page costs the same as the first one. Defaults to newest first.
+    row_factory, if given, maps each fetched row (e.g. from values_list()) to an
+    object exposing `pk` and the key attribute.
+    """
+    page_size = clamp_page_size(page_size)
+    direction, queryset = _keyset_plan(queryset, cursor, key, descending)
+    rows = queryset[:page_size + 1]
+    rows = [row_factory(row) for row in rows] if row_factory else list(rows)
+    return _keyset_page(rows, direction, page_size, key)
+
+
+async def apaginate_keyset(queryset, cursor=None, page_size=None, key='created_at', descending=True, row_factory=None):
+    """Async counterpart of `paginate_keyset`, fetching the page with async iteration."""
+    page_size = clamp_page_size(page_size)
+    direction, queryset = _keyset_plan(queryset, cursor, key, descending)
+    rows = [row_factory(row) if row_factory else row async for row in queryset[:page_size + 1]]
+    return _keyset_page(rows, direction, page_size, key)
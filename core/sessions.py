@@ -0,0 +1,113 @@
+"""
+Session engine (SESSION_ENGINE = 'core.sessions') that serves reads from the cache and
+coalesces writes.
+
+The cache holds (data, expire_date of the DB row) under the session key. A request
+whose session comes back unchanged writes nothing, even when it was marked modified or
+SESSION_SAVE_EVERY_REQUEST is on. Only the expiry refresh is written behind: the DB row
+and cache entry are extended once they lag the wanted expiry by SESSION_REFRESH_INTERVAL
+or more. A changed session is written to the DB and the cache straight away. The cache
+(SESSION_CACHE_ALIAS) must be shared by every process, or a logout in one worker stays
+invisible to the others.
+"""
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.db import transaction
+from django.utils import timezone
+
+KEY_PREFIX = 'core.sessions.'
+
+
+class SessionStore(cached_db.SessionStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # Fingerprint and expiry of what the DB and cache hold for this session.
+        self._stored = None
+
+    def _fingerprint(self, data):
+        return self.serializer().dumps(data)
+
+    def _remember(self, data, expire_date):
+        self._stored = (self._fingerprint(data), expire_date)
+        self._cache.set(self.cache_key, (data, expire_date), self.get_expiry_age(expiry=expire_date))
+
+    def _is_stored(self, data, must_create):
+        if must_create or self._stored is None:
+            return False
+        fingerprint, expire_date = self._stored
+        refresh_at = self.get_expiry_date() - timedelta(seconds=settings.SESSION_REFRESH_INTERVAL)
+        return fingerprint == self._fingerprint(data) and expire_date > refresh_at
+
+    def _cached_entry(self):
+        try:
+            return self._cache.get(self.cache_key)
+        except Exception:
+            # Some backends (e.g. memcache) raise on invalid keys; treat it as a miss.
+            return None
+
+    def load(self):
+        entry = self._cached_entry()
+        if entry is None:
+            s = self._get_session_from_db()
+            if s is None:
+                return {}
+            entry = (self.decode(s.session_data), s.expire_date)
+            self._remember(*entry)
+        else:
+            self._stored = (self._fingerprint(entry[0]), entry[1])
+        return entry[0]
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        if self._is_stored(data, must_create):
+            return
+        # Taken before the write, so the remembered expiry is never later than the row's.
+        expire_date = self.get_expiry_date()
+        # The plain database engine's save, then the cache entry.
+        super(cached_db.SessionStore, self).save(must_create=must_create)
+        self._remember(data, expire_date)
+
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    async def asave(self, must_create=False):
+        return await sync_to_async(self.save)(must_create)
+
+    @classmethod
+    def clear_expired(cls):
+        clear_expired_sessions()
+
+
+def clear_expired_sessions(batch_size=None, max_seconds=None, pause=0.0):
+    """
+    Deletes expired sessions oldest first, batch_size rows per short transaction, so
+    the table is never locked for one huge DELETE. Stops once nothing expired is left
+    or max_seconds have passed. Returns the number of rows deleted.
+    """
+    from django.contrib.sessions.models import Session
+
+    batch_size = batch_size or settings.SESSION_CLEANUP_BATCH_SIZE
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+    now = timezone.now()
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            keys = list(
+                Session.objects.filter(expire_date__lt=now)
+                .order_by('expire_date')
+                .values_list('session_key', flat=True)[:batch_size]
+            )
+            if keys:
+                deleted += Session.objects.filter(session_key__in=keys, expire_date__lt=now).delete()[0]
+        if len(keys) < batch_size or (deadline is not None and time.monotonic() >= deadline):
+            return deleted
+        if pause:
+            time.sleep(pause)
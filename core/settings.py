@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 import environ
@@ -50,7 +52,7 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
-    'django.contrib.staticfiles',
+    'core.apps.CoreStaticFilesConfig',
     
     'django_extensions',
     
@@ -64,6 +66,7 @@ INSTALLED_APPS = [
     'allauth.socialaccount.providers.google',
     
     # Local apps
+    'core',
     'users.apps.UsersConfig',
     'listings.apps.ListingsConfig',
 ]
@@ -72,7 +75,9 @@ AUTH_USER_MODEL = 'users.CustomUser'
 SITE_ID = 1
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -84,12 +89,19 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'core.urls'
 
+_TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Parsed templates are kept in memory for the life of the process; with DEBUG they
+            # are re-read on every render so edits show up without a restart.
+            'loaders': _TEMPLATE_LOADERS if DEBUG else [('django.template.loaders.cached.Loader', _TEMPLATE_LOADERS)],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -117,6 +129,78 @@ if 'test' in sys.argv:
         'NAME': BASE_DIR / 'test_db.sqlite3',
     }
 
+# PostgreSQL connection pool (psycopg_pool), one per worker process, so requests borrow an open
+# connection instead of paying the TCP and auth handshake. Size it per process: WEB_CONCURRENCY
+# workers x DB_POOL_MAX_SIZE connections must stay below the server's max_connections, which is
+# how the default max size is derived from DB_POOL_MAX_CONNECTIONS.
+DB_POOL_ENABLED = env('DB_POOL_ENABLED', cast=bool, default=True)
+WEB_CONCURRENCY = env('WEB_CONCURRENCY', cast=int, default=1)
+DB_POOL_MAX_CONNECTIONS = env('DB_POOL_MAX_CONNECTIONS', cast=int, default=20)
+DB_POOL_MAX_SIZE = env('DB_POOL_MAX_SIZE', cast=int, default=max(1, DB_POOL_MAX_CONNECTIONS // WEB_CONCURRENCY))
+DB_POOL_MIN_SIZE = min(env('DB_POOL_MIN_SIZE', cast=int, default=2), DB_POOL_MAX_SIZE)
+
+if DB_POOL_ENABLED and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default'].update({
+        # The pool owns connection lifetimes, and checks every connection it hands out.
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': True,
+    })
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': DB_POOL_MIN_SIZE,
+        'max_size': DB_POOL_MAX_SIZE,
+        # Seconds a request waits for a free connection before failing.
+        'timeout': env('DB_POOL_TIMEOUT', cast=float, default=10.0),
+        # Idle connections above min_size are closed after this many seconds.
+        'max_idle': env('DB_POOL_MAX_IDLE', cast=float, default=300.0),
+        'max_lifetime': env('DB_POOL_MAX_LIFETIME', cast=float, default=3600.0),
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Defaults to per-process LocMem; set CACHE_URL=redis://host:6379/1 to share it across workers.
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+    # Rendered template fragments (listing cards, navbar, footer). Process-local by default:
+    # lookups cost no network round trip and a restart drops markup from the previous deploy.
+    'template_fragments': env.cache(
+        'FRAGMENT_CACHE_URL', default='locmemcache://template-fragments?MAX_ENTRIES=20000'
+    ),
+}
+
+FRAGMENT_CACHE_TIMEOUT = env('FRAGMENT_CACHE_TIMEOUT', cast=int, default=3600)
+
+# Sessions: core.sessions serves them from the cache and only writes a session that changed
+# or whose stored expiry lags by SESSION_REFRESH_INTERVAL seconds. Every process must see the
+# same cache, so with the per-process LocMem default the plain database engine is kept.
+SESSION_ENGINE = env(
+    'SESSION_ENGINE',
+    default='django.contrib.sessions.backends.db'
+    if CACHES['default']['BACKEND'].endswith('LocMemCache') else 'core.sessions',
+)
+SESSION_REFRESH_INTERVAL = env('SESSION_REFRESH_INTERVAL', cast=int, default=3600)
+# Rows per DELETE in `manage.py purge_sessions`
+SESSION_CLEANUP_BATCH_SIZE = env('SESSION_CLEANUP_BATCH_SIZE', cast=int, default=5000)
+
+LISTINGS_FEED_CACHE_TIMEOUT = env('LISTINGS_FEED_CACHE_TIMEOUT', cast=int, default=300)
+
+# max-age sent to shared HTTP caches for anonymous listing responses (revalidated via ETag)
+LISTINGS_HTTP_CACHE_MAX_AGE = env('LISTINGS_HTTP_CACHE_MAX_AGE', cast=int, default=30)
+
+
+# Password hashing
+# PBKDF2 runs on a per-process pool capped at PASSWORD_HASHING_MAX_WORKERS concurrent hashes
+# (0 = half the CPUs), so login bursts queue instead of starving other requests.
+PASSWORD_HASHERS = [
+    'users.hashers.BoundedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASHING_MAX_WORKERS = env('PASSWORD_HASHING_MAX_WORKERS', cast=int, default=0)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -145,6 +229,21 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = env('STATIC_ROOT', default=str(BASE_DIR / 'staticfiles'))
+
+# collectstatic writes content-hashed names plus .gz/.br variants (core.storage).
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage'},
+}
+
+# core.middleware.StaticFilesMiddleware serves STATIC_ROOT once it exists; turn it off when
+# a web server or CDN serves /static/ instead. Unhashed names are cached for STATIC_MAX_AGE seconds.
+STATIC_SERVE_ENABLED = env('STATIC_SERVE_ENABLED', cast=bool, default=True)
+STATIC_MAX_AGE = env('STATIC_MAX_AGE', cast=int, default=60)
+# Without a manifest (collectstatic not run) {% static %} raises unless DEBUG or this is on;
+# the test suite renders templates without running collectstatic.
+STATIC_MANIFEST_OPTIONAL = env('STATIC_MANIFEST_OPTIONAL', cast=bool, default='test' in sys.argv)
 
 AUTHENTICATION_BACKENDS = [
     'allauth.account.auth_backends.AuthenticationBackend',
@@ -153,11 +252,31 @@ AUTHENTICATION_BACKENDS = [
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.SessionAuthentication',
-        'dj_rest_auth.jwt_auth.JWTCookieAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTCookieAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     )
 }
 
+# JWT requests resolve request.user from a per-process LRU (short TTL) backed by the
+# shared cache; saving or deleting a user evicts it.
+USERS_AUTH_CACHE_TIMEOUT = env('USERS_AUTH_CACHE_TIMEOUT', cast=int, default=300)
+USERS_AUTH_LOCAL_TIMEOUT = env('USERS_AUTH_LOCAL_TIMEOUT', cast=int, default=10)
+USERS_AUTH_LOCAL_MAX_SIZE = env('USERS_AUTH_LOCAL_MAX_SIZE', cast=int, default=1024)
+
+# Keyset pagination for the listings feed (web and API)
+LISTINGS_PAGE_SIZE = env('LISTINGS_PAGE_SIZE', cast=int, default=20)
+LISTINGS_MAX_PAGE_SIZE = env('LISTINGS_MAX_PAGE_SIZE', cast=int, default=100)
+
+# Bulk listing endpoints: rows per INSERT/UPDATE statement and items per request
+LISTINGS_BULK_BATCH_SIZE = env('LISTINGS_BULK_BATCH_SIZE', cast=int, default=500)
+LISTINGS_BULK_MAX_ITEMS = env('LISTINGS_BULK_MAX_ITEMS', cast=int, default=1000)
+
+# Rows fetched per round trip when streaming the listings export
+LISTINGS_EXPORT_CHUNK_SIZE = env('LISTINGS_EXPORT_CHUNK_SIZE', cast=int, default=2000)
+
+# Lower bounds of the price histogram buckets; the last bucket is open-ended
+LISTINGS_PRICE_BUCKETS = [0, 10, 25, 50, 100, 250, 500, 1000]
+
 REST_AUTH = {
     'USE_JWT': True,
     'JWT_AUTH_COOKIE': 'jwt-auth',
@@ -212,4 +331,20 @@ EMAIL_PORT = env('EMAIL_PORT', cast=int, default=1025)
 EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='')
 EMAIL_USE_TLS = env('EMAIL_USE_TLS', cast=bool, default=False)
-EMAIL_USE_SSL = env('EMAIL_USE_SSL', cast=bool, default=False)
\ No newline at end of file
+EMAIL_USE_SSL = env('EMAIL_USE_SSL', cast=bool, default=False)
+
+# Outbound mail queue: allauth mail is stored in the database and delivered by
+# `manage.py send_queued_mail --loop`, retrying with exponential backoff.
+EMAIL_QUEUE_ENABLED = env('EMAIL_QUEUE_ENABLED', cast=bool, default=True)
+EMAIL_QUEUE_BATCH_SIZE = env('EMAIL_QUEUE_BATCH_SIZE', cast=int, default=100)
+EMAIL_QUEUE_MAX_ATTEMPTS = env('EMAIL_QUEUE_MAX_ATTEMPTS', cast=int, default=5)
+EMAIL_QUEUE_RETRY_BACKOFF = env('EMAIL_QUEUE_RETRY_BACKOFF', cast=int, default=60)
+
+# Per-request metrics (query count, DB time, latency, response size per URL name), served
+# at /metrics in Prometheus format. Every worker writes its totals to METRICS_DIR at most
+# every METRICS_FLUSH_INTERVAL seconds; use one empty directory per deployment.
+METRICS_ENABLED = env('METRICS_ENABLED', cast=bool, default=True)
+METRICS_DIR = env('METRICS_DIR', default=os.path.join(tempfile.gettempdir(), 'basespa-metrics'))
+METRICS_FLUSH_INTERVAL = env('METRICS_FLUSH_INTERVAL', cast=float, default=5.0)
+# If set, /metrics requires "Authorization: Bearer <token>"
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
\ No newline at end of file
@@ -0,0 +1,74 @@
+import gzip
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only .gz variants are written.
+    brotli = None
+
+# Suffixes of the precompressed variants, by Content-Encoding.
+COMPRESSED_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+COMPRESSIBLE_TYPES = {
+    'application/javascript', 'application/json', 'application/manifest+json',
+    'application/xml', 'image/svg+xml', 'image/x-icon', 'image/vnd.microsoft.icon',
+}
+
+# Files smaller than this fit in one packet anyway.
+MIN_COMPRESS_SIZE = 256
+
+
+def is_compressible(name):
+    content_type, encoding = mimetypes.guess_type(name)
+    if encoding or content_type is None:
+        return False
+    return content_type.startswith('text/') or content_type in COMPRESSIBLE_TYPES
+
+
+def compress(data):
+    """Returns {content encoding: compressed bytes} for the variants worth keeping."""
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    # A variant that saves less than 5% costs the client a decompression for nothing.
+    return {encoding: body for encoding, body in variants.items() if len(body) < len(data) * 0.95}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also writes <name>.gz (and <name>.br when the
+    `brotli` package is installed) next to every compressible hashed file during
+    collectstatic, so core.middleware.StaticFilesMiddleware never compresses per request.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            # Before collectstatic has run there is no manifest. While developing or testing,
+            # behave like StaticFilesStorage; anywhere else unhashed names would be cached for
+            # a year, so fail like manifest_strict does for a missing entry.
+            if settings.DEBUG or settings.STATIC_MANIFEST_OPTIONAL:
+                return name
+            raise ValueError(f"Missing staticfiles manifest while resolving '{name}'; run collectstatic.")
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for hashed_name in set(self.hashed_files.values()):
+            if is_compressible(hashed_name):
+                self.write_compressed(hashed_name)
+
+    def write_compressed(self, name):
+        path = self.path(name)
+        if os.path.getsize(path) < MIN_COMPRESS_SIZE:
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        for encoding, body in compress(data).items():
+            with open(path + COMPRESSED_SUFFIXES[encoding], 'wb') as f:
+                f.write(body)
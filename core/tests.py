@@ -0,0 +1,340 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils import timezone
+
+from core import benchmarks, storage
+from core.management.commands.watch_emails import SEPARATOR, InotifyWatcher, MailFile, StatWatcher
+from core import metrics
+from core.metrics import registry
+from core.middleware import RequestMetricsMiddleware, StaticFilesMiddleware
+from core.sessions import SessionStore
+
+
+class WatchEmailsTests(SimpleTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def send(self, *subjects):
+        connection = get_connection('django.core.mail.backends.filebased.EmailBackend', file_path=self.dir)
+        connection.send_messages([EmailMessage(subject, 'Body', 'from@example.com', ['to@example.com']) for subject in subjects])
+
+    def test_since_grep_without_follow(self):
+        """--since prints existing mail, --grep filters it, --no-follow exits afterwards."""
+        self.send('Password reset', 'Welcome')
+        out = io.StringIO()
+        call_command('watch_emails', path=self.dir, since='1h', follow=False, grep='subject: welcome', stdout=out)
+        self.assertIn('Subject: Welcome', out.getvalue())
+        self.assertNotIn('Password reset', out.getvalue())
+
+        out = io.StringIO()
+        call_command('watch_emails', path=self.dir, follow=False, stdout=out)
+        self.assertEqual(out.getvalue(), '')
+
+    def test_mail_file_reads_incrementally(self):
+        """Only complete messages are returned, and each byte is read once."""
+        path = os.path.join(self.dir, 'mail.log')
+        mail_file = MailFile(path)
+        with open(path, 'w') as f:
+            f.write('Subject: First\n')
+        self.assertEqual(mail_file.read_messages(), [])
+        with open(path, 'a') as f:
+            f.write('\n' + SEPARATOR + 'Subject: Second\n\n' + SEPARATOR)
+        self.assertEqual(mail_file.read_messages(), ['Subject: First\n\n', 'Subject: Second\n\n'])
+        self.assertEqual(mail_file.read_messages(), [])
+
+    def test_watchers_report_new_files(self):
+        """Both the inotify watcher and the stat fallback notice a new mail file."""
+        watchers = [StatWatcher(self.dir, interval=0.05)]
+        try:
+            watchers.append(InotifyWatcher(self.dir))
+        except OSError:
+            pass
+        self.send('Hello')
+        name = os.listdir(self.dir)[0]
+        for watcher in watchers:
+            with self.subTest(watcher=type(watcher).__name__):
+                self.assertIn(name, watcher.wait(timeout=2))
+                watcher.close()
+
+
+class RequestMetricsTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        settings_override = override_settings(METRICS_DIR=self.dir, METRICS_TOKEN='s3cret')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        registry.clear()
+        self.addCleanup(registry.clear)
+
+    def scrape(self):
+        return self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret').content.decode()
+
+    def test_records_queries_latency_and_size_per_url_name(self):
+        self.client.get(reverse('listings_api:api_listings_list'))
+        body = self.scrape()
+        view = 'view="listings_api:api_listings_list"'
+        self.assertIn(f'http_requests_total{{{view},method="GET",status="200"}} 1', body)
+        self.assertIn(f'http_request_db_queries_bucket{{{view},le="+Inf"}} 1', body)
+        self.assertIn(f'http_request_db_duration_seconds_count{{{view}}} 1', body)
+        self.assertIn(f'http_response_size_bytes_count{{{view}}} 1', body)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+
+    async def test_async_requests_stay_on_the_event_loop(self):
+        """Under ASGI the middleware is a coroutine, and it still counts the async view's queries."""
+        async def view(request):
+            return HttpResponse()
+        self.assertTrue(iscoroutinefunction(RequestMetricsMiddleware(view)))
+
+        await cache.aclear()  # a cached feed page would need no query
+        await self.async_client.get(reverse('listings_async_api:api_listings_list'))
+        histograms, counters, _ = await sync_to_async(registry.collect)()
+        view_name = 'listings_async_api:api_listings_list'
+        self.assertEqual(counters[('http_requests_total', (view_name, 'GET', '200'))], 1)
+        self.assertGreater(histograms[('http_request_db_queries', (view_name,))]['sum'], 0)
+
+    def test_merges_snapshots_of_other_processes(self):
+        """Totals include other workers' files; gauges only count processes that are still running."""
+        registry.inc('http_requests_total', ('landing', 'GET', '200'))
+        registry.observe('http_request_db_queries', ('landing',), 2)
+        with open(os.path.join(self.dir, 'metrics-999999999.json'), 'w') as f:
+            json.dump({
+                'pid': 999999999,
+                'histograms': [['http_request_db_queries', ['landing'], {
+                    'buckets': [0, 0, 0, 1, 0, 0, 0, 0, 0], 'sum': 3.0, 'count': 1,
+                }]],
+                'counters': [['http_requests_total', ['landing', 'GET', '200'], 4]],
+                'gauges': {'password_hashing_queued': 7},
+            }, f)
+
+        histograms, counters, gauges = registry.collect()
+        self.assertEqual(counters[('http_requests_total', ('landing', 'GET', '200'))], 5)
+        merged = histograms[('http_request_db_queries', ('landing',))]
+        self.assertEqual((merged['buckets'][2:4], merged['sum'], merged['count']), ([1, 1], 5.0, 2))
+        self.assertEqual(gauges['password_hashing_queued'], 0)
+
+    def test_archives_files_of_exited_workers(self):
+        """Exited workers' files, including one under this process's pid, fold into one archive."""
+        for name, pid in (('metrics-999999999-1.json', 999999999), (f'metrics-{os.getpid()}-1.json', os.getpid())):
+            with open(os.path.join(self.dir, name), 'w') as f:
+                json.dump({
+                    'pid': pid, 'histograms': [], 'gauges': {},
+                    'counters': [['http_requests_total', ['landing', 'GET', '200'], 2]],
+                }, f)
+        registry.inc('http_requests_total', ('landing', 'GET', '200'))
+        key = ('http_requests_total', ('landing', 'GET', '200'))
+        self.assertEqual(registry.collect()[1][key], 5)
+        self.assertEqual(sorted(os.listdir(self.dir)), sorted([
+            '.metrics.lock', metrics.ARCHIVE_NAME, os.path.basename(registry.path),
+        ]))
+
+        # The next worker in this directory keeps the archived totals.
+        registry.clear()
+        registry.inc('http_requests_total', ('landing', 'GET', '200'))
+        self.assertEqual(registry.collect()[1][key], 6)
+
+    @mock.patch.object(metrics, 'FILE_AGGREGATION', False)
+    def test_reports_this_process_alone_without_file_aggregation(self):
+        """Where the directory cannot be locked (Windows), nothing is written and /metrics is per process."""
+        registry.inc('http_requests_total', ('landing', 'GET', '200'))
+        registry.flush(force=True)
+        self.assertEqual(os.listdir(self.dir), [])
+        self.assertIn('http_requests_total{view="landing",method="GET",status="200"} 1', self.scrape())
+
+    def test_reports_database_pool_stats(self):
+        stats = {
+            'pool_min': 2, 'pool_max': 10, 'pool_size': 4, 'pool_available': 1, 'requests_waiting': 2,
+            'requests_num': 30, 'requests_wait_ms': 1500, 'requests_errors': 1, 'connections_num': 4,
+        }
+        with mock.patch.object(metrics, '_pool_stats', return_value=[('default', stats)]):
+            body = self.scrape()
+        self.assertIn('db_pool_requests_total{alias="default"} 30', body)
+        self.assertIn('db_pool_wait_seconds_total{alias="default"} 1.5', body)
+        self.assertIn('db_pool_timeouts_total{alias="default"} 1', body)
+        self.assertIn('db_pool_in_use 3', body)
+        self.assertIn('db_pool_requests_waiting 2', body)
+
+    def test_token_protects_endpoint(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_endpoint_without_token_is_closed_unless_debug(self):
+        with self.settings(METRICS_TOKEN=''):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+            with self.settings(DEBUG=True):
+                self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+
+class EndpointBenchmarkTests(TestCase):
+
+    def test_every_route_has_a_case(self):
+        self.assertEqual(benchmarks.uncovered_routes(), [])
+
+    def test_query_counts_match_baseline(self):
+        results = benchmarks.run_suite(runs=1, timing=False, memory=False)
+        baseline = benchmarks.load_baseline()
+        for name, expected in baseline['cases'].items():
+            expected.update(time_ms=0, peak_kb=0)
+            results[name].update(time_ms=0, peak_kb=0)
+        self.assertEqual(benchmarks.compare(results, baseline), [])
+
+
+class StaticFilesTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        cls.enterClassContext(override_settings(STATIC_ROOT=tmp.name))
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.root = tmp.name
+        cls.url = static('css/output.css')
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        self.assertRegex(self.url, r'^/static/css/output\.[0-9a-f]{12}\.css$')
+        path = os.path.join(self.root, self.url.removeprefix('/static/'))
+        with open(path, 'rb') as f:
+            original = f.read()
+        with open(path + '.gz', 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()), original)
+        self.assertEqual(os.path.exists(path + '.br'), storage.brotli is not None)
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'css', 'input.css')))
+
+    def test_serves_precompressed_variant_by_accept_encoding(self):
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        body = response.getvalue()
+        self.assertEqual(int(response['Content-Length']), len(body))
+
+        identity = self.client.get(self.url, headers={'Accept-Encoding': 'gzip;q=0'})
+        self.assertNotIn('Content-Encoding', identity)
+        self.assertEqual(gzip.decompress(body), identity.getvalue())
+
+    def test_revalidation_and_unhashed_names(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': etag}).status_code, 304)
+        head = self.client.head(self.url)
+        self.assertEqual(head.content, b'')
+        self.assertEqual(head['ETag'], etag)
+
+        plain = self.client.get('/static/css/output.css')
+        self.assertEqual(plain['Cache-Control'], f'public, max-age={settings.STATIC_MAX_AGE}')
+        self.assertEqual(self.client.get('/static/css/missing.css').status_code, 404)
+
+    async def test_serves_without_leaving_the_event_loop(self):
+        async def view(request):
+            return HttpResponse(status=404)
+        self.assertTrue(iscoroutinefunction(StaticFilesMiddleware(view)))
+        response = await self.async_client.get(self.url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_missing_manifest_falls_back_only_in_development(self):
+        with tempfile.TemporaryDirectory() as empty:
+            unbuilt = storage.CompressedManifestStaticFilesStorage(location=empty)
+            with override_settings(DEBUG=False, STATIC_MANIFEST_OPTIONAL=False):
+                with self.assertRaisesMessage(ValueError, 'run collectstatic'):
+                    unbuilt.stored_name('css/output.css')
+            with override_settings(DEBUG=True, STATIC_MANIFEST_OPTIONAL=False):
+                self.assertEqual(unbuilt.stored_name('css/output.css'), 'css/output.css')
+
+
+@override_settings(SESSION_ENGINE='core.sessions')
+class CachedSessionTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.session = SessionStore()
+        self.session['cart'] = [1, 2]
+        self.session.save()
+
+    def test_reads_are_served_from_the_cache(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(self.session.session_key)['cart'], [1, 2])
+
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(SessionStore(self.session.session_key)['cart'], [1, 2])
+        with self.assertNumQueries(0):
+            SessionStore(self.session.session_key).load()
+
+    def test_only_changed_sessions_are_written(self):
+        session = SessionStore(self.session.session_key)
+        session['cart'] = [1, 2]
+        with self.assertNumQueries(0):
+            session.save()
+
+        session['cart'] = [1, 2, 3]
+        session.save()
+        cache.clear()
+        self.assertEqual(SessionStore(self.session.session_key)['cart'], [1, 2, 3])
+
+    def test_expiry_is_refreshed_once_it_lags(self):
+        soon = timezone.now() + timedelta(seconds=settings.SESSION_REFRESH_INTERVAL // 2)
+        Session.objects.filter(session_key=self.session.session_key).update(expire_date=soon)
+        cache.clear()
+
+        session = SessionStore(self.session.session_key)
+        session.load()
+        session.save()
+        row = Session.objects.get(session_key=self.session.session_key)
+        self.assertGreater(row.expire_date, timezone.now() + timedelta(seconds=settings.SESSION_COOKIE_AGE - 60))
+
+    def test_web_requests_skip_the_session_table(self):
+        user = get_user_model().objects.create_user(email='sessions@example.com', password='StrongPassword123!')
+        self.client.force_login(user)
+        self.client.get(reverse('users:profile'))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('users:profile')).status_code, 200)
+        self.assertFalse([q for q in queries.captured_queries if 'django_session' in q['sql']])
+
+    def test_logout_removes_the_cached_session(self):
+        key = self.session.session_key
+        self.session.flush()
+        self.assertEqual(SessionStore(key).load(), {})
+        self.assertFalse(Session.objects.filter(session_key=key).exists())
+
+
+class PurgeSessionsTests(TestCase):
+
+    def test_deletes_only_expired_rows_in_batches(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(days=1)) for i in range(5)]
+            + [Session(session_key='live', session_data='', expire_date=now + timedelta(days=1))]
+        )
+        out = io.StringIO()
+        # Batches of 2, 2 and 1, each a SAVEPOINT, SELECT, DELETE and RELEASE.
+        with self.assertNumQueries(12):
+            call_command('purge_sessions', batch_size=2, stdout=out)
+        self.assertIn('Deleted 5', out.getvalue())
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
@@ -1,14 +1,24 @@
 from django.contrib import admin
 from django.urls import path, include
 from . import views
-from listings.urls import web_urlpatterns as listings_web_urls, api_urlpatterns as listings_api_urls
-from users.urls import web_urlpatterns as users_web_urls, api_urlpatterns as users_api_urls
+from listings.urls import (
+    web_urlpatterns as listings_web_urls,
+    api_urlpatterns as listings_api_urls,
+    async_api_urlpatterns as listings_async_api_urls,
+)
+from users.urls import (
+    web_urlpatterns as users_web_urls,
+    api_urlpatterns as users_api_urls,
+    async_api_urlpatterns as users_async_api_urls,
+    async_auth_urlpatterns as users_async_auth_urls,
+)
 from users.api_views import PasswordResetAPIView
 
 urlpatterns = [
     # Global Landing
     path('', views.landing_page, name='landing'),
     path('admin/', admin.site.urls),
+    path('metrics', views.metrics_view, name='metrics'),
     
     # ==================
     # AUTHENTICATION
@@ -53,4 +63,11 @@ urlpatterns = [
         path('marketplace/', include((listings_api_urls, 'listings_api'))),
         path('profile/', include((users_api_urls, 'users_api'))),
     ])),
+
+    # Async mirror of the mobile API, for deployments served through core.asgi
+    path('api/async/', include([
+        path('marketplace/', include((listings_async_api_urls, 'listings_async_api'))),
+        path('profile/', include((users_async_api_urls, 'users_async_api'))),
+        path('auth/', include((users_async_auth_urls, 'async_auth'))),
+    ])),
 ]
@@ -1,6 +1,26 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+
+from .metrics import registry, render_prometheus
 
 
 def landing_page(request):
     """View for the public home/landing page."""
     return render(request, "core/landing.html")
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint: request metrics merged across every worker process."""
+    token = settings.METRICS_TOKEN
+    if not token:
+        # Per-route traffic is not public: without a token the endpoint only answers in DEBUG.
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_prometheus(*registry.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
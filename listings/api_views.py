@@ -2,16 +2,145 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.utils.urls import replace_query_param
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.core.exceptions import PermissionDenied
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+import hashlib
+from core.pagination import clamp_page_size
 from . import services, serializers
+from .cache import get_feed_version, get_or_build
+from .exports import EXPORT_FORMATS
 
-class ListingListAPIView(APIView):
+def make_etag(media_type, *parts):
+    # The negotiated media type is part of the representation, so it is part of the tag.
+    raw = '|'.join(map(str, (media_type, *parts)))
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+def not_modified_response(request, etag, last_modified):
+    """Returns a 304 when the request's validators match, else None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+def patch_conditional_headers(request, response, etag, last_modified):
+    """
+    Adds the validators to 200 and 304 responses and marks anonymous ones as cacheable
+    by shared HTTP caches. Shared by the sync views and the async ones in async_api_views.
+    """
+    if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(int(last_modified.timestamp()))
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, public=True, max_age=settings.LISTINGS_HTTP_CACHE_MAX_AGE)
+        patch_vary_headers(response, ('Accept', 'Authorization', 'Cookie'))
+    return response
+
+class ConditionalGetMixin:
+    """
+    Answers conditional GETs (If-None-Match / If-Modified-Since) with a 304 before the
+    body is built, and marks anonymous responses as cacheable by shared HTTP caches.
+    """
+    def make_etag(self, request, *parts):
+        return make_etag(request.accepted_media_type, *parts)
+
+    def conditional_response(self, request, etag, last_modified, build_response):
+        response = not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = build_response()
+        return patch_conditional_headers(request, response, etag, last_modified)
+
+class ListingListAPIView(ConditionalGetMixin, APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        cursor = request.query_params.get('cursor')
+        page_size = clamp_page_size(request.query_params.get('page_size'))
+        filters = {
+            name: request.query_params.get(name)
+            for name in ('min_price', 'max_price', 'ordering')
+        }
+        try:
+            parts = services.feed_page_key(cursor, page_size, **filters)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        # Every listing write bumps the feed version, so the version and the request's validated
+        # page parameters identify the page without touching the database.
+        etag = self.make_etag(request, get_feed_version(), *parts)
+
+        def build_response():
+            # The serialized page is identical for every visitor, so it is cached per feed version.
+            page = get_or_build('api', lambda: self._serialize_page(cursor, page_size, filters), *parts)
+            return Response({
+                "next": self._page_url(request, page['next_cursor']),
+                "previous": self._page_url(request, page['prev_cursor']),
+                "results": page['results'],
+            }, status=status.HTTP_200_OK)
+
+        return self.conditional_response(request, etag, None, build_response)
+
+    def _serialize_page(self, cursor, page_size, filters):
+        page = services.get_active_listing_records_page(cursor=cursor, page_size=page_size, **filters)
+        return {
+            'next_cursor': page.next_cursor,
+            'prev_cursor': page.prev_cursor,
+            'results': [record.to_representation() for record in page],
+        }
+
+    def _page_url(self, request, cursor):
+        if not cursor:
+            return None
+        return replace_query_param(request.build_absolute_uri(), 'cursor', cursor)
+
+class ListingPriceFacetAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        listings = services.get_active_listings()
+        return Response({"buckets": services.get_price_histogram()}, status=status.HTTP_200_OK)
+
+class ListingExportAPIView(APIView):
+    """Streams every active listing as NDJSON, a JSON array or CSV without buffering the dump."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, export_format):
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Format must be one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        content_type, extension, iter_chunks = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(
+            iter_chunks(services.iter_active_listing_records()),
+            content_type=f"{content_type}; charset=utf-8",
+        )
+        response['Content-Disposition'] = f'attachment; filename="listings.{extension}"'
+        return response
+
+class ListingSearchAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            # Clamped here as well as in the service, so the links never point below page 1.
+            page = max(int(request.query_params.get('page', 1)), 1)
+            listings, has_more = services.search_listings(
+                request.query_params.get('q'),
+                page=page,
+                page_size=request.query_params.get('page_size'),
+            )
+        except ValueError:
+            return Response({"error": "Invalid page number."}, status=status.HTTP_400_BAD_REQUEST)
+        url = request.build_absolute_uri()
         serializer = serializers.ListingSerializer(listings, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response({
+            "next": replace_query_param(url, 'page', page + 1) if has_more else None,
+            "previous": replace_query_param(url, 'page', page - 1) if page > 1 else None,
+            "results": serializer.data,
+        }, status=status.HTTP_200_OK)
 
 class ListingCreateAPIView(APIView):
     permission_classes = [IsAuthenticated]
@@ -32,15 +161,18 @@ class ListingCreateAPIView(APIView):
                 return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class ListingDetailAPIView(APIView):
+class ListingDetailAPIView(ConditionalGetMixin, APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, pk):
-        listing = services.get_listing_by_id(pk)
-        if not listing:
+        record, updated_at = services.get_listing_record_and_updated_at(pk)
+        if record is None:
             return Response({"error": "Listing not found"}, status=status.HTTP_404_NOT_FOUND)
-        serializer = serializers.ListingSerializer(listing)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        etag = self.make_etag(request, pk, updated_at.isoformat())
+        return self.conditional_response(
+            request, etag, updated_at,
+            lambda: Response(record.to_representation(), status=status.HTTP_200_OK),
+        )
 
 class ListingEditAPIView(APIView):
     permission_classes = [IsAuthenticated]
@@ -56,6 +188,8 @@ class ListingEditAPIView(APIView):
                 )
                 response_serializer = serializers.ListingSerializer(listing)
                 return Response(response_serializer.data, status=status.HTTP_200_OK)
+            except services.ListingVersionConflict as e:
+                return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
             except PermissionDenied as e:
                 return Response({"error": str(e)}, status=status.HTTP_403_FORBIDDEN)
             except ValueError as e:
@@ -73,3 +207,73 @@ class ListingDeleteAPIView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_403_FORBIDDEN)
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+class BulkListingMixin:
+    """Shared request checks for the bulk listing endpoints."""
+    def get_items(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return None, Response({"error": "Expected a non-empty list of listings."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.LISTINGS_BULK_MAX_ITEMS:
+            return None, Response(
+                {"error": f"At most {settings.LISTINGS_BULK_MAX_ITEMS} listings can be sent at once."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return items, None
+
+    def item_errors(self, serializer, items):
+        # Line errors up with the submitted items, whatever shape DRF reports them in.
+        errors = serializer.errors
+        if isinstance(errors, dict):
+            return [errors.get(i, {}) for i in range(len(items))]
+        return list(errors)
+
+class ListingBulkCreateAPIView(BulkListingMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        items, error_response = self.get_items(request)
+        if error_response:
+            return error_response
+        serializer = serializers.ListingSerializer(data=items, many=True)
+        if not serializer.is_valid():
+            return Response({"errors": self.item_errors(serializer, items)}, status=status.HTTP_400_BAD_REQUEST)
+        listings, errors = services.bulk_create_listings(request.user, serializer.validated_data)
+        if any(errors):
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        response_serializer = serializers.ListingSerializer(listings, many=True)
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+
+class ListingBulkEditAPIView(BulkListingMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    def put(self, request):
+        items, error_response = self.get_items(request)
+        if error_response:
+            return error_response
+        serializer = serializers.ListingBulkUpdateSerializer(data=items, many=True, partial=True)
+        if not serializer.is_valid():
+            return Response({"errors": self.item_errors(serializer, items)}, status=status.HTTP_400_BAD_REQUEST)
+        listings, errors = services.bulk_update_listings(request.user, serializer.validated_data)
+        if any(errors):
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        response_serializer = serializers.ListingSerializer(listings, many=True)
+        return Response(response_serializer.data, status=status.HTTP_200_OK)
+
+class ListingBulkDeleteAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def delete(self, request):
+        serializer = serializers.ListingBulkDeleteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        ids = serializer.validated_data['ids']
+        if len(ids) > settings.LISTINGS_BULK_MAX_ITEMS:
+            return Response(
+                {"error": f"At most {settings.LISTINGS_BULK_MAX_ITEMS} listings can be sent at once."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        deleted, errors = services.bulk_delete_listings(request.user, ids)
+        if any(errors):
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"deleted": deleted}, status=status.HTTP_200_OK)
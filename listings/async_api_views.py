@@ -0,0 +1,110 @@
+from django.core.exceptions import PermissionDenied
+from rest_framework import status
+from rest_framework.utils.urls import replace_query_param
+from core.async_api import api_response, async_api_view
+from core.pagination import clamp_page_size
+from . import services, serializers
+from .api_views import make_etag, not_modified_response, patch_conditional_headers
+from .cache import aget_feed_version, aget_or_build
+
+# Async (ASGI) versions of the listing endpoints in api_views.py. Same payloads and
+# status codes, but a request waiting on the database or a slow client holds no thread.
+
+# These views always answer JSON, which is what the sync views' ETags are computed for.
+MEDIA_TYPE = 'application/json'
+
+
+@async_api_view(['GET'])
+async def listing_list(request):
+    cursor = request.query_params.get('cursor')
+    page_size = clamp_page_size(request.query_params.get('page_size'))
+    filters = {
+        name: request.query_params.get(name)
+        for name in ('min_price', 'max_price', 'ordering')
+    }
+
+    async def serialize_page():
+        page = await services.aget_active_listing_records_page(cursor=cursor, page_size=page_size, **filters)
+        return {
+            'next_cursor': page.next_cursor,
+            'prev_cursor': page.prev_cursor,
+            'results': [record.to_representation() for record in page],
+        }
+
+    def page_url(page_cursor):
+        if not page_cursor:
+            return None
+        return replace_query_param(request.build_absolute_uri(), 'cursor', page_cursor)
+
+    try:
+        parts = services.feed_page_key(cursor, page_size, **filters)
+    except ValueError as e:
+        return api_response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    # Same validator as ListingListAPIView: the feed version and the validated page parameters.
+    etag = make_etag(MEDIA_TYPE, await aget_feed_version(), *parts)
+    response = not_modified_response(request, etag, None)
+    if response is None:
+        # Same namespace and parts as ListingListAPIView, so both paths share cached pages.
+        page = await aget_or_build('api', serialize_page, *parts)
+        response = api_response({
+            "next": page_url(page['next_cursor']),
+            "previous": page_url(page['prev_cursor']),
+            "results": page['results'],
+        }, status=status.HTTP_200_OK)
+    return patch_conditional_headers(request, response, etag, None)
+
+
+@async_api_view(['GET'])
+async def listing_detail(request, pk):
+    record, updated_at = await services.aget_listing_record_and_updated_at(pk)
+    if record is None:
+        return api_response({"error": "Listing not found"}, status=status.HTTP_404_NOT_FOUND)
+    etag = make_etag(MEDIA_TYPE, pk, updated_at.isoformat())
+    response = not_modified_response(request, etag, updated_at)
+    if response is None:
+        response = api_response(record.to_representation(), status=status.HTTP_200_OK)
+    return patch_conditional_headers(request, response, etag, updated_at)
+
+
+@async_api_view(['POST'], authenticated=True)
+async def listing_create(request):
+    serializer = serializers.ListingSerializer(data=request.data)
+    if not serializer.is_valid():
+        return api_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        listing = await services.acreate_listing(
+            seller=request.user,
+            title=serializer.validated_data['title'],
+            description=serializer.validated_data['description'],
+            price=serializer.validated_data['price']
+        )
+    except ValueError as e:
+        return api_response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return api_response(serializers.ListingSerializer(listing).data, status=status.HTTP_201_CREATED)
+
+
+@async_api_view(['PUT'], authenticated=True)
+async def listing_edit(request, pk):
+    serializer = serializers.ListingSerializer(data=request.data, partial=True)
+    if not serializer.is_valid():
+        return api_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        listing = await services.aupdate_listing(user=request.user, listing_id=pk, **serializer.validated_data)
+    except services.ListingVersionConflict as e:
+        return api_response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+    except PermissionDenied as e:
+        return api_response({"error": str(e)}, status=status.HTTP_403_FORBIDDEN)
+    except ValueError as e:
+        return api_response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return api_response(serializers.ListingSerializer(listing).data, status=status.HTTP_200_OK)
+
+
+@async_api_view(['DELETE'], authenticated=True)
+async def listing_delete(request, pk):
+    try:
+        await services.adelete_listing(user=request.user, listing_id=pk)
+    except PermissionDenied as e:
+        return api_response({"error": str(e)}, status=status.HTTP_403_FORBIDDEN)
+    except ValueError as e:
+        return api_response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    return api_response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,114 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+FEED_VERSION_KEY = 'listings:feed:version'
+FEED_HITS_KEY = 'listings:feed:hits'
+FEED_MISSES_KEY = 'listings:feed:misses'
+
+
+def get_feed_version():
+    """
+    Returns the current feed version, initialising it if the cache lost it.
+    The initial value is time-based so entries cached under an evicted version are never reused.
+    """
+    version = cache.get(FEED_VERSION_KEY)
+    if version is None:
+        cache.add(FEED_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(FEED_VERSION_KEY)
+    return version
+
+
+def bump_feed_version():
+    """Invalidates every cached feed entry by atomically moving to a new version."""
+    try:
+        return cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        # Key missing (first write or evicted): any fresh version invalidates old entries.
+        get_feed_version()
+        return cache.incr(FEED_VERSION_KEY)
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def _entry_key(version, namespace, parts):
+    # Parts come from request parameters; a digest keeps the key short and free of
+    # characters that memcached-style backends reject.
+    digest = hashlib.sha256('|'.join(map(str, parts)).encode()).hexdigest()[:32]
+    return f'listings:feed:{version}:{namespace}:{digest}'
+
+
+def get_or_build(namespace, builder, *parts):
+    """
+    Returns the cached value for namespace/parts under the current feed version,
+    calling builder() and storing its result on a miss.
+    """
+    key = _entry_key(get_feed_version(), namespace, parts)
+    value = cache.get(key)
+    if value is not None:
+        _count(FEED_HITS_KEY)
+        return value
+    _count(FEED_MISSES_KEY)
+    value = builder()
+    cache.set(key, value, timeout=settings.LISTINGS_FEED_CACHE_TIMEOUT)
+    return value
+
+
+async def aget_feed_version():
+    """Async counterpart of `get_feed_version`."""
+    version = await cache.aget(FEED_VERSION_KEY)
+    if version is None:
+        await cache.aadd(FEED_VERSION_KEY, time.time_ns(), timeout=None)
+        version = await cache.aget(FEED_VERSION_KEY)
+    return version
+
+
+async def abump_feed_version():
+    """Async counterpart of `bump_feed_version`."""
+    try:
+        return await cache.aincr(FEED_VERSION_KEY)
+    except ValueError:
+        await aget_feed_version()
+        return await cache.aincr(FEED_VERSION_KEY)
+
+
+async def _acount(key):
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 0, timeout=None)
+        await cache.aincr(key)
+
+
+async def aget_or_build(namespace, builder, *parts):
+    """Async counterpart of `get_or_build`; builder is a coroutine function."""
+    key = _entry_key(await aget_feed_version(), namespace, parts)
+    value = await cache.aget(key)
+    if value is not None:
+        await _acount(FEED_HITS_KEY)
+        return value
+    await _acount(FEED_MISSES_KEY)
+    value = await builder()
+    await cache.aset(key, value, timeout=settings.LISTINGS_FEED_CACHE_TIMEOUT)
+    return value
+
+
+def get_feed_cache_stats():
+    """Returns the shared hit/miss counters for the feed cache."""
+    hits = cache.get(FEED_HITS_KEY, 0)
+    misses = cache.get(FEED_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+        'version': get_feed_version(),
+    }
@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+
+# Flush roughly this many characters per yielded chunk so streams aren't written row by row.
+CHUNK_CHARS = 64 * 1024
+
+FIELDS = ['id', 'title', 'description', 'price', 'seller', 'seller_email', 'created_at', 'version']
+
+
+def _dumps(row):
+    return json.dumps(row, ensure_ascii=False, separators=(',', ':'))
+
+
+def _buffered(pieces):
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_CHARS:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def iter_ndjson(records):
+    """One JSON object per line."""
+    return _buffered(_dumps(record.to_representation()) + '\n' for record in records)
+
+
+def iter_json(records):
+    """A single JSON array, emitted incrementally."""
+    def pieces():
+        yield '['
+        for i, record in enumerate(records):
+            yield (',' if i else '') + _dumps(record.to_representation())
+        yield ']\n'
+    return _buffered(pieces())
+
+
+def iter_csv(records):
+    """CSV with a header row."""
+    def pieces():
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record.to_representation())
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+        yield out.getvalue()
+    return _buffered(pieces())
+
+
+# format name -> (content type, file extension, chunk generator)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson', iter_ndjson),
+    'json': ('application/json', 'json', iter_json),
+    'csv': ('text/csv', 'csv', iter_csv),
+}
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.template.loader import get_template
+
+# Card layouts: name -> snippet template. A card renders from `listing` and `is_owner` only.
+CARD_TEMPLATES = {
+    'feed': 'listings/snippets/listing_card.html',
+    'profile': 'users/snippets/profile_listing_card.html',
+}
+
+
+def fragment_cache():
+    """The cache used for rendered fragments, the same one the {% cache %} tag picks."""
+    try:
+        return caches['template_fragments']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def card_key(layout, listing_id, updated_at, is_owner):
+    # Every listing write stamps updated_at, so an edited listing never matches an old key.
+    return f'listings:card:{layout}:{listing_id}:{int(updated_at.timestamp() * 1_000_000)}:{int(is_owner)}'
+
+
+def render_cards(layout, listings, user=None):
+    """
+    Returns the rendered card markup for each listing, in order. Cached cards are fetched
+    with one get_many() and the missing ones are rendered and stored with one set_many().
+    """
+    user_id = user.pk if user is not None and user.is_authenticated else None
+    keys = [
+        card_key(layout, listing.pk, listing.updated_at, listing.seller_id == user_id)
+        for listing in listings
+    ]
+    cache = fragment_cache()
+    cached = cache.get_many(keys)
+    if len(cached) == len(keys):
+        return [cached[key] for key in keys]
+
+    template = get_template(CARD_TEMPLATES[layout])
+    rendered = {}
+    for key, listing in zip(keys, listings):
+        if key not in cached and key not in rendered:
+            rendered[key] = template.render({'listing': listing, 'is_owner': listing.seller_id == user_id})
+    cache.set_many(rendered, timeout=settings.FRAGMENT_CACHE_TIMEOUT)
+    cached.update(rendered)
+    return [cached[key] for key in keys]
+
+
+def forget_cards(stamps):
+    """
+    Drops the cached cards of the given (listing id, updated_at) pairs in every layout.
+    Called by the listing services when a write replaces a stamp they already hold; other
+    writes only need the new updated_at, and the old entries expire on their own.
+    """
+    fragment_cache().delete_many([
+        card_key(layout, listing_id, updated_at, is_owner)
+        for listing_id, updated_at in stamps
+        for layout in CARD_TEMPLATES
+        for is_owner in (False, True)
+    ])
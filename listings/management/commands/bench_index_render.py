@@ -0,0 +1,75 @@
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from core.pagination import KeysetPage
+from listings import fragments, synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures how long the marketplace index page takes to render with many listing cards, "
+        "with an empty fragment cache (every card, navbar and footer rendered) and with a warm one. "
+        "Listings are built in memory, so no database is needed, and a private in-memory fragment "
+        "cache is used, so a shared FRAGMENT_CACHE_URL is never touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cards", type=int, default=1000, help="Listing cards on the page.")
+        parser.add_argument("--runs", type=int, default=20, help="Renders per scenario.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        now = timezone.now()
+        viewer = get_user_model()(pk=1, email="viewer@example.com")
+        listings = []
+        for pk in range(1, options["cards"] + 1):
+            # The viewer owns every tenth card, so both card variants are rendered.
+            listing = synthetic.make_listing(rng, 1 if pk % 10 == 0 else 2, now, 30, 0)
+            listing.pk = pk
+            listings.append(listing)
+        page = KeysetPage(listings, next_cursor="next")
+
+        caches = {**settings.CACHES, "template_fragments": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "bench-index-render",
+            "OPTIONS": {"MAX_ENTRIES": options["cards"] * 4 + 100},
+        }}
+        loaders = settings.TEMPLATES[0]["OPTIONS"].get("loaders")
+        self.stdout.write(f"{options['cards']} cards, {options['runs']} renders per scenario, loaders: {loaders}")
+        self.stdout.write(f"{'scenario':<24} {'p50 ms':>8} {'p95 ms':>8} {'KiB':>7}")
+        with override_settings(CACHES=caches):
+            for user in (AnonymousUser(), viewer):
+                label = "signed in" if user.is_authenticated else "anonymous"
+                for warm in (False, True):
+                    self.run_scenario(f"{label}, {'warm' if warm else 'cold'} cache", page, user, warm, options["runs"])
+
+    def run_scenario(self, label, page, user, warm, runs):
+        request = RequestFactory().get("/listings/")
+        request.user = user
+        context = {"listings": page, "filters": {}, "price_buckets": [], "error": None}
+        cache = fragments.fragment_cache()
+        cache.clear()
+        html = render_to_string("listings/index.html", context, request=request)
+
+        timings = []
+        for _ in range(runs):
+            if not warm:
+                cache.clear()
+            start = time.perf_counter()
+            render_to_string("listings/index.html", context, request=request)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, round(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{label:<24} {statistics.median(timings) * 1000:>8.1f} {p95 * 1000:>8.1f} {len(html) / 1024:>7.0f}"
+        )
@@ -0,0 +1,63 @@
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from listings.models import Listing
+from listings.records import ListingRecord
+from listings.serializers import ListingSerializer
+from listings.services import get_active_listings
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares ListingSerializer against the values()-based ListingRecord read path. "
+        "Rows are inserted inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+
+        with transaction.atomic():
+            seller = User.objects.create(email="bench-serialization@example.com")
+            Listing.objects.bulk_create(
+                Listing(seller=seller, title=f"Item {i}", description="Benchmark row " * 8, price=Decimal("19.99"))
+                for i in range(rows)
+            )
+
+            def serializer_path():
+                return ListingSerializer(get_active_listings(), many=True).data
+
+            def record_path():
+                queryset = get_active_listings().select_related(None).values_list(*ListingRecord.COLUMNS)
+                return [ListingRecord.from_row(row).to_representation() for row in queryset]
+
+            if serializer_path() != record_path():
+                self.stderr.write("Outputs differ; aborting.")
+                transaction.set_rollback(True)
+                return
+
+            baseline = self._best_of(serializer_path, repeat)
+            fast = self._best_of(record_path, repeat)
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{rows} rows, best of {repeat}:")
+        self.stdout.write(f"  ListingSerializer   {baseline * 1000:8.1f} ms")
+        self.stdout.write(f"  ListingRecord       {fast * 1000:8.1f} ms")
+        self.stdout.write(self.style.SUCCESS(f"  speedup             {baseline / fast:8.1f}x"))
+
+    def _best_of(self, fn, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from listings import services
+from listings.exports import EXPORT_FORMATS
+
+
+class Command(BaseCommand):
+    help = "Streams every active listing to a file or stdout as NDJSON, a JSON array or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson")
+        parser.add_argument("--output", "-o", help="File to write to (defaults to stdout).")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.LISTINGS_EXPORT_CHUNK_SIZE,
+            help="Rows fetched from the database per round trip.",
+        )
+
+    def handle(self, *args, **options):
+        _, _, iter_chunks = EXPORT_FORMATS[options["format"]]
+        records = services.iter_active_listing_records(chunk_size=options["chunk_size"])
+
+        if not options["output"]:
+            for chunk in iter_chunks(records):
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as f:
+            for chunk in iter_chunks(records):
+                f.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Exported listings to {options['output']}"))
@@ -0,0 +1,112 @@
+import json
+import os
+import random
+from urllib.parse import urlencode, urljoin
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.urls import reverse
+
+from core import loadtest
+from listings import synthetic
+from listings.models import Listing
+
+# label -> share of requests (out of the total weight)
+MIX = {
+    "web feed": 3,
+    "web feed filtered": 1,
+    "web search": 1,
+    "api feed": 4,
+    "api feed page 2": 2,
+    "api feed by price": 1,
+    "api detail": 6,
+    "api search": 1,
+    "api price facets": 1,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives a running server with a marketplace traffic mix (web pages and /api/marketplace/: "
+        "feed, filters, later pages, details, search, facets) from several client processes, and "
+        "reports throughput and p50/p95/p99 latency per endpoint. Seed data first with seed_marketplace."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("base_url", help="Server root, e.g. http://localhost:8000")
+        parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Client processes.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Connections per process.")
+        parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds.")
+        parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before measuring.")
+        parser.add_argument("--sample", type=int, default=200, help="Distinct listings and queries to request.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        base_url = options["base_url"].rstrip("/") + "/"
+        try:
+            targets = self.build_targets(rng, base_url, options["sample"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        latencies, errors = loadtest.run(
+            targets, processes=options["processes"], concurrency=options["concurrency"],
+            duration=options["duration"], warmup=options["warmup"],
+        )
+        if not latencies:
+            raise CommandError("No requests completed during the measured window.")
+        self.stdout.write(
+            f"{options['processes']} x {options['concurrency']} connections, {options['duration']:.0f}s measured"
+        )
+        loadtest.write_report(self.stdout, self.style, latencies, errors, options["duration"])
+
+    def build_targets(self, rng, base_url, sample):
+        """Returns the weighted, shuffled request list for one run."""
+        bounds = Listing.objects.filter(is_active=True).aggregate(low=Min("id"), high=Max("id"))
+        if bounds["low"] is None:
+            raise ValueError("There are no active listings; run seed_marketplace first.")
+        listing_ids = [self.active_id_near(rng.randint(bounds["low"], bounds["high"])) for _ in range(sample)]
+        terms = synthetic.search_terms(rng, sample)
+        prices = [(low, low * 4) for low in (5, 10, 25, 50, 100)]
+
+        web_feed = urljoin(base_url, reverse("listings:index").lstrip("/"))
+        api_feed = urljoin(base_url, reverse("listings_api:api_listings_list").lstrip("/"))
+        urls = {
+            "web feed": [web_feed],
+            "web feed filtered": [f"{web_feed}?{urlencode({'min_price': lo, 'max_price': hi})}" for lo, hi in prices],
+            "web search": [f"{web_feed}?{urlencode({'q': term})}" for term in terms],
+            "api feed": [api_feed],
+            "api feed page 2": [self.next_page(api_feed)],
+            "api feed by price": [f"{api_feed}?ordering=price_asc", f"{api_feed}?ordering=price_desc"],
+            "api detail": [
+                urljoin(base_url, reverse("listings_api:api_listings_detail", args=[pk]).lstrip("/"))
+                for pk in listing_ids
+            ],
+            "api search": [
+                urljoin(base_url, reverse("listings_api:api_listings_search").lstrip("/")) + f"?{urlencode({'q': t})}"
+                for t in terms
+            ],
+            "api price facets": [urljoin(base_url, reverse("listings_api:api_listings_price_facets").lstrip("/"))],
+        }
+
+        total_weight = sum(MIX.values())
+        size = max(sample, total_weight)
+        targets = []
+        for label, weight in MIX.items():
+            count = max(1, round(size * weight / total_weight))
+            targets += [loadtest.Target(label, urls[label][i % len(urls[label])]) for i in range(count)]
+        rng.shuffle(targets)
+        return targets
+
+    def active_id_near(self, pk):
+        found = Listing.objects.filter(is_active=True, id__gte=pk).order_by("id").values_list("id", flat=True).first()
+        return found or Listing.objects.filter(is_active=True).order_by("-id").values_list("id", flat=True).first()
+
+    def next_page(self, api_feed):
+        """Follows the feed's `next` link once, so later keyset pages are exercised too."""
+        try:
+            with urlopen(api_feed, timeout=30) as response:
+                return json.load(response)["next"] or api_feed
+        except (OSError, ValueError, KeyError) as e:
+            raise ValueError(f"Could not fetch {api_feed}: {e}")
@@ -0,0 +1,138 @@
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from allauth.account.models import EmailAddress
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from listings import cache as feed_cache
+from listings import search, synthetic
+from listings.models import Listing
+
+User = get_user_model()
+
+
+@contextmanager
+def explicit_timestamps():
+    """Lets bulk_create keep the generated created_at/updated_at instead of stamping now()."""
+    created_at, updated_at = Listing._meta.get_field('created_at'), Listing._meta.get_field('updated_at')
+    saved = created_at.auto_now_add, updated_at.auto_now
+    created_at.auto_now_add = updated_at.auto_now = False
+    try:
+        yield
+    finally:
+        created_at.auto_now_add, updated_at.auto_now = saved
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a realistic-scale marketplace: verified users sharing one pre-hashed password "
+        "and listings spread over the last months, written with batched bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1_000, help="Users to create.")
+        parser.add_argument("--listings", type=int, default=100_000, help="Listings to create.")
+        parser.add_argument("--batch-size", type=int, default=5_000, help="Rows per transaction.")
+        parser.add_argument("--password", default="SeedPassword123!", help="Password of every seeded user.")
+        parser.add_argument("--email-prefix", default="seed-user-", help="Seeded e-mails are <prefix><n>@example.com.")
+        parser.add_argument("--max-age-days", type=int, default=180, help="Spread created_at over this many days.")
+        parser.add_argument("--inactive-ratio", type=float, default=0.05, help="Share of inactive listings.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed gives the same data.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        start = time.perf_counter()
+
+        seller_ids = self.create_users(options, batch_size)
+        if options["listings"] and not seller_ids:
+            raise CommandError(f"No users to own listings; pass --users or seed {options['email_prefix']}* users first.")
+        users_done = time.perf_counter()
+
+        counts = self.create_listings(rng, seller_ids, options, batch_size)
+        self.update_counters(counts)
+        feed_cache.bump_feed_version()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {options['users']} users and {options['listings']} listings in {elapsed:.1f}s"
+        ))
+        self.stdout.write(f"  users     {users_done - start:7.1f}s")
+        if options["listings"]:
+            listing_time = elapsed - (users_done - start)
+            self.stdout.write(
+                f"  listings  {listing_time:7.1f}s ({options['listings'] / listing_time:,.0f} rows/s)"
+            )
+        self.stdout.write(f"  log in as {options['email_prefix']}0@example.com / {options['password']}")
+
+    def create_users(self, options, batch_size):
+        """Creates the users and returns the ids of every seeded user (new and existing)."""
+        prefix = options["email_prefix"]
+        existing = User.objects.filter(email__startswith=prefix)
+        offset = existing.count()
+        # One PBKDF2 run for everybody instead of one per user.
+        password = make_password(options["password"])
+        for batch_start in range(0, options["users"], batch_size):
+            numbers = range(offset + batch_start, offset + min(batch_start + batch_size, options["users"]))
+            with transaction.atomic():
+                users = User.objects.bulk_create(
+                    [User(email=f"{prefix}{n}@example.com", password=password, email_verified=True) for n in numbers],
+                    batch_size=batch_size,
+                )
+                if users[0].pk is None:
+                    # Backends without INSERT ... RETURNING: look the new ids up.
+                    by_email = dict(
+                        User.objects.filter(email__in=[user.email for user in users]).values_list("email", "pk")
+                    )
+                    for user in users:
+                        user.pk = by_email[user.email]
+                EmailAddress.objects.bulk_create(
+                    [EmailAddress(user_id=user.pk, email=user.email, primary=True, verified=True) for user in users],
+                    batch_size=batch_size,
+                )
+        return list(existing.order_by("pk").values_list("pk", flat=True))
+
+    def create_listings(self, rng, seller_ids, options, batch_size):
+        """Inserts the listings in batches and returns per-seller (total, active) counts."""
+        counts = Counter()
+        now = timezone.now()
+        total = options["listings"]
+        with explicit_timestamps():
+            for batch_start in range(0, total, batch_size):
+                listings = [
+                    synthetic.make_listing(
+                        rng, rng.choice(seller_ids), now, options["max_age_days"], options["inactive_ratio"],
+                    )
+                    for _ in range(min(batch_size, total - batch_start))
+                ]
+                with transaction.atomic():
+                    listings = Listing.objects.bulk_create(listings, batch_size=settings.LISTINGS_BULK_BATCH_SIZE)
+                    search.index_listings(listings)
+                for listing in listings:
+                    counts[listing.seller_id, "total"] += 1
+                    counts[listing.seller_id, "active"] += listing.is_active
+                done = batch_start + len(listings)
+                if done % (batch_size * 20) == 0 or done == total:
+                    self.stdout.write(f"  {done:,}/{total:,} listings")
+        return counts
+
+    def update_counters(self, counts):
+        """Bumps listing_count/active_listing_count with one UPDATE per distinct (total, active) pair."""
+        by_delta = {}
+        for (seller_id, kind), value in counts.items():
+            if kind == "total":
+                by_delta.setdefault((value, counts[seller_id, "active"]), []).append(seller_id)
+        with transaction.atomic():
+            for (total, active), ids in by_delta.items():
+                User.objects.filter(pk__in=ids).update(
+                    listing_count=F("listing_count") + total,
+                    active_listing_count=F("active_listing_count") + active,
+                )
@@ -0,0 +1,64 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE listings_listing ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION listings_listing_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER listings_listing_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON listings_listing
+    FOR EACH ROW EXECUTE FUNCTION listings_listing_search_vector_update()
+    """,
+    "UPDATE listings_listing SET title = title",
+    "CREATE INDEX listing_search_vector_idx ON listings_listing USING gin (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP TRIGGER IF EXISTS listings_listing_search_vector_trigger ON listings_listing",
+    "DROP FUNCTION IF EXISTS listings_listing_search_vector_update()",
+    "ALTER TABLE listings_listing DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE listings_listing_fts
+    USING fts5(title, description, tokenize = 'porter unicode61')
+    """,
+    """
+    INSERT INTO listings_listing_fts (rowid, title, description)
+    SELECT id, title, description FROM listings_listing
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS listings_listing_fts",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0004_listing_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            _run({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -7,7 +7,29 @@ class Listing(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="listings")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Bumped on every edit; clients send it back so concurrent edits are detected.
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            # Serves the active feed (newest first, id as keyset tiebreaker). Partial on
+            # is_active so it stays small and matches the bare boolean predicate Django emits.
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='listing_active_feed_idx',
+            ),
+            # Serves price-range filters and price ordering over the active feed.
+            models.Index(
+                fields=['price', 'id'],
+                condition=models.Q(is_active=True),
+                name='listing_active_price_idx',
+            ),
+            # Serves a seller's own listings on the profile page, newest first, keyset on id.
+            models.Index(fields=['seller', '-created_at', '-id'], name='listing_seller_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - ${self.price}"
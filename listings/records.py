@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+from django.utils import timezone
+
+TWO_PLACES = Decimal('0.01')
+
+
+def _format_price(value):
+    # Same output as DRF's DecimalField(max_digits=10, decimal_places=2).
+    return f'{value.quantize(TWO_PLACES):f}'
+
+
+def _format_datetime(value):
+    # Same output as DRF's ISO 8601 DateTimeField under USE_TZ.
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+class ListingRecord:
+    """
+    Lightweight read-only listing row loaded with values_list().
+    `to_representation` produces exactly what ListingSerializer would for the same row,
+    without building model instances or running per-field serializer machinery.
+    """
+    __slots__ = ('id', 'title', 'description', 'price', 'seller', 'seller_email', 'created_at', 'version')
+
+    # Columns to fetch, in constructor order.
+    COLUMNS = ('id', 'title', 'description', 'price', 'seller_id', 'seller__email', 'created_at', 'version')
+
+    def __init__(self, id, title, description, price, seller, seller_email, created_at, version):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.price = price
+        self.seller = seller
+        self.seller_email = seller_email
+        self.created_at = created_at
+        self.version = version
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+    @property
+    def pk(self):
+        return self.id
+
+    def to_representation(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'price': _format_price(self.price),
+            'seller': self.seller,
+            'seller_email': self.seller_email,
+            'created_at': _format_datetime(self.created_at),
+            'version': self.version,
+        }
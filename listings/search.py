@@ -0,0 +1,79 @@
+"""
+Full-text search over listing titles and descriptions.
+
+PostgreSQL keeps a weighted `search_vector` tsvector column up to date with a trigger
+and answers queries from a GIN index. SQLite mirrors titles and descriptions into an
+FTS5 virtual table, which the listing services keep in sync on every write.
+"""
+import re
+
+from django.db import connection
+
+FTS_TABLE = 'listings_listing_fts'
+
+
+def _fts5_match_expression(query):
+    """Turns free text into a safe FTS5 expression: every word must match, as a prefix."""
+    tokens = re.findall(r'\w+', query)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_listing_ids(query, limit, offset=0):
+    """Returns ids of active listings matching query, best match first."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                """
+                SELECT id FROM listings_listing,
+                     websearch_to_tsquery('english', %s) AS query
+                WHERE is_active AND search_vector @@ query
+                ORDER BY ts_rank(search_vector, query) DESC, created_at DESC, id DESC
+                LIMIT %s OFFSET %s
+                """,
+                [query, limit, offset],
+            )
+        else:
+            expression = _fts5_match_expression(query)
+            if not expression:
+                return []
+            cursor.execute(
+                f"""
+                SELECT l.id FROM {FTS_TABLE} AS f
+                JOIN listings_listing AS l ON l.id = f.rowid
+                WHERE {FTS_TABLE} MATCH %s AND l.is_active
+                ORDER BY bm25({FTS_TABLE}, 10.0, 1.0), l.created_at DESC, l.id DESC
+                LIMIT %s OFFSET %s
+                """,
+                [expression, limit, offset],
+            )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def index_listing(listing):
+    """Adds or refreshes a listing in the SQLite FTS5 table (PostgreSQL uses a trigger)."""
+    index_listings([listing])
+
+
+def index_listings(listings):
+    """Adds or refreshes many listings in the SQLite FTS5 table with batched statements."""
+    if connection.vendor != 'sqlite' or not listings:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [[listing.pk] for listing in listings])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description) VALUES (%s, %s, %s)",
+            [[listing.pk, listing.title, listing.description] for listing in listings],
+        )
+
+
+def unindex_listing(listing_id):
+    """Removes a listing from the SQLite FTS5 table (PostgreSQL uses a trigger)."""
+    unindex_listings([listing_id])
+
+
+def unindex_listings(listing_ids):
+    """Removes many listings from the SQLite FTS5 table with one batched statement."""
+    if connection.vendor != 'sqlite' or not listing_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [[pk] for pk in listing_ids])
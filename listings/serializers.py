@@ -6,5 +6,13 @@ class ListingSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Listing
-        fields = ['id', 'title', 'description', 'price', 'seller', 'seller_email', 'created_at']
+        fields = ['id', 'title', 'description', 'price', 'seller', 'seller_email', 'created_at', 'version']
         read_only_fields = ['seller', 'created_at']
+
+class ListingBulkUpdateSerializer(ListingSerializer):
+    """Bulk edit item: a listing id plus the fields to change."""
+    id = serializers.IntegerField()
+    version = serializers.IntegerField(required=False, min_value=1)
+
+class ListingBulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
@@ -1,10 +1,162 @@
+from decimal import Decimal, InvalidOperation
+from asgiref.sync import sync_to_async
 from .models import Listing
+from django.conf import settings
 from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from core.pagination import apaginate_keyset, clamp_page_size, decode_cursor, paginate_keyset
+from users.services import aadjust_listing_counts, adjust_listing_counts
+from . import cache as feed_cache
+from . import fragments
+from . import search
+from .records import ListingRecord
 
+# Feed orderings exposed to clients: name -> (keyset field, descending)
+LISTING_ORDERINGS = {
+    'newest': ('created_at', True),
+    'price_asc': ('price', False),
+    'price_desc': ('price', True),
+}
 
-def get_active_listings():
-    """Returns all currently active listings ordered by creation date."""
-    return Listing.objects.filter(is_active=True).select_related('seller').order_by('-created_at')
+
+class ListingVersionConflict(Exception):
+    """Raised when a listing changed after the client read the version it is editing."""
+
+
+def parse_listing_filters(min_price=None, max_price=None, ordering=None):
+    """Validates raw feed filter values. Raises ValueError on bad input."""
+    filters = {'ordering': ordering or 'newest'}
+    if filters['ordering'] not in LISTING_ORDERINGS:
+        raise ValueError(f"Ordering must be one of: {', '.join(LISTING_ORDERINGS)}.")
+    for name, value in (('min_price', min_price), ('max_price', max_price)):
+        if value in (None, ''):
+            filters[name] = None
+            continue
+        try:
+            filters[name] = Decimal(str(value))
+        except InvalidOperation:
+            raise ValueError(f"{name} must be a number.")
+        if not filters[name].is_finite() or filters[name] < 0:
+            raise ValueError(f"{name} must be a non-negative number.")
+    return filters
+
+def feed_page_key(cursor=None, page_size=None, min_price=None, max_price=None, ordering=None):
+    """
+    Validates a feed page request and returns its canonical parts (cursor position, page
+    size, ordering, price bounds) for cache keys and ETags, so raw query strings never reach
+    the cache and equivalent spellings share an entry. Raises ValueError on bad input.
+    """
+    filters = parse_listing_filters(min_price, max_price, ordering)
+    key, _ = LISTING_ORDERINGS[filters['ordering']]
+    position = ''
+    if cursor:
+        direction, value, pk = decode_cursor(cursor, Listing, key)
+        position = f"{direction}.{value.isoformat() if hasattr(value, 'isoformat') else value}.{pk}"
+    prices = [None if price is None else price.normalize() for price in (filters['min_price'], filters['max_price'])]
+    return (position, clamp_page_size(page_size), filters['ordering'], *prices)
+
+def get_active_listings(min_price=None, max_price=None):
+    """Returns all currently active listings ordered by creation date, optionally within a price range."""
+    listings = Listing.objects.filter(is_active=True).select_related('seller').order_by('-created_at')
+    if min_price is not None:
+        listings = listings.filter(price__gte=min_price)
+    if max_price is not None:
+        listings = listings.filter(price__lte=max_price)
+    return listings
+
+def get_active_listings_page(cursor=None, page_size=None, min_price=None, max_price=None, ordering=None):
+    """
+    Returns one keyset page of active listings, served from the versioned feed
+    cache when possible. Raises ValueError if the cursor or filters are malformed.
+    """
+    parts = feed_page_key(cursor, page_size, min_price, max_price, ordering)
+    _, page_size, ordering, min_price, max_price = parts
+    key, descending = LISTING_ORDERINGS[ordering]
+    return feed_cache.get_or_build(
+        'page',
+        lambda: paginate_keyset(
+            get_active_listings(min_price, max_price),
+            cursor=cursor, page_size=page_size, key=key, descending=descending,
+        ),
+        *parts,
+    )
+
+def get_active_listing_records_page(cursor=None, page_size=None, min_price=None, max_price=None, ordering=None):
+    """
+    Read-only fast path for `get_active_listings_page`: fetches only the serialized
+    columns with values_list() and returns a keyset page of ListingRecord rows.
+    """
+    queryset, key, descending = _active_records_queryset(min_price, max_price, ordering)
+    return paginate_keyset(
+        queryset, cursor=cursor, page_size=clamp_page_size(page_size), key=key, descending=descending,
+        row_factory=ListingRecord.from_row,
+    )
+
+def _active_records_queryset(min_price, max_price, ordering):
+    filters = parse_listing_filters(min_price, max_price, ordering)
+    key, descending = LISTING_ORDERINGS[filters['ordering']]
+    queryset = (
+        get_active_listings(filters['min_price'], filters['max_price'])
+        .select_related(None)
+        .values_list(*ListingRecord.COLUMNS)
+    )
+    return queryset, key, descending
+
+def iter_active_listing_records(chunk_size=None):
+    """
+    Streams every active listing as a ListingRecord in id order. Rows are fetched
+    chunk_size at a time (server-side cursors on PostgreSQL), so memory stays flat.
+    """
+    queryset = (
+        Listing.objects.filter(is_active=True)
+        .order_by('id')
+        .values_list(*ListingRecord.COLUMNS)
+    )
+    for row in queryset.iterator(chunk_size=chunk_size or settings.LISTINGS_EXPORT_CHUNK_SIZE):
+        yield ListingRecord.from_row(row)
+
+def get_price_histogram():
+    """
+    Returns active listing counts per price bucket (settings.LISTINGS_PRICE_BUCKETS),
+    computed in one aggregate query and cached alongside the feed.
+    """
+    return feed_cache.get_or_build('facets', _build_price_histogram, 'price')
+
+def _build_price_histogram():
+    bounds = [Decimal(str(bound)) for bound in settings.LISTINGS_PRICE_BUCKETS]
+    buckets = list(zip(bounds, bounds[1:] + [None]))
+    aggregates = {}
+    for i, (low, high) in enumerate(buckets):
+        condition = Q(price__gte=low) if high is None else Q(price__gte=low, price__lt=high)
+        aggregates[f'bucket_{i}'] = Count('id', filter=condition)
+    counts = Listing.objects.filter(is_active=True).aggregate(**aggregates)
+    return [
+        {
+            'min': f"{low:.2f}",
+            'max': f"{high:.2f}" if high is not None else None,
+            'count': counts[f'bucket_{i}'],
+        }
+        for i, (low, high) in enumerate(buckets)
+    ]
+
+def search_listings(query, page=1, page_size=None):
+    """
+    Returns (listings, has_more) for one page of active listings matching query,
+    ranked by relevance. Raises ValueError if page is not a number.
+    """
+    page_size = clamp_page_size(page_size)
+    page = max(int(page), 1)
+    query = (query or '').strip()
+    if not query:
+        return [], False
+
+    ids = search.search_listing_ids(query, limit=page_size + 1, offset=(page - 1) * page_size)
+    has_more = len(ids) > page_size
+    ids = ids[:page_size]
+    by_id = Listing.objects.select_related('seller').in_bulk(ids)
+    return [by_id[pk] for pk in ids if pk in by_id], has_more
 
 def create_listing(seller, title, description, price):
     """Creates a new listing with the given seller and details."""
@@ -14,53 +166,305 @@ def create_listing(seller, title, description, price):
     if float(price) <= 0:
         raise ValueError("Price must be greater than zero.")
     
-    listing = Listing.objects.create(
-        seller=seller,
-        title=title,
-        description=description,
-        price=price
-    )
+    with transaction.atomic():
+        listing = Listing.objects.create(
+            seller=seller,
+            title=title,
+            description=description,
+            price=price
+        )
+        adjust_listing_counts(seller.pk, total=1, active=int(listing.is_active))
+        search.index_listing(listing)
+        transaction.on_commit(feed_cache.bump_feed_version)
     return listing
 
 def get_listing_by_id(listing_id):
     """Fetches a specific listing by its ID."""
     return Listing.objects.filter(id=listing_id).select_related('seller').first()
 
-def update_listing(user, listing_id, title=None, description=None, price=None):
-    """Updates a listing only if the user is the seller."""
+def get_listing_record_and_updated_at(listing_id):
+    """
+    Fetches a listing as a ListingRecord together with when it was last modified, in one
+    query, so conditional GETs need no second lookup. Returns (None, None) if it does not exist.
+    """
+    row = Listing.objects.filter(id=listing_id).values_list(*ListingRecord.COLUMNS, 'updated_at').first()
+    if row is None:
+        return None, None
+    return ListingRecord.from_row(row[:-1]), row[-1]
+
+def update_listing(user, listing_id=None, title=None, description=None, price=None, version=None, listing=None):
+    """
+    Updates a listing only if the user is the seller.
+    The write is a single conditional UPDATE of the changed columns; if version is given
+    and no longer matches, ListingVersionConflict is raised instead of overwriting.
+    Callers that already loaded the listing can pass it as `listing`: it is updated in place,
+    its version is the expected one unless another is given, and no row is re-read.
+    """
     if not user or not user.is_authenticated:
         raise PermissionDenied("Authentication is required to modify a listing.")
-        
-    listing = get_listing_by_id(listing_id)
-    if not listing:
-        raise ValueError("Listing not found.")
-    
-    if listing.seller != user:
-        raise PermissionDenied("You are not authorized to modify this listing.")
 
+    if listing is not None:
+        listing_id = listing.pk
+        if version is None:
+            version = listing.version
+
+    changes = _listing_changes(title, description, price)
+    now = timezone.now()
+    queryset = Listing.objects.filter(id=listing_id, seller_id=user.pk)
+    if version is not None:
+        queryset = queryset.filter(version=version)
+    with transaction.atomic():
+        updated = queryset.update(**changes, version=F('version') + 1, updated_at=now)
+
+        if not updated:
+            # Only the failure path pays for a second query to report why nothing matched.
+            _raise_update_failure(
+                Listing.objects.filter(id=listing_id).values_list('seller_id', flat=True).first(), user
+            )
+
+        if listing is None:
+            listing = Listing.objects.get(pk=listing_id)
+        else:
+            fragments.forget_cards([(listing.pk, listing.updated_at)])
+            for field, value in changes.items():
+                setattr(listing, field, value)
+            listing.version = int(version) + 1
+            listing.updated_at = now
+        listing.seller = user
+        if 'title' in changes or 'description' in changes:
+            search.index_listing(listing)
+        transaction.on_commit(feed_cache.bump_feed_version)
+    return listing
+
+def _listing_changes(title, description, price):
+    changes = {}
     if title is not None:
-        listing.title = title
+        changes['title'] = title
     if description is not None:
-        listing.description = description
+        changes['description'] = description
     if price is not None:
         if float(price) <= 0:
             raise ValueError("Price must be greater than zero.")
-        listing.price = price
-        
-    listing.save()
-    return listing
+        changes['price'] = price
+    return changes
+
+def _raise_update_failure(seller_id, user):
+    """Explains why a conditional listing UPDATE matched no row."""
+    if seller_id is None:
+        raise ValueError("Listing not found.")
+    if seller_id != user.pk:
+        raise PermissionDenied("You are not authorized to modify this listing.")
+    raise ListingVersionConflict("This listing was modified by someone else. Reload it and try again.")
 
 def delete_listing(user, listing_id):
-    """Deletes a listing only if the user is the seller."""
+    """
+    Deletes a listing only if the user is the seller, with a single
+    DELETE ... WHERE id AND seller_id. Returns the number of listings deleted.
+    """
     if not user or not user.is_authenticated:
         raise PermissionDenied("Authentication is required to delete a listing.")
-        
-    listing = get_listing_by_id(listing_id)
-    if not listing:
+
+    with transaction.atomic():
+        deleted = _delete_counted(Listing.objects.filter(id=listing_id, seller_id=user.pk), user.pk)
+        if deleted:
+            search.unindex_listing(listing_id)
+            transaction.on_commit(feed_cache.bump_feed_version)
+    if not deleted:
+        if Listing.objects.filter(id=listing_id).exists():
+            raise PermissionDenied("You are not authorized to delete this listing.")
         raise ValueError("Listing not found.")
-        
-    if listing.seller != user:
-        raise PermissionDenied("You are not authorized to delete this listing.")
-        
-    listing.delete()
-    return True
+    return deleted
+
+def _delete_counted(queryset, seller_id):
+    """
+    Deletes one listing and updates the seller's counters. Active listings, the usual
+    case, go first, so the row's is_active is known without reading it beforehand.
+    """
+    active, _ = queryset.filter(is_active=True).delete()
+    deleted = active or queryset.delete()[0]
+    adjust_listing_counts(seller_id, total=-deleted, active=-active)
+    return deleted
+
+def _validate_price(price, errors):
+    if price is not None and float(price) <= 0:
+        errors['price'] = ["Price must be greater than zero."]
+
+def bulk_create_listings(seller, items, batch_size=None):
+    """
+    Creates many listings for seller in a single transaction with batched INSERTs.
+    Returns (listings, errors); errors lines up with items and nothing is written if any item fails.
+    """
+    if not seller or not seller.is_authenticated:
+        raise PermissionDenied("Authentication is required to create a listing.")
+
+    errors = []
+    for item in items:
+        item_errors = {}
+        _validate_price(item.get('price'), item_errors)
+        errors.append(item_errors)
+    if any(errors):
+        return [], errors
+
+    listings = [
+        Listing(seller=seller, title=item['title'], description=item['description'], price=item['price'])
+        for item in items
+    ]
+    with transaction.atomic():
+        listings = Listing.objects.bulk_create(listings, batch_size=batch_size or settings.LISTINGS_BULK_BATCH_SIZE)
+        adjust_listing_counts(
+            seller.pk, total=len(listings), active=sum(listing.is_active for listing in listings)
+        )
+        search.index_listings(listings)
+    feed_cache.bump_feed_version()
+    return listings, errors
+
+def bulk_update_listings(user, items, batch_size=None):
+    """
+    Updates many of the user's listings in a single transaction with batched UPDATEs.
+    Each item carries an 'id' plus any of title, description and price.
+    Returns (listings, errors); errors lines up with items and nothing is written if any item fails.
+    """
+    if not user or not user.is_authenticated:
+        raise PermissionDenied("Authentication is required to modify a listing.")
+
+    with transaction.atomic():
+        ids = [item.get('id') for item in items]
+        existing = Listing.objects.select_for_update().select_related('seller').in_bulk(
+            [pk for pk in ids if pk is not None]
+        )
+        errors = []
+        listings = []
+        stale_cards = []
+        fields = {'updated_at', 'version'}
+        now = timezone.now()
+        for pk, item in zip(ids, items):
+            item_errors = {}
+            listing = existing.get(pk)
+            if pk is None:
+                item_errors['id'] = ["This field is required."]
+            elif listing is None:
+                item_errors['id'] = ["Listing not found."]
+            elif listing.seller_id != user.pk:
+                item_errors['id'] = ["You are not authorized to modify this listing."]
+            elif item.get('version') is not None and item['version'] != listing.version:
+                item_errors['version'] = ["This listing was modified by someone else."]
+            _validate_price(item.get('price'), item_errors)
+            errors.append(item_errors)
+            if item_errors:
+                continue
+            stale_cards.append((listing.pk, listing.updated_at))
+            for field in ('title', 'description', 'price'):
+                if item.get(field) is not None:
+                    setattr(listing, field, item[field])
+                    fields.add(field)
+            listing.updated_at = now
+            listing.version += 1
+            listings.append(listing)
+
+        if any(errors):
+            return [], errors
+
+        Listing.objects.bulk_update(
+            listings, sorted(fields), batch_size=batch_size or settings.LISTINGS_BULK_BATCH_SIZE
+        )
+        search.index_listings(listings)
+    fragments.forget_cards(stale_cards)
+    feed_cache.bump_feed_version()
+    return listings, errors
+
+def bulk_delete_listings(user, listing_ids):
+    """
+    Deletes many of the user's listings with a single DELETE scoped to the seller.
+    Returns (deleted_count, errors); errors lines up with listing_ids and nothing is deleted if any id fails.
+    """
+    if not user or not user.is_authenticated:
+        raise PermissionDenied("Authentication is required to delete a listing.")
+
+    with transaction.atomic():
+        owned = dict(
+            Listing.objects.select_for_update().filter(seller=user, id__in=listing_ids).values_list('id', 'is_active')
+        )
+        errors = [{} if pk in owned else {'id': ["Listing not found."]} for pk in listing_ids]
+        if any(errors):
+            return 0, errors
+
+        search.unindex_listings(list(owned))
+        deleted, _ = Listing.objects.filter(seller=user, id__in=owned).delete()
+        adjust_listing_counts(user.pk, total=-deleted, active=-sum(owned.values()))
+    feed_cache.bump_feed_version()
+    return deleted, errors
+
+
+# Async counterparts used by the ASGI API views. They use the async ORM directly;
+# only the SQLite search index, which runs raw cursor statements, is handed to a thread.
+# The async ORM has no atomic(), so a listing write and its counter UPDATE run back to back.
+
+async def aget_active_listing_records_page(cursor=None, page_size=None, min_price=None, max_price=None, ordering=None):
+    """Async counterpart of `get_active_listing_records_page`."""
+    queryset, key, descending = _active_records_queryset(min_price, max_price, ordering)
+    return await apaginate_keyset(
+        queryset, cursor=cursor, page_size=clamp_page_size(page_size), key=key, descending=descending,
+        row_factory=ListingRecord.from_row,
+    )
+
+async def aget_listing_record_and_updated_at(listing_id):
+    """Async counterpart of `get_listing_record_and_updated_at`."""
+    row = await Listing.objects.filter(id=listing_id).values_list(*ListingRecord.COLUMNS, 'updated_at').afirst()
+    if row is None:
+        return None, None
+    return ListingRecord.from_row(row[:-1]), row[-1]
+
+async def acreate_listing(seller, title, description, price):
+    """Async counterpart of `create_listing`."""
+    if not seller or not seller.is_authenticated:
+        raise PermissionDenied("Authentication is required to create a listing.")
+
+    if float(price) <= 0:
+        raise ValueError("Price must be greater than zero.")
+
+    listing = await Listing.objects.acreate(seller=seller, title=title, description=description, price=price)
+    await aadjust_listing_counts(seller.pk, total=1, active=int(listing.is_active))
+    await sync_to_async(search.index_listing)(listing)
+    await feed_cache.abump_feed_version()
+    return listing
+
+async def aupdate_listing(user, listing_id, title=None, description=None, price=None, version=None):
+    """Async counterpart of `update_listing`."""
+    if not user or not user.is_authenticated:
+        raise PermissionDenied("Authentication is required to modify a listing.")
+
+    changes = _listing_changes(title, description, price)
+    queryset = Listing.objects.filter(id=listing_id, seller_id=user.pk)
+    if version is not None:
+        queryset = queryset.filter(version=version)
+    updated = await queryset.aupdate(**changes, version=F('version') + 1, updated_at=timezone.now())
+
+    if not updated:
+        _raise_update_failure(
+            await Listing.objects.filter(id=listing_id).values_list('seller_id', flat=True).afirst(), user
+        )
+
+    listing = await Listing.objects.aget(pk=listing_id)
+    listing.seller = user
+    if 'title' in changes or 'description' in changes:
+        await sync_to_async(search.index_listing)(listing)
+    await feed_cache.abump_feed_version()
+    return listing
+
+async def adelete_listing(user, listing_id):
+    """Async counterpart of `delete_listing`."""
+    if not user or not user.is_authenticated:
+        raise PermissionDenied("Authentication is required to delete a listing.")
+
+    queryset = Listing.objects.filter(id=listing_id, seller_id=user.pk)
+    active, _ = await queryset.filter(is_active=True).adelete()
+    deleted = active or (await queryset.adelete())[0]
+    if not deleted:
+        if await Listing.objects.filter(id=listing_id).aexists():
+            raise PermissionDenied("You are not authorized to delete this listing.")
+        raise ValueError("Listing not found.")
+
+    await aadjust_listing_counts(user.pk, total=-deleted, active=-active)
+    await sync_to_async(search.unindex_listing)(listing_id)
+    await feed_cache.abump_feed_version()
+    return deleted
@@ -0,0 +1,59 @@
+"""
+Synthetic marketplace data for `seed_marketplace` and `loadtest_marketplace`.
+Everything is drawn from a seeded random.Random, so a given seed always produces the same rows.
+"""
+import math
+from datetime import timedelta
+from decimal import Decimal
+
+from .models import Listing
+
+ADJECTIVES = (
+    'vintage', 'compact', 'wireless', 'handmade', 'refurbished', 'leather', 'wooden', 'portable',
+    'ergonomic', 'classic', 'electric', 'folding', 'waterproof', 'antique', 'modern', 'solid',
+    'lightweight', 'premium', 'used', 'brand-new', 'rustic', 'stainless', 'smart', 'mini',
+)
+NOUNS = (
+    'bicycle', 'camera', 'guitar', 'desk', 'lamp', 'sofa', 'headphones', 'jacket', 'backpack',
+    'monitor', 'keyboard', 'bookshelf', 'kettle', 'tent', 'watch', 'drone', 'stroller', 'mirror',
+    'speaker', 'blender', 'skateboard', 'printer', 'chair', 'vase', 'rug', 'telescope', 'tablet',
+)
+PHRASES = (
+    'Barely used and in great condition.', 'Pick up only.', 'Comes with the original box.',
+    'Minor scratches, fully working.', 'Price is negotiable.', 'Selling because I am moving.',
+    'Includes charger and manual.', 'Smoke-free home.', 'Can ship within the country.',
+    'Recently serviced.', 'Bought last year, rarely used.', 'First come, first served.',
+)
+
+
+def listing_title(rng):
+    return f'{rng.choice(ADJECTIVES).capitalize()} {rng.choice(NOUNS)}'
+
+
+def listing_description(rng):
+    return ' '.join(rng.sample(PHRASES, rng.randint(1, 4)))
+
+
+def listing_price(rng):
+    # Log-normal around ~40 with a long tail, like real classifieds.
+    value = min(math.exp(rng.gauss(3.7, 1.2)), 99_999_999)
+    return Decimal(max(value, 1)).quantize(Decimal('0.01'))
+
+
+def make_listing(rng, seller_id, now, max_age_days, inactive_ratio):
+    """An unsaved Listing with an explicit created_at spread over the last max_age_days."""
+    created_at = now - timedelta(seconds=rng.uniform(0, max_age_days * 86400))
+    return Listing(
+        seller_id=seller_id,
+        title=listing_title(rng),
+        description=listing_description(rng),
+        price=listing_price(rng),
+        is_active=rng.random() >= inactive_ratio,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def search_terms(rng, count):
+    """Queries that match seeded titles, for driving the search endpoints."""
+    return [rng.choice(NOUNS if i % 2 else ADJECTIVES) for i in range(count)]
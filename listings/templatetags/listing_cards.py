@@ -0,0 +1,12 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from listings import fragments
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def listing_cards(context, listings, layout='feed'):
+    """Renders a page of listing cards from the fragment cache: {% listing_cards listings "feed" %}."""
+    return mark_safe(''.join(fragments.render_cards(layout, listings, context.get('user'))))
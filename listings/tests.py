@@ -1,9 +1,20 @@
+import csv
+import io
+import json
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from unittest import mock, skipUnless
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import DatabaseError, connection
 from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from listings import fragments, search, serializers, services
 from listings.models import Listing
+from listings.cache import get_feed_cache_stats
 
 User = get_user_model()
 
@@ -16,6 +27,7 @@ class BaseListingTest:
     """
     def setUp(self):
         super().setUp()
+        cache.clear()
         self.user_a = User.objects.create_user(email=f'usera_{self.__class__.__name__.lower()}@example.com', password='StrongPassword123!')
         EmailAddress.objects.create(user=self.user_a, email=self.user_a.email, primary=True, verified=True)
         
@@ -57,6 +69,9 @@ class BaseListingTest:
     def assert_invalid_data(self, response):
         raise NotImplementedError
 
+    def assert_conflict(self, response):
+        raise NotImplementedError
+
     # Shared Tests
     def test_create_listing(self):
         """Generic test for creating a listing."""
@@ -76,6 +91,15 @@ class BaseListingTest:
         listing.refresh_from_db()
         self.assertEqual(listing.title, 'New')
 
+    def test_stale_version_conflict(self):
+        """An edit based on an outdated version is rejected instead of overwriting."""
+        listing = Listing.objects.create(seller=self.user_a, title='Old', price='5.00')
+        self.authenticate(self.user_a)
+        self.assert_success_update(self.perform_update(listing.id, {'title': 'First', 'price': '5.00', 'version': 1}))
+        self.assert_conflict(self.perform_update(listing.id, {'title': 'Second', 'price': '5.00', 'version': 1}))
+        listing.refresh_from_db()
+        self.assertEqual((listing.title, listing.version), ('First', 2))
+
     def test_delete_listing(self):
         """Generic test for deleting a listing."""
         listing = Listing.objects.create(seller=self.user_a, title='Bye', price='5.00')
@@ -171,6 +195,9 @@ class ListingAPITests(BaseListingTest, APITestCase):
     def assert_invalid_data(self, response):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def assert_conflict(self, response):
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
     def test_real_jwt_authentication(self):
         """Verify API correctly processes actual JWT cookies, not just force_authenticate overrides."""
         self.client.force_authenticate(user=None) # Ensure no override is active
@@ -199,10 +226,169 @@ class ListingAPITests(BaseListingTest, APITestCase):
         url = reverse('listings_api:api_listings_list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
-        titles = [item['title'] for item in response.data]
+        titles = [item['title'] for item in response.data['results']]
         self.assertIn('Active API Item', titles)
         self.assertNotIn('Inactive API Item', titles)
 
+    def test_list_listings_cursor_pagination(self):
+        """Test the API feed walks forwards and backwards through keyset pages."""
+        for i in range(5):
+            Listing.objects.create(seller=self.user_a, title=f'Paged {i}', price='10.00')
+        url = reverse('listings_api:api_listings_list')
+
+        first = self.client.get(url, {'page_size': 2})
+        self.assertEqual([item['title'] for item in first.data['results']], ['Paged 4', 'Paged 3'])
+        self.assertIsNone(first.data['previous'])
+
+        second = self.client.get(first.data['next'])
+        self.assertEqual([item['title'] for item in second.data['results']], ['Paged 2', 'Paged 1'])
+
+        third = self.client.get(second.data['next'])
+        self.assertEqual([item['title'] for item in third.data['results']], ['Paged 0'])
+        self.assertIsNone(third.data['next'])
+
+        back = self.client.get(third.data['previous'])
+        self.assertEqual([item['title'] for item in back.data['results']], ['Paged 2', 'Paged 1'])
+
+    def test_list_listings_page_size_is_capped(self):
+        """Test the API feed never returns more than LISTINGS_MAX_PAGE_SIZE rows."""
+        for i in range(4):
+            Listing.objects.create(seller=self.user_a, title=f'Capped {i}', price='10.00')
+        url = reverse('listings_api:api_listings_list')
+        with self.settings(LISTINGS_MAX_PAGE_SIZE=3):
+            response = self.client.get(url, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_feed_cache_invalidated_by_writes(self):
+        """Test the cached feed is served on repeat hits and refreshed after a service write."""
+        url = reverse('listings_api:api_listings_list')
+        self.client.get(url)
+        self.client.get(url)
+        stats = get_feed_cache_stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+
+        self.authenticate(self.user_a)
+        # The version is bumped when the write commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.perform_create({'title': 'Fresh Item', 'description': 'New', 'price': '10.00'})
+        response = self.client.get(url)
+        self.assertIn('Fresh Item', [item['title'] for item in response.data['results']])
+
+    def test_detail_conditional_get(self):
+        """Test the detail endpoint answers If-None-Match with 304 until the listing changes."""
+        listing = Listing.objects.create(seller=self.user_a, title='Cached Detail', price='10.00')
+        url = reverse('listings_api:api_listings_detail', kwargs={'pk': listing.id})
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified.content, b'')
+
+        listing.title = 'Changed Detail'
+        listing.save()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_list_conditional_get(self):
+        """Test the feed answers If-None-Match with 304 and revalidates after a write."""
+        Listing.objects.create(seller=self.user_a, title='Feed Item', price='10.00')
+        url = reverse('listings_api:api_listings_list')
+        etag = self.client.get(url)['ETag']
+        # The validator comes from the feed version, so neither a 304 nor a cached page queries the database.
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(self.client.get(url)['ETag'], etag)
+
+        self.authenticate(self.user_b)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.perform_create({'title': 'Newer Feed Item', 'description': 'New', 'price': '10.00'})
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_authenticated_responses_are_private(self):
+        """Test responses for signed-in users are not stored by shared caches."""
+        self.authenticate(self.user_a)
+        response = self.client.get(reverse('listings_api:api_listings_list'))
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_list_listings_price_filters_and_ordering(self):
+        """Test the API feed filters by price range and pages in price order."""
+        for price in ('5.00', '15.00', '30.00', '45.00', '90.00'):
+            Listing.objects.create(seller=self.user_a, title=f'Priced {price}', price=price)
+        url = reverse('listings_api:api_listings_list')
+        params = {'min_price': '10', 'max_price': '50', 'ordering': 'price_desc', 'page_size': 2}
+
+        first = self.client.get(url, params)
+        self.assertEqual([item['price'] for item in first.data['results']], ['45.00', '30.00'])
+        second = self.client.get(first.data['next'])
+        self.assertEqual([item['price'] for item in second.data['results']], ['15.00'])
+        self.assertIsNone(second.data['next'])
+
+        ascending = self.client.get(url, {'ordering': 'price_asc'})
+        self.assertEqual(ascending.data['results'][0]['price'], '5.00')
+
+    def test_list_listings_rejects_bad_filters(self):
+        """Test invalid price filters and orderings are rejected."""
+        url = reverse('listings_api:api_listings_list')
+        self.assertEqual(self.client.get(url, {'min_price': 'cheap'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'ordering': 'random'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_price_facets(self):
+        """Test the price histogram counts active listings per bucket in a single query."""
+        for price in ('5.00', '9.99', '10.00', '2000.00'):
+            Listing.objects.create(seller=self.user_a, title='Faceted', price=price)
+        Listing.objects.create(seller=self.user_a, title='Hidden', price='5.00', is_active=False)
+        url = reverse('listings_api:api_listings_price_facets')
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        buckets = {bucket['min']: bucket for bucket in response.data['buckets']}
+        self.assertEqual(buckets['0.00']['count'], 2)
+        self.assertEqual(buckets['10.00']['count'], 1)
+        self.assertEqual(buckets['1000.00']['count'], 1)
+        self.assertIsNone(buckets['1000.00']['max'])
+
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_fast_path_matches_listing_serializer(self):
+        """Test the values()-based feed and detail output is byte-identical to ListingSerializer."""
+        Listing.objects.create(seller=self.user_a, title='Plain', description='', price='5.00')
+        Listing.objects.create(seller=self.user_b, title='Ünïcødé ✓', description='Line\nbreak "quoted"', price='12345678.90')
+        Listing.objects.create(seller=self.user_a, title='Round', description='x', price='7')
+        renderer = JSONRenderer()
+        expected = serializers.ListingSerializer(services.get_active_listings().order_by('-created_at', '-id'), many=True).data
+
+        response = self.client.get(reverse('listings_api:api_listings_list'))
+        self.assertEqual(renderer.render(response.data['results']), renderer.render(expected))
+
+        for item in expected:
+            detail = self.client.get(reverse('listings_api:api_listings_detail', kwargs={'pk': item['id']}))
+            self.assertEqual(detail.content, renderer.render(item))
+
+    def test_list_listings_invalid_cursor(self):
+        """Test a malformed cursor is rejected before the feed cache is read or written."""
+        url = reverse('listings_api:api_listings_list')
+        with mock.patch('listings.api_views.get_or_build') as get_or_build:
+            response = self.client.get(url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn('ETag', response)
+        get_or_build.assert_not_called()
+
+    def test_equivalent_feed_parameters_share_a_cache_entry(self):
+        """Cache keys and ETags come from the parsed filters, not the raw query string."""
+        url = reverse('listings_api:api_listings_list')
+        first = self.client.get(url, {'min_price': '5'})
+        second = self.client.get(url, {'min_price': '5.00', 'ordering': 'newest'})
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(get_feed_cache_stats()['misses'], 1)
+
     def test_retrieve_listing(self):
         """Test retrieving a specific listing via API."""
         listing = Listing.objects.create(seller=self.user_a, title='My Detail Item', price='10.00', is_active=True)
@@ -211,6 +397,106 @@ class ListingAPITests(BaseListingTest, APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data['title'], 'My Detail Item')
 
+class AsyncListingAPITests(BaseListingTest, APITestCase):
+    """Runs the shared listing tests against the async (ASGI) API views."""
+    def setup_urls(self):
+        self.list_url = reverse('listings_async_api:api_listings_list')
+        self.list_create_url = reverse('listings_async_api:api_listings_create')
+
+    def authenticate(self, user):
+        self.client.force_authenticate(user=user)
+
+    def perform_create(self, data):
+        return self.client.post(self.list_create_url, data)
+
+    def perform_update(self, pk, data):
+        return self.client.put(reverse('listings_async_api:api_listings_edit', kwargs={'pk': pk}), data)
+
+    def perform_delete(self, pk):
+        return self.client.delete(reverse('listings_async_api:api_listings_delete', kwargs={'pk': pk}))
+
+    def assert_success_create(self, response):
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def assert_success_update(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def assert_success_delete(self, response):
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def assert_forbidden(self, response):
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def assert_unauthorized(self, response):
+        self.assertIn(response.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
+
+    def assert_invalid_data(self, response):
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def assert_conflict(self, response):
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_responses_match_sync_api(self):
+        """The async list and detail endpoints return the same bytes as the sync ones."""
+        for i in range(3):
+            listing = Listing.objects.create(seller=self.user_a, title=f'Mirror {i}', price='7.50')
+        with self.settings(LISTINGS_PAGE_SIZE=2):
+            sync_page = self.client.get(reverse('listings_api:api_listings_list')).json()
+            cache.clear()
+            async_page = self.client.get(self.list_url).json()
+        self.assertEqual(async_page['results'], sync_page['results'])
+        self.assertEqual(async_page['next'].split('?')[1], sync_page['next'].split('?')[1])
+
+        sync_detail = self.client.get(reverse('listings_api:api_listings_detail', kwargs={'pk': listing.id}))
+        async_detail = self.client.get(reverse('listings_async_api:api_listings_detail', kwargs={'pk': listing.id}))
+        self.assertEqual(async_detail.content, sync_detail.content)
+        missing = self.client.get(reverse('listings_async_api:api_listings_detail', kwargs={'pk': 0}))
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_conditional_get_matches_sync_api(self):
+        """The async list and detail endpoints send the sync views' validators and answer 304."""
+        listing = Listing.objects.create(seller=self.user_a, title='Async Conditional', price='7.50')
+        for sync_name, async_name, kwargs in (
+            ('listings_api:api_listings_list', 'listings_async_api:api_listings_list', {}),
+            ('listings_api:api_listings_detail', 'listings_async_api:api_listings_detail', {'pk': listing.id}),
+        ):
+            with self.subTest(view=async_name):
+                sync_response = self.client.get(reverse(sync_name, kwargs=kwargs))
+                response = self.client.get(reverse(async_name, kwargs=kwargs))
+                self.assertEqual(response['ETag'], sync_response['ETag'])
+                self.assertEqual(response['Cache-Control'], sync_response['Cache-Control'])
+                self.assertEqual(response['Vary'], sync_response['Vary'])
+                self.assertEqual(response.get('Last-Modified'), sync_response.get('Last-Modified'))
+                not_modified = self.client.get(reverse(async_name, kwargs=kwargs), HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(not_modified['ETag'], response['ETag'])
+
+        self.authenticate(self.user_a)
+        response = self.client.get(reverse('listings_async_api:api_listings_detail', kwargs={'pk': listing.id}))
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_jwt_cookie_authentication(self):
+        """The async views authenticate real JWT cookies through DRF's authenticators."""
+        login_res = self.client.post(reverse('rest_login'), {'email': self.user_a.email, 'password': 'StrongPassword123!'})
+        self.client.cookies.clear()
+        self.client.cookies['jwt-auth'] = login_res.cookies.get('jwt-auth').value
+        response = self.perform_create({'title': 'Via JWT', 'description': 'Async', 'price': '3.00'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['seller_email'], self.user_a.email)
+
+    def test_rejected_delete_leaves_counters_alone(self):
+        """Like delete_listing, a 403 or 404 returns before the counter update."""
+        listing = Listing.objects.create(seller=self.user_b, title='Not Mine', price='5.00')
+        self.authenticate(self.user_a)
+        with mock.patch.object(services, 'aadjust_listing_counts') as adjust:
+            self.assert_forbidden(self.perform_delete(listing.id))
+            self.assertEqual(self.perform_delete(0).status_code, status.HTTP_404_NOT_FOUND)
+        adjust.assert_not_called()
+
+    def test_method_not_allowed(self):
+        response = self.client.post(self.list_url, {})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
 class ListingWebViewTests(BaseListingTest, TestCase):
     def setup_urls(self):
         self.index_url = reverse('listings:index')
@@ -253,6 +539,10 @@ class ListingWebViewTests(BaseListingTest, TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn('error', response.context)
 
+    def assert_conflict(self, response):
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('modified by someone else', response.context['error'])
+
     # Web-specific extra test
     def test_index_view(self):
         """Test the marketplace index displays active listings."""
@@ -263,6 +553,45 @@ class ListingWebViewTests(BaseListingTest, TestCase):
         self.assertContains(response, 'Active Item')
         self.assertNotContains(response, 'Inactive Item')
 
+    def test_index_view_pagination(self):
+        """Test the marketplace index only renders one page and links to the next."""
+        for i in range(3):
+            Listing.objects.create(seller=self.user_a, title=f'Web Paged {i}', price='10.00')
+        with self.settings(LISTINGS_PAGE_SIZE=2):
+            response = self.client.get(self.index_url)
+            self.assertContains(response, 'Web Paged 2')
+            self.assertNotContains(response, 'Web Paged 0')
+            next_cursor = response.context['listings'].next_cursor
+            self.assertIsNotNone(next_cursor)
+            response = self.client.get(self.index_url, {'cursor': next_cursor})
+        self.assertContains(response, 'Web Paged 0')
+        self.assertNotContains(response, 'Web Paged 2')
+
+    def test_edit_view_query_count(self):
+        """Editing loads the listing once and writes it with a single UPDATE."""
+        listing = Listing.objects.create(seller=self.user_a, title='Counted', price='5.00')
+        self.authenticate(self.user_a)
+        url = reverse('listings:edit', kwargs={'pk': listing.id})
+        data = {'title': 'Recounted', 'description': '', 'price': '6.00', 'version': 1}
+        # Session, user, listing SELECT, then UPDATE and the replaced search index row (inside a savepoint here).
+        with self.assertNumQueries(8):
+            response = self.client.post(url, data)
+        self.assertRedirects(response, self.index_url, fetch_redirect_response=False)
+        listing.refresh_from_db()
+        self.assertEqual((listing.title, listing.version), ('Recounted', 2))
+
+    def test_delete_view_query_count(self):
+        """Deleting is a single DELETE filtered on id and seller, plus the seller's counter UPDATE."""
+        listing = Listing.objects.create(seller=self.user_a, title='Counted', price='5.00')
+        self.authenticate(self.user_a)
+        url = reverse('listings:delete', kwargs={'pk': listing.id})
+        # Session, user, DELETE and counter UPDATE (inside a savepoint here), then the search index row is removed.
+        with self.assertNumQueries(7):
+            response = self.client.post(url)
+        self.assertRedirects(response, self.index_url, fetch_redirect_response=False)
+        self.assertFalse(Listing.objects.filter(id=listing.id).exists())
+        self.assertEqual(self.client.post(url).status_code, 404)
+
     def test_web_endpoint_rejects_api_auth(self):
         """Verify that API JWT cookies do not grant access to Web UI endpoints."""
         self.client.force_login(self.user_a)
@@ -285,3 +614,290 @@ class ListingWebViewTests(BaseListingTest, TestCase):
         res = self.client.get(self.create_url)
         self.assertEqual(res.status_code, 302)
         self.assertIn(reverse('account_login'), res.url)
+
+class ListingCardFragmentTests(TestCase):
+    """Listing cards are served from the fragment cache until the listing changes."""
+
+    def setUp(self):
+        cache.clear()
+        fragments.fragment_cache().clear()
+        self.seller = User.objects.create_user(email='cards@example.com', password='StrongPassword123!')
+        self.other = User.objects.create_user(email='cards-other@example.com', password='StrongPassword123!')
+        self.listing = services.create_listing(self.seller, 'Old lamp', 'Brass', '15.00')
+
+    def test_card_is_reused_until_updated_at_changes(self):
+        self.assertIn('Old lamp', fragments.render_cards('feed', [self.listing])[0])
+        self.listing.title = 'Renamed behind the services'
+        self.assertIn('Old lamp', fragments.render_cards('feed', [self.listing])[0])
+
+        listing = services.update_listing(self.seller, listing=self.listing, title='New lamp')
+        self.assertIn('New lamp', fragments.render_cards('feed', [listing])[0])
+
+    def test_update_forgets_the_previous_card(self):
+        old_stamp = self.listing.updated_at
+        fragments.render_cards('feed', [self.listing], self.seller)
+        old_key = fragments.card_key('feed', self.listing.pk, old_stamp, True)
+        self.assertIsNotNone(fragments.fragment_cache().get(old_key))
+
+        services.update_listing(self.seller, listing=self.listing, price='20.00')
+        self.assertIsNone(fragments.fragment_cache().get(old_key))
+
+    def test_only_the_seller_gets_edit_links(self):
+        edit_url = reverse('listings:edit', args=[self.listing.pk])
+        self.assertIn(edit_url, fragments.render_cards('feed', [self.listing], self.seller)[0])
+        self.assertNotIn(edit_url, fragments.render_cards('feed', [self.listing], self.other)[0])
+        self.assertNotIn(edit_url, fragments.render_cards('feed', [self.listing])[0])
+
+    def test_cached_navbar_keeps_per_user_csrf_token(self):
+        self.client.force_login(self.seller)
+        first = self.client.get(reverse('listings:index'))
+        self.client.force_login(self.other)
+        second = self.client.get(reverse('listings:index'))
+        self.assertContains(second, reverse('account_logout'))
+        self.assertNotEqual(first.context['csrf_token'], second.context['csrf_token'])
+        self.assertContains(second, str(second.context['csrf_token']))
+
+        self.client.logout()
+        self.assertContains(self.client.get(reverse('listings:index')), reverse('account_signup'))
+
+    def test_cached_navbar_fragment_is_one_element(self):
+        self.client.force_login(self.seller)
+        self.client.get(reverse('listings:index'))
+        fragment = fragments.fragment_cache().get(make_template_fragment_key('navbar_links', [True])).strip()
+        self.assertTrue(fragment.startswith('<div') and fragment.endswith('</div>'))
+        self.assertEqual(fragment.count('<div'), fragment.count('</div>'))
+        self.assertNotIn('csrfmiddlewaretoken', fragment)
+
+@skipUnless(connection.vendor == 'sqlite', "Query plan assertions target SQLite's EXPLAIN output.")
+class ListingIndexTests(TestCase):
+    """Verify the hot listing queries are answered by an index scan rather than a sort."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='indexes@example.com', password='StrongPassword123!')
+
+    def assert_uses_index(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_active_feed_uses_index(self):
+        self.assert_uses_index(
+            services.get_active_listings().order_by('-created_at', '-id'),
+            'listing_active_feed_idx',
+        )
+
+    def test_price_ordering_uses_index(self):
+        self.assert_uses_index(
+            services.get_active_listings(min_price=10, max_price=50).order_by('price', 'id'),
+            'listing_active_price_idx',
+        )
+
+    def test_seller_listings_use_index(self):
+        from users.services import PROFILE_LISTING_FIELDS
+        listings = self.user.listings.only(*PROFILE_LISTING_FIELDS).order_by('-created_at', '-id')
+        self.assert_uses_index(listings, 'listing_seller_created_idx')
+
+class ListingSearchTests(APITestCase):
+    """Full-text search over listings kept in sync by the listing services."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='search@example.com', password='StrongPassword123!')
+        self.url = reverse('listings_api:api_listings_search')
+
+    def search_titles(self, query):
+        response = self.client.get(self.url, {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['title'] for item in response.data['results']]
+
+    def test_search_ranks_title_matches_first(self):
+        services.create_listing(self.user, 'Leather sofa', 'Comfortable bicycle-free furniture', '100.00')
+        services.create_listing(self.user, 'Mountain bicycle', 'Barely used', '250.00')
+        services.create_listing(self.user, 'Kitchen table', 'Oak wood', '80.00')
+        self.assertEqual(self.search_titles('bicycle'), ['Mountain bicycle', 'Leather sofa'])
+
+    def test_search_follows_updates_and_deletes(self):
+        listing = services.create_listing(self.user, 'Red kayak', 'Two seats', '300.00')
+        services.update_listing(self.user, listing.id, title='Blue canoe')
+        self.assertEqual(self.search_titles('kayak'), [])
+        self.assertEqual(self.search_titles('canoe'), ['Blue canoe'])
+
+        services.delete_listing(self.user, listing.id)
+        self.assertEqual(self.search_titles('canoe'), [])
+
+    def test_failed_index_write_rolls_back_the_listing(self):
+        """The listing and its index row commit together, so a listing is never unsearchable."""
+        listing = services.create_listing(self.user, 'Oak desk', 'Solid', '90.00')
+        with mock.patch.object(search, 'index_listing', side_effect=DatabaseError('index unavailable')):
+            with self.assertRaises(DatabaseError):
+                services.create_listing(self.user, 'Pine desk', 'Light', '70.00')
+            with self.assertRaises(DatabaseError):
+                services.update_listing(self.user, listing.id, title='Walnut desk')
+        self.assertEqual(list(Listing.objects.values_list('title', flat=True)), ['Oak desk'])
+        self.assertEqual(self.search_titles('desk'), ['Oak desk'])
+
+    def test_search_excludes_inactive_and_ignores_operators(self):
+        listing = services.create_listing(self.user, 'Vintage lamp', 'Brass', '40.00')
+        Listing.objects.filter(id=listing.id).update(is_active=False)
+        self.assertEqual(self.search_titles('lamp'), [])
+        self.assertEqual(self.search_titles('"lamp* OR NEAR('), [])
+
+    def test_search_clamps_negative_page(self):
+        for i in range(3):
+            services.create_listing(self.user, f'Camping tent {i}', 'Waterproof', '60.00')
+        response = self.client.get(self.url, {'q': 'tent', 'page': -5, 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIn('page=2', response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_web_index_search(self):
+        services.create_listing(self.user, 'Electric guitar', 'Six strings', '500.00')
+        services.create_listing(self.user, 'Drum kit', 'Loud', '700.00')
+        response = self.client.get(reverse('listings:index'), {'q': 'guitar'})
+        self.assertContains(response, 'Electric guitar')
+        self.assertNotContains(response, 'Drum kit')
+
+class ListingBulkAPITests(APITestCase):
+    """Bulk create/edit/delete run as one transaction and report per-item errors."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='bulk@example.com', password='StrongPassword123!')
+        self.other = User.objects.create_user(email='bulk_other@example.com', password='StrongPassword123!')
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_create(self):
+        items = [{'title': f'Bulk {i}', 'description': 'Imported', 'price': '10.00'} for i in range(5)]
+        with self.settings(LISTINGS_BULK_BATCH_SIZE=2):
+            response = self.client.post(reverse('listings_api:api_listings_bulk_create'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(Listing.objects.filter(seller=self.user).count(), 5)
+        self.assertTrue(all(item['id'] for item in response.data))
+
+    def test_bulk_create_reports_item_errors_and_writes_nothing(self):
+        items = [
+            {'title': 'Good', 'description': 'Fine', 'price': '10.00'},
+            {'title': 'Bad', 'description': 'Free', 'price': '0.00'},
+            {'description': 'No title', 'price': '5.00'},
+        ]
+        response = self.client.post(reverse('listings_api:api_listings_bulk_create'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0], {})
+        self.assertIn('title', response.data['errors'][2])
+        self.assertFalse(Listing.objects.exists())
+
+        response = self.client.post(reverse('listings_api:api_listings_bulk_create'), items[:2], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], [{}, {'price': ['Price must be greater than zero.']}])
+        self.assertFalse(Listing.objects.exists())
+
+    def test_bulk_edit(self):
+        mine = [Listing.objects.create(seller=self.user, title=f'Mine {i}', price='5.00') for i in range(2)]
+        items = [{'id': mine[0].id, 'title': 'Edited'}, {'id': mine[1].id, 'price': '20.00'}]
+        response = self.client.put(reverse('listings_api:api_listings_bulk_edit'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mine[0].refresh_from_db()
+        mine[1].refresh_from_db()
+        self.assertEqual(mine[0].title, 'Edited')
+        self.assertEqual(str(mine[1].price), '20.00')
+        self.assertEqual(mine[1].title, 'Mine 1')
+
+    def test_bulk_edit_rejects_foreign_listings(self):
+        mine = Listing.objects.create(seller=self.user, title='Mine', price='5.00')
+        theirs = Listing.objects.create(seller=self.other, title='Theirs', price='5.00')
+        items = [{'id': mine.id, 'title': 'Edited'}, {'id': theirs.id, 'title': 'Hacked'}]
+        response = self.client.put(reverse('listings_api:api_listings_bulk_edit'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0], {})
+        self.assertIn('id', response.data['errors'][1])
+        mine.refresh_from_db()
+        self.assertEqual(mine.title, 'Mine')
+
+    def test_bulk_delete(self):
+        mine = [Listing.objects.create(seller=self.user, title=f'Mine {i}', price='5.00') for i in range(3)]
+        url = reverse('listings_api:api_listings_bulk_delete')
+        response = self.client.delete(url, {'ids': [listing.id for listing in mine[:2]]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['deleted'], 2)
+        self.assertEqual(list(Listing.objects.values_list('id', flat=True)), [mine[2].id])
+
+    def test_bulk_delete_is_scoped_to_seller(self):
+        mine = Listing.objects.create(seller=self.user, title='Mine', price='5.00')
+        theirs = Listing.objects.create(seller=self.other, title='Theirs', price='5.00')
+        url = reverse('listings_api:api_listings_bulk_delete')
+        response = self.client.delete(url, {'ids': [mine.id, theirs.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Listing.objects.count(), 2)
+
+    def test_bulk_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post(reverse('listings_api:api_listings_bulk_create'), [], format='json')
+        self.assertIn(response.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
+
+class ListingExportTests(APITestCase):
+    """Streaming exports of the active listings feed."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='export@example.com', password='StrongPassword123!')
+        Listing.objects.create(seller=self.user, title='First, "quoted"', description='a', price='10.00')
+        Listing.objects.create(seller=self.user, title='Second', description='b', price='20.00')
+        Listing.objects.create(seller=self.user, title='Hidden', description='c', price='30.00', is_active=False)
+        self.client.force_authenticate(user=self.user)
+
+    def export(self, export_format):
+        response = self.client.get(reverse('listings_api:api_listings_export', kwargs={'export_format': export_format}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_export(self):
+        lines = self.export('ndjson').splitlines()
+        self.assertEqual([json.loads(line)['title'] for line in lines], ['First, "quoted"', 'Second'])
+
+    def test_json_export(self):
+        rows = json.loads(self.export('json'))
+        self.assertEqual([row['price'] for row in rows], ['10.00', '20.00'])
+
+    def test_csv_export(self):
+        rows = list(csv.DictReader(io.StringIO(self.export('csv'))))
+        self.assertEqual([row['title'] for row in rows], ['First, "quoted"', 'Second'])
+        self.assertEqual(rows[0]['seller_email'], self.user.email)
+
+    def test_unknown_format(self):
+        url = reverse('listings_api:api_listings_export', kwargs={'export_format': 'xml'})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_command(self):
+        out = io.StringIO()
+        call_command('export_listings', '--format', 'ndjson', '--chunk-size', '1', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+
+
+class SeedMarketplaceTests(TestCase):
+
+    def test_seeds_users_and_listings_in_batches(self):
+        out = io.StringIO()
+        call_command('seed_marketplace', users=3, listings=25, batch_size=7, stdout=out)
+        users = User.objects.filter(email__startswith='seed-user-')
+        self.assertEqual(users.count(), 3)
+        self.assertEqual(EmailAddress.objects.filter(user__in=users, verified=True, primary=True).count(), 3)
+        self.assertTrue(users.get(email='seed-user-0@example.com').check_password('SeedPassword123!'))
+
+        listings = Listing.objects.filter(seller__in=users)
+        self.assertEqual(listings.count(), 25)
+        self.assertGreater(listings.values('created_at').distinct().count(), 1)
+        self.assertEqual(
+            sorted(users.values_list('listing_count', 'active_listing_count')),
+            sorted(
+                (u.listings.count(), u.listings.filter(is_active=True).count()) for u in users
+            ),
+        )
+        # Seeded rows are in the search index too.
+        active = listings.filter(is_active=True).first()
+        self.assertIn(active, services.search_listings(active.title)[0])
+
+        # A second run continues the numbering instead of colliding.
+        call_command('seed_marketplace', users=2, listings=0, stdout=out)
+        self.assertTrue(User.objects.filter(email='seed-user-4@example.com').exists())
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views, api_views
+from . import views, api_views, async_api_views
 
 app_name = 'listings'
 
@@ -14,11 +14,26 @@ web_urlpatterns = [
 # For mobile-exclusive JSON API
 api_urlpatterns = [
     path('', api_views.ListingListAPIView.as_view(), name='api_listings_list'),
+    path('facets/price/', api_views.ListingPriceFacetAPIView.as_view(), name='api_listings_price_facets'),
+    path('export/<str:export_format>/', api_views.ListingExportAPIView.as_view(), name='api_listings_export'),
+    path('search/', api_views.ListingSearchAPIView.as_view(), name='api_listings_search'),
     path('create/', api_views.ListingCreateAPIView.as_view(), name='api_listings_create'),
+    path('bulk/create/', api_views.ListingBulkCreateAPIView.as_view(), name='api_listings_bulk_create'),
+    path('bulk/edit/', api_views.ListingBulkEditAPIView.as_view(), name='api_listings_bulk_edit'),
+    path('bulk/delete/', api_views.ListingBulkDeleteAPIView.as_view(), name='api_listings_bulk_delete'),
     path('<int:pk>/', api_views.ListingDetailAPIView.as_view(), name='api_listings_detail'),
     path('<int:pk>/edit/', api_views.ListingEditAPIView.as_view(), name='api_listings_edit'),
     path('<int:pk>/delete/', api_views.ListingDeleteAPIView.as_view(), name='api_listings_delete'),
 ]
 
+# Async (ASGI) versions of the JSON API
+async_api_urlpatterns = [
+    path('', async_api_views.listing_list, name='api_listings_list'),
+    path('create/', async_api_views.listing_create, name='api_listings_create'),
+    path('<int:pk>/', async_api_views.listing_detail, name='api_listings_detail'),
+    path('<int:pk>/edit/', async_api_views.listing_edit, name='api_listings_edit'),
+    path('<int:pk>/delete/', async_api_views.listing_delete, name='api_listings_delete'),
+]
+
 # Legacy combined pattern
 urlpatterns = web_urlpatterns + api_urlpatterns
@@ -1,13 +1,40 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
+from django.http import Http404
 from . import services
 from .models import Listing
 
 def index(request):
-    """HTML View to display all active listings."""
-    listings = services.get_active_listings()
-    return render(request, "listings/index.html", {"listings": listings})
+    """HTML View to display active listings, one keyset page at a time, or search results."""
+    query = request.GET.get("q", "").strip()
+    if query:
+        try:
+            page = max(int(request.GET.get("page", 1)), 1)
+        except ValueError:
+            page = 1
+        listings, has_more = services.search_listings(query, page=page)
+        return render(request, "listings/index.html", {
+            "listings": listings,
+            "query": query,
+            "next_page": page + 1 if has_more else None,
+            "prev_page": page - 1 if page > 1 else None,
+        })
+
+    filters = {name: request.GET.get(name, "") for name in ("min_price", "max_price", "ordering")}
+    error = None
+    try:
+        listings = services.get_active_listings_page(cursor=request.GET.get("cursor"), **filters)
+    except ValueError as e:
+        # A stale cursor or a bad filter falls back to the unfiltered first page.
+        error = str(e) if any(filters.values()) else None
+        listings = services.get_active_listings_page()
+    return render(request, "listings/index.html", {
+        "listings": listings,
+        "filters": filters,
+        "price_buckets": services.get_price_histogram(),
+        "error": error,
+    })
 
 @login_required
 def create_listing_view(request):
@@ -34,19 +61,22 @@ def create_listing_view(request):
 def edit_listing_view(request, pk):
     """HTML View to edit an existing listing."""
     listing = get_object_or_404(Listing, pk=pk)
-    if listing.seller != request.user:
+    if listing.seller_id != request.user.pk:
         raise PermissionDenied
 
     if request.method == "POST":
         try:
             services.update_listing(
                 user=request.user,
-                listing_id=pk,
+                listing=listing,
                 title=request.POST.get("title"),
                 description=request.POST.get("description"),
                 price=request.POST.get("price"),
+                version=request.POST.get("version") or None,
             )
             return redirect("listings:index")
+        except services.ListingVersionConflict as e:
+            return render(request, "listings/edit.html", {"listing": listing, "error": str(e)}, status=409)
         except (ValueError, PermissionDenied) as e:
             return render(request, "listings/edit.html", {"listing": listing, "error": str(e)})
 
@@ -55,12 +85,16 @@ def edit_listing_view(request, pk):
 @login_required
 def delete_listing_view(request, pk):
     """HTML View to confirm and delete a listing."""
-    listing = get_object_or_404(Listing, pk=pk)
-    if listing.seller != request.user:
-        raise PermissionDenied
-
     if request.method == "POST":
-        services.delete_listing(user=request.user, listing_id=pk)
+        # The service's conditional DELETE does the lookup and ownership check in one statement.
+        try:
+            services.delete_listing(user=request.user, listing_id=pk)
+        except ValueError:
+            raise Http404("Listing not found.")
         return redirect("listings:index")
 
+    listing = get_object_or_404(Listing, pk=pk)
+    if listing.seller_id != request.user.pk:
+        raise PermissionDenied
+
     return render(request, "listings/delete_confirm.html", {"listing": listing})
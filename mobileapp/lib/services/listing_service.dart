@@ -5,7 +5,7 @@ import 'api_client.dart';
 
 /// Service for handling Marketplace Listings.
 class ListingService {
-  /// Fetches all active listings from the marketplace.
+  /// Fetches the first page of active listings from the marketplace.
   Future<List<Listing>> fetchListings() async {
     try {
       final response = await ApiClient.get(
@@ -13,7 +13,8 @@ class ListingService {
         requireAuth: false,
       );
       if (response.statusCode == 200) {
-        final List<dynamic> data = jsonDecode(response.body);
+        final Map<String, dynamic> page = jsonDecode(response.body);
+        final List<dynamic> data = page['results'] ?? [];
         return data.map((item) => Listing.fromJson(item)).toList();
       }
       return [];
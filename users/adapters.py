@@ -1,5 +1,9 @@
 from allauth.account.adapter import DefaultAccountAdapter
+from allauth.core import context as allauth_context
+from django.conf import settings
+from django.contrib.sites.shortcuts import get_current_site
 from django.urls import reverse
+from . import mail_queue
 
 class CustomAccountAdapter(DefaultAccountAdapter):
     def get_password_change_redirect_url(self, request):
@@ -7,3 +11,19 @@ class CustomAccountAdapter(DefaultAccountAdapter):
 
     def get_password_set_redirect_url(self, request):
         return reverse('users:profile')
+
+    def send_mail(self, template_prefix, email, context):
+        """
+        Renders allauth mail (verification, password reset, ...) as usual but queues it
+        for the `send_queued_mail` worker instead of talking to SMTP inside the request.
+        """
+        if not settings.EMAIL_QUEUE_ENABLED:
+            return super().send_mail(template_prefix, email, context)
+        request = allauth_context.request
+        ctx = {
+            "request": request,
+            "email": email,
+            "current_site": get_current_site(request),
+        }
+        ctx.update(context)
+        mail_queue.enqueue(self.render_mail(template_prefix, email, ctx))
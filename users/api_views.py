@@ -1,17 +1,37 @@
-from rest_framework import generics
+from allauth.account.forms import ResetPasswordForm
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from . import serializers
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+from . import serializers, services
+
+
+def profile_payload(request, data):
+    """The profile body: user header, one page of listings and links to the adjacent pages."""
+    page = data['listings']
+    url = request.build_absolute_uri()
+    return {
+        **serializers.UserProfileSerializer(data).data,
+        'listings_next': replace_query_param(url, 'cursor', page.next_cursor) if page.next_cursor else None,
+        'listings_previous': replace_query_param(url, 'cursor', page.prev_cursor) if page.prev_cursor else None,
+    }
 
-class UserProfileAPIView(generics.RetrieveAPIView):
-    """API view to fetch user profile data for mobile."""
-    serializer_class = serializers.UserProfileSerializer
+
+class UserProfileAPIView(APIView):
+    """API view to fetch user profile data for mobile. Listings are keyset-paginated via ?cursor=."""
     permission_classes = [IsAuthenticated]
 
-    def get_object(self):
-        return self.request.user
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from allauth.account.forms import ResetPasswordForm
+    def get(self, request):
+        try:
+            data = services.get_user_profile_data(
+                request.user,
+                cursor=request.query_params.get('cursor'),
+                page_size=request.query_params.get('page_size'),
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(profile_payload(request, data))
 
 class PasswordResetAPIView(APIView):
     """
@@ -0,0 +1,80 @@
+from asgiref.sync import sync_to_async
+from dj_rest_auth.app_settings import api_settings as rest_auth_settings
+from dj_rest_auth.utils import jwt_encode
+from dj_rest_auth.views import LoginView
+from django.contrib.auth import update_session_auth_hash
+from django.contrib.auth.forms import SetPasswordForm
+from django.views.decorators.debug import sensitive_post_parameters
+from rest_framework import serializers as drf_serializers, status
+from rest_framework.renderers import JSONRenderer
+from core.async_api import api_response, async_api_view
+from . import services
+from .api_views import profile_payload
+from .serializers import CustomLoginSerializer
+
+
+@async_api_view(['GET'], authenticated=True)
+async def user_profile(request):
+    """Async (ASGI) version of UserProfileAPIView."""
+    try:
+        data = await services.aget_user_profile_data(
+            request.user,
+            cursor=request.query_params.get('cursor'),
+            page_size=request.query_params.get('page_size'),
+        )
+    except ValueError as e:
+        return api_response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return api_response(profile_payload(request, data), status=status.HTTP_200_OK)
+
+
+def login_response(request, user):
+    """The body, JWT cookies and session login of dj-rest-auth's LoginView for an authenticated user."""
+    view = LoginView(request=request, format_kwarg=None)
+    view.user = user
+    view.access_token, view.refresh_token = jwt_encode(user)
+    if rest_auth_settings.SESSION_LOGIN:
+        view.process_login()
+    response = view.get_response()
+    response.accepted_renderer = JSONRenderer()
+    response.accepted_media_type = 'application/json'
+    response.renderer_context = {}
+    return response.render()
+
+
+@sensitive_post_parameters('password')
+@async_api_view(['POST'])
+async def login(request):
+    """
+    Async (ASGI) version of /auth/login/. The password is checked by awaiting the bounded
+    hashing executor, so a login burst holds no thread while it waits for a hashing slot.
+    """
+    email, password = request.data.get('email'), request.data.get('password')
+    if not email or not password:
+        return api_response(
+            {"non_field_errors": ['Must include "email" and "password".']}, status=status.HTTP_400_BAD_REQUEST,
+        )
+    user = await services.aauthenticate(email, password)
+    if user is None:
+        return api_response(
+            {"non_field_errors": ["Unable to log in with provided credentials."]}, status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        CustomLoginSerializer.validate_email_verification_status(user)
+    except drf_serializers.ValidationError as e:
+        return api_response({"non_field_errors": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+    return await sync_to_async(login_response)(request, user)
+
+
+@sensitive_post_parameters('new_password1', 'new_password2')
+@async_api_view(['POST'], authenticated=True)
+async def password_change(request):
+    """Async (ASGI) version of /auth/password/change/; the new hash is computed on the hashing executor."""
+    form = SetPasswordForm(user=request.user, data=request.data)
+    if not await sync_to_async(form.is_valid)():
+        return api_response(
+            {field: list(errors) for field, errors in form.errors.items()}, status=status.HTTP_400_BAD_REQUEST,
+        )
+    await services.aset_password(request.user, form.cleaned_data['new_password1'])
+    if not rest_auth_settings.LOGOUT_ON_PASSWORD_CHANGE:
+        await sync_to_async(update_session_auth_hash)(request, request.user)
+    return api_response({"detail": "New password has been saved."}, status=status.HTTP_200_OK)
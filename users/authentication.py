@@ -0,0 +1,140 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from dj_rest_auth.jwt_auth import JWTCookieAuthentication
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class _LocalUserCache:
+    """
+    A small thread-safe LRU of cache entries whose entries expire after a few seconds.
+    Keyed by str(user id): simplejwt puts the id in the token as a string.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, user_id, value):
+        key = str(user_id)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + settings.USERS_AUTH_LOCAL_TIMEOUT, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.USERS_AUTH_LOCAL_MAX_SIZE:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_user_cache = _LocalUserCache()
+
+
+def _shared_key(user_id):
+    return f'users:auth:{user_id}'
+
+
+def _cache_entry(user):
+    """
+    (user, password fingerprint) as cached. The copy has no password hash, so none ends up
+    in a shared cache; the field is deferred, so reading it loads it from the database and
+    saving the copy leaves it alone. The fingerprint is all the revoked-token check needs.
+    """
+    cached = copy.copy(user)
+    cached.__dict__.pop('password', None)
+    return cached, get_md5_hash_password(user.password)
+
+
+def get_cached_user(user_id):
+    """
+    Returns (user, password fingerprint) for user_id from the per-process LRU, then the
+    shared cache, or None. Each caller gets its own copy of the user, so per-request
+    attributes never leak between requests.
+    """
+    entry = local_user_cache.get(user_id)
+    if entry is None:
+        entry = cache.get(_shared_key(user_id))
+        if entry is None:
+            return None
+        local_user_cache.set(user_id, entry)
+    user, fingerprint = entry
+    return copy.copy(user), fingerprint
+
+
+def cache_user(user):
+    entry = _cache_entry(user)
+    cache.set(_shared_key(user.pk), entry, timeout=settings.USERS_AUTH_CACHE_TIMEOUT)
+    local_user_cache.set(user.pk, entry)
+
+
+def invalidate_cached_user(user_id):
+    """
+    Drops a user from the shared cache and this process's LRU. Other processes
+    keep their local copy for at most USERS_AUTH_LOCAL_TIMEOUT seconds.
+    """
+    cache.delete(_shared_key(user_id))
+    local_user_cache.discard(user_id)
+
+
+async def ainvalidate_cached_user(user_id):
+    """Async counterpart of `invalidate_cached_user`."""
+    await cache.adelete(_shared_key(user_id))
+    local_user_cache.discard(user_id)
+
+
+class CachedUserMixin:
+    """
+    Resolves the token's user from the user cache instead of a SELECT per request.
+    Cached users go through the same is_active and revoked-token checks as fresh ones.
+    """
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        cached = get_cached_user(user_id) if user_id is not None else None
+        if cached is None:
+            user = super().get_user(validated_token)
+            cache_user(user)
+            return user
+
+        user, fingerprint = cached
+
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if jwt_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != fingerprint
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+
+class CachedJWTCookieAuthentication(CachedUserMixin, JWTCookieAuthentication):
+    """dj-rest-auth's JWT cookie/header authentication with cached user lookup."""
+
+
+class CachedJWTAuthentication(CachedUserMixin, JWTAuthentication):
+    """simplejwt's bearer-token authentication with cached user lookup."""
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+THREAD_NAME_PREFIX = 'password-hash'
+
+
+class HashingExecutor:
+    """
+    A small thread pool that runs password hashing with at most `max_workers` hashes
+    in flight per process. Callers beyond the cap wait without using CPU, so a login
+    burst cannot take every core from other requests. PBKDF2 (hashlib) releases the
+    GIL, so the workers hash in parallel up to the cap.
+    """
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=THREAD_NAME_PREFIX)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+
+    def _call(self, fn, args):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    def submit(self, fn, *args):
+        with self._lock:
+            self._queued += 1
+        return self._pool.submit(self._call, fn, args)
+
+    def run(self, fn, *args):
+        """Blocks the calling (WSGI request) thread until the hash is computed."""
+        if threading.current_thread().name.startswith(THREAD_NAME_PREFIX):
+            return fn(*args)
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn, *args):
+        """Awaits the hash without blocking the event loop (ASGI)."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self):
+        """Queue depth (waiting hashes), hashes in progress and totals."""
+        with self._lock:
+            return {
+                'queued': self._queued,
+                'running': self._running,
+                'completed': self._completed,
+                'max_workers': self.max_workers,
+            }
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hashing_executor():
+    """The per-process executor, created on first use (after any fork)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = settings.PASSWORD_HASHING_MAX_WORKERS or max(1, (os.cpu_count() or 2) // 2)
+                _executor = HashingExecutor(max_workers)
+    return _executor
+
+
+def get_hashing_stats():
+    return get_hashing_executor().stats()
+
+
+class BoundedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Django's default PBKDF2 hasher with the expensive part moved onto the hashing executor.
+    It keeps the `pbkdf2_sha256` algorithm name, so existing hashes verify unchanged.
+    verify() and harden_runtime() go through encode(), so every login, registration,
+    password change and create_user() call is capped.
+    """
+
+    def encode(self, password, salt, iterations=None):
+        return get_hashing_executor().run(super().encode, password, salt, iterations)
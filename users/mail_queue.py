@@ -0,0 +1,114 @@
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+# A claimed batch is hidden from other workers for this long; if the worker dies
+# mid-batch, the unsent rows become due again afterwards.
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def enqueue(message):
+    """Stores a rendered EmailMessage for background delivery instead of sending it."""
+    html_body = next(
+        (content for content, mimetype in getattr(message, 'alternatives', []) if mimetype == 'text/html'),
+        '',
+    )
+    return QueuedEmail.objects.create(
+        subject=message.subject,
+        body=message.body,
+        html_body=html_body,
+        from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(message.to),
+        headers=dict(message.extra_headers),
+    )
+
+
+def _claim_batch(batch_size):
+    now = timezone.now()
+    with transaction.atomic():
+        due = QueuedEmail.objects.filter(
+            status=QueuedEmail.Status.PENDING, next_attempt_at__lte=now
+        ).order_by('next_attempt_at', 'id')
+        if db_connection.features.has_select_for_update_skip_locked:
+            batch = list(due.select_for_update(skip_locked=True)[:batch_size])
+            QueuedEmail.objects.filter(id__in=[queued.id for queued in batch]).update(
+                next_attempt_at=now + CLAIM_LEASE
+            )
+            return batch
+        # Without SKIP LOCKED (SQLite) two workers can read the same rows, so each row is
+        # claimed by a conditional UPDATE that only the first worker wins.
+        return [
+            queued for queued in due[:batch_size]
+            if QueuedEmail.objects.filter(
+                pk=queued.pk, status=QueuedEmail.Status.PENDING, next_attempt_at=queued.next_attempt_at,
+            ).update(next_attempt_at=now + CLAIM_LEASE)
+        ]
+
+
+def _build_message(queued, connection):
+    message = EmailMultiAlternatives(
+        queued.subject, queued.body, queued.from_email, queued.to,
+        headers=queued.headers, connection=connection,
+    )
+    if queued.html_body:
+        message.attach_alternative(queued.html_body, 'text/html')
+    return message
+
+
+def _schedule_retry(queued, error, permanent=False):
+    attempts = queued.attempts + 1
+    changes = {'attempts': attempts, 'last_error': str(error)[:2000]}
+    if permanent or attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+        changes['status'] = QueuedEmail.Status.FAILED
+    else:
+        # Exponential backoff: base, 2x base, 4x base, ...
+        delay = settings.EMAIL_QUEUE_RETRY_BACKOFF * 2 ** (attempts - 1)
+        changes['next_attempt_at'] = timezone.now() + timedelta(seconds=delay)
+    QueuedEmail.objects.filter(pk=queued.pk).update(**changes)
+
+
+def send_queued_mail(batch_size=None):
+    """
+    Delivers one batch of due mail over a single reused connection to EMAIL_BACKEND.
+    Failed deliveries are retried with exponential backoff until EMAIL_QUEUE_MAX_ATTEMPTS;
+    a message that cannot be built or sent for any other reason is marked failed at once.
+    Returns (sent, failed) counts for the batch.
+    """
+    batch = _claim_batch(batch_size or settings.EMAIL_QUEUE_BATCH_SIZE)
+    if not batch:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        for queued in batch:
+            try:
+                # No-op while the connection is open; reconnects after a failure closed it.
+                connection.open()
+                _build_message(queued, connection).send()
+            except (smtplib.SMTPException, OSError) as error:
+                failed += 1
+                _schedule_retry(queued, error)
+                connection.close()
+                continue
+            except Exception as error:
+                # Not a delivery problem (bad header, encoding error, ...): retrying cannot help,
+                # and letting it escape would keep the batch leased and stop the worker.
+                failed += 1
+                _schedule_retry(queued, error, permanent=True)
+                continue
+            sent += 1
+            # Marked one by one so a crash mid-batch re-sends as little as possible.
+            QueuedEmail.objects.filter(pk=queued.pk).update(
+                status=QueuedEmail.Status.SENT, sent_at=timezone.now(), attempts=F('attempts') + 1,
+            )
+    finally:
+        connection.close()
+    return sent, failed
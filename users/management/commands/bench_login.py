@@ -0,0 +1,63 @@
+import time
+from collections import Counter
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+PASSWORD = "BenchPassword123!"
+
+
+class Command(BaseCommand):
+    help = (
+        "Counts the queries and time of POST /auth/login/ for a verified user. "
+        "The user and sessions are created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=50)
+
+    def handle(self, *args, **options):
+        logins = options["logins"]
+        url = reverse("rest_login")
+
+        with transaction.atomic():
+            user = User.objects.create_user(email="bench-login@example.com", password=PASSWORD)
+            EmailAddress.objects.create(user=user, email=user.email, primary=True, verified=True)
+
+            per_table, total, elapsed = Counter(), 0, 0.0
+            for _ in range(logins):
+                client = Client(HTTP_HOST="localhost")
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    response = client.post(url, {"email": user.email, "password": PASSWORD})
+                    elapsed += time.perf_counter() - start
+                if response.status_code != 200:
+                    self.stderr.write(f"Login failed with {response.status_code}; aborting.")
+                    transaction.set_rollback(True)
+                    return
+                total += len(ctx.captured_queries)
+                per_table.update(self._statement(q["sql"]) for q in ctx.captured_queries)
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{logins} logins:")
+        self.stdout.write(self.style.SUCCESS(f"  queries per login   {total / logins:6.1f}"))
+        for statement, count in sorted(per_table.items()):
+            self.stdout.write(f"    {statement:<40} {count / logins:4.1f}")
+        self.stdout.write(f"  mean latency        {elapsed / logins * 1000:6.1f} ms (mostly password hashing)")
+
+    def _statement(self, sql):
+        words = sql.split()
+        verb = words[0].upper()
+        if verb in ("SAVEPOINT", "RELEASE"):
+            return "SAVEPOINT/RELEASE"
+        keyword = {"SELECT": "FROM", "INSERT": "INTO", "UPDATE": "UPDATE", "DELETE": "FROM"}.get(verb)
+        if keyword and keyword in words:
+            return f"{verb} {words[words.index(keyword) + 1].strip(chr(34))}"
+        return verb
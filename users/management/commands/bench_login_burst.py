@@ -0,0 +1,101 @@
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures GET latency of a listing endpoint on a running server, first idle and then "
+        "while other connections hammer POST /auth/login/. Compare runs with different "
+        "PASSWORD_HASHING_MAX_WORKERS values to see how much a login burst slows listings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("base_url", help="Server root, e.g. http://localhost:8000")
+        parser.add_argument("--email", required=True, help="A verified user to log in as.")
+        parser.add_argument("--password", required=True)
+        parser.add_argument("--listing-path", default="/api/marketplace/")
+        parser.add_argument(
+            "--login-path", default="/auth/login/", help="Use /api/async/auth/login/ against an ASGI server.",
+        )
+        parser.add_argument("--readers", type=int, default=4, help="Connections requesting listings.")
+        parser.add_argument("--logins", type=int, default=16, help="Connections logging in during the burst.")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per phase.")
+
+    def handle(self, *args, **options):
+        target = urlsplit(options["base_url"])
+        if target.scheme != "http" or not target.hostname:
+            raise CommandError("Only absolute http:// URLs are supported.")
+        self.address = (target.hostname, target.port or 80)
+        body = json.dumps({"email": options["email"], "password": options["password"]})
+
+        if self.request("POST", options["login_path"], body)[0] != 200:
+            raise CommandError("The login request failed; check --email and --password.")
+
+        for phase, logins in (("idle", 0), ("login burst", options["logins"])):
+            latencies, login_latencies = self.run_phase(options, body, logins)
+            if not latencies:
+                raise CommandError(f"No listing requests completed during the {phase} phase.")
+            self.report(phase, latencies, login_latencies, options["duration"])
+
+    def request(self, method, path, body=None, conn=None):
+        own = conn is None
+        conn = conn or http.client.HTTPConnection(*self.address, timeout=60)
+        headers = {"Content-Type": "application/json"} if body else {}
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status, conn
+        finally:
+            if own:
+                conn.close()
+
+    def run_phase(self, options, body, logins):
+        stop_at = time.perf_counter() + options["duration"]
+        latencies, login_latencies, lock = [], [], threading.Lock()
+
+        def loop(method, path, payload, results):
+            conn, local = None, []
+            while (start := time.perf_counter()) < stop_at:
+                try:
+                    if conn is None:
+                        conn = http.client.HTTPConnection(*self.address, timeout=60)
+                    status, conn = self.request(method, path, payload, conn)
+                except (OSError, http.client.HTTPException):
+                    if conn is not None:
+                        conn.close()
+                    conn, status = None, 599
+                if status < 400:
+                    local.append(time.perf_counter() - start)
+            if conn is not None:
+                conn.close()
+            with lock:
+                results.extend(local)
+
+        threads = [
+            threading.Thread(target=loop, args=("GET", options["listing_path"], None, latencies))
+            for _ in range(options["readers"])
+        ] + [
+            threading.Thread(target=loop, args=("POST", options["login_path"], body, login_latencies))
+            for _ in range(logins)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sorted(latencies), login_latencies
+
+    def report(self, phase, latencies, login_latencies, duration):
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+        self.stdout.write(self.style.SUCCESS(f"{phase}:"))
+        self.stdout.write(f"  listing requests/sec {len(latencies) / duration:8.1f}")
+        self.stdout.write(f"  listing p50          {cuts[49] * 1000:8.1f} ms")
+        self.stdout.write(f"  listing p99          {cuts[98] * 1000:8.1f} ms")
+        if login_latencies:
+            self.stdout.write(f"  logins/sec           {len(login_latencies) / duration:8.1f}")
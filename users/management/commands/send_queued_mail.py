@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.mail_queue import send_queued_mail
+
+
+class Command(BaseCommand):
+    help = (
+        "Delivers queued outbound e-mail in batches, one SMTP connection per batch. "
+        "Runs once by default; use --loop to keep polling as a worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.EMAIL_QUEUE_BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new mail.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                sent = failed = 0
+                # Drain everything that is due before sleeping.
+                while True:
+                    batch_sent, batch_failed = send_queued_mail(batch_size=options["batch_size"])
+                    sent += batch_sent
+                    failed += batch_failed
+                    if batch_sent + batch_failed < options["batch_size"]:
+                        break
+                if sent or failed or not options["loop"]:
+                    self.stdout.write(f"Sent {sent} e-mail(s), {failed} failed and rescheduled.")
+                if not options["loop"]:
+                    return
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("\nStopped.")
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def backfill_email_verified(apps, schema_editor):
+    CustomUser = apps.get_model('users', 'CustomUser')
+    EmailAddress = apps.get_model('account', 'EmailAddress')
+    CustomUser.objects.update(email_verified=Exists(
+        EmailAddress.objects.filter(user=OuterRef('pk'), email=OuterRef('email'), verified=True)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0009_emailaddress_unique_primary_email'),
+        ('users', '0002_queuedemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='email_verified',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(backfill_email_verified, migrations.RunPython.noop),
+    ]
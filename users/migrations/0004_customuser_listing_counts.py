@@ -0,0 +1,39 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_listing_counts(apps, schema_editor):
+    CustomUser = apps.get_model('users', 'CustomUser')
+    Listing = apps.get_model('listings', 'Listing')
+
+    def count(condition=Q()):
+        counts = (
+            Listing.objects.filter(condition, seller=OuterRef('pk'))
+            .order_by().values('seller').annotate(n=Count('id')).values('n')
+        )
+        return Coalesce(Subquery(counts), 0)
+
+    CustomUser.objects.update(listing_count=count(), active_listing_count=count(Q(is_active=True)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0007_listing_version'),
+        ('users', '0003_customuser_email_verified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='listing_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='active_listing_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_listing_counts, migrations.RunPython.noop),
+    ]
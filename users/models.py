@@ -1,10 +1,17 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from .managers import CustomUserManager
 
 class CustomUser(AbstractUser):
     username = None
     email = models.EmailField("email address", unique=True)
+    # Mirrors "allauth has a verified EmailAddress for `email`" so login needs no extra query.
+    # Kept in sync by users.signals; never set it directly.
+    email_verified = models.BooleanField(default=False, editable=False)
+    # Maintained incrementally by listings.services so the profile header never runs a COUNT.
+    listing_count = models.PositiveIntegerField(default=0, editable=False)
+    active_listing_count = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
@@ -13,3 +20,41 @@ class CustomUser(AbstractUser):
 
     def __str__(self):
         return self.email
+
+
+class QueuedEmail(models.Model):
+    """
+    Outbound e-mail waiting to be delivered by the `send_queued_mail` worker,
+    so requests never block on an SMTP round trip.
+    """
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENT = "sent", "Sent"
+        FAILED = "failed", "Failed"
+
+    subject = models.CharField(max_length=998)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField()
+    headers = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker only ever scans due, pending mail.
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                name="queued_email_due_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)}"
@@ -21,15 +21,17 @@ class CustomRegisterSerializer(RegisterSerializer):
         return email
 
 class CustomLoginSerializer(LoginSerializer):
+    @staticmethod
+    def validate_email_verification_status(user, email=None):
+        # Reads the denormalized flag from the user row the backend already loaded.
+        if not user.email_verified:
+            raise serializers.ValidationError("E-mail is not verified.")
+
     def validate(self, attrs):
         attrs = super().validate(attrs)
         user = attrs.get('user') or self.user
-        
-        if user and hasattr(user, 'emailaddress_set'):
-            email_address = user.emailaddress_set.filter(email=user.email, verified=True).first()
-            if not email_address:
-                raise serializers.ValidationError("E-mail is not verified.")
-                
+        if user:
+            self.validate_email_verification_status(user)
         return attrs
 
 User = get_user_model()
@@ -41,9 +43,10 @@ class UserListingSerializer(serializers.Serializer):
     price = serializers.DecimalField(max_digits=10, decimal_places=2)
     created_at = serializers.DateTimeField()
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(serializers.Serializer):
+    """Serializes `services.get_user_profile_data`: the user's header and one page of listings."""
+    id = serializers.IntegerField(source='user.id')
+    email = serializers.EmailField(source='user.email')
+    listing_count = serializers.IntegerField(source='user.listing_count')
+    active_listing_count = serializers.IntegerField(source='user.active_listing_count')
     listings = UserListingSerializer(many=True, read_only=True)
-    
-    class Meta:
-        model = User
-        fields = ['id', 'email', 'listings']
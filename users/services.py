@@ -1,17 +1,99 @@
+from allauth.account.models import EmailAddress
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password, verify_password
 from django.core.exceptions import PermissionDenied
+from django.db.models import Exists, F, OuterRef
+from django.db.models.functions import Greatest
+from core.pagination import apaginate_keyset, paginate_keyset
+from .authentication import ainvalidate_cached_user, invalidate_cached_user
+from .hashers import get_hashing_executor
 
 User = get_user_model()
 
-def get_user_profile_data(user):
+# Listing columns serialized by the profile API (UserListingSerializer).
+PROFILE_LISTING_FIELDS = ('id', 'title', 'price', 'created_at')
+
+def get_user_profile_data(user, cursor=None, page_size=None, fields=PROFILE_LISTING_FIELDS):
     """
-    Returns a dictionary of profile data for the given user.
-    Includes user info and their listings.
+    Returns a dictionary of profile data for the given user: the user, whose listing
+    counters are columns on the user row, and one keyset page of their listings,
+    newest first, loading only `fields`. Raises ValueError if the cursor is malformed.
     """
     if not user or not user.is_authenticated:
         raise PermissionDenied("Authentication is required to access user profile data.")
-    # In a more complex app, this might include stats, badges, etc.
     return {
         'user': user,
-        'listings': user.listings.all().order_by('-created_at')
+        'listings': paginate_keyset(_profile_listings(user, fields), cursor=cursor, page_size=page_size),
     }
+
+def _profile_listings(user, fields):
+    # The related manager attaches `user` to every row by reading seller_id, so it must
+    # not be deferred; otherwise each row costs another SELECT.
+    return user.listings.only('seller_id', *fields)
+
+async def aget_user_profile_data(user, cursor=None, page_size=None, fields=PROFILE_LISTING_FIELDS):
+    """Async counterpart of `get_user_profile_data` for the ASGI profile endpoint."""
+    if not user or not user.is_authenticated:
+        raise PermissionDenied("Authentication is required to access user profile data.")
+    return {
+        'user': user,
+        'listings': await apaginate_keyset(_profile_listings(user, fields), cursor=cursor, page_size=page_size),
+    }
+
+def _listing_count_changes(total, active):
+    changes = {}
+    for field, delta in (('listing_count', total), ('active_listing_count', active)):
+        if delta:
+            changes[field] = Greatest(F(field) + delta, 0)
+    return changes
+
+def adjust_listing_counts(user_id, total=0, active=0):
+    """
+    Applies a change to a user's listing counters with one UPDATE ... SET n = n + delta.
+    Called by the listing services inside the same transaction as the write.
+    """
+    changes = _listing_count_changes(total, active)
+    if changes:
+        User.objects.filter(pk=user_id).update(**changes)
+        invalidate_cached_user(user_id)
+
+async def aadjust_listing_counts(user_id, total=0, active=0):
+    """Async counterpart of `adjust_listing_counts`."""
+    changes = _listing_count_changes(total, active)
+    if changes:
+        await User.objects.filter(pk=user_id).aupdate(**changes)
+        await ainvalidate_cached_user(user_id)
+
+def sync_email_verified(user_id):
+    """Recomputes CustomUser.email_verified from allauth's EmailAddress rows in a single UPDATE."""
+    verified = EmailAddress.objects.filter(user=OuterRef('pk'), email=OuterRef('email'), verified=True)
+    User.objects.filter(pk=user_id).update(email_verified=Exists(verified))
+    invalidate_cached_user(user_id)
+
+async def aauthenticate(email, password):
+    """
+    Async counterpart of the e-mail login check done by allauth's backend. Users are read
+    with the async ORM and each password is verified by awaiting the hashing executor, so
+    neither the event loop nor Django's shared sync thread waits on PBKDF2.
+    Returns the active user whose password matches, or None.
+    """
+    executor = get_hashing_executor()
+    checked = False
+    async for user in User.objects.filter(email__iexact=email):
+        checked = True
+        is_correct, must_update = await executor.arun(verify_password, password, user.password)
+        if not is_correct:
+            continue
+        if must_update:
+            await aset_password(user, password)
+        return user if user.is_active else None
+    if not checked:
+        # Hash anyway, so an unknown address takes as long as a wrong password.
+        await executor.arun(make_password, password)
+    return None
+
+async def aset_password(user, raw_password):
+    """Async counterpart of user.set_password() + save(); the hash is computed on the hashing executor."""
+    user.password = await get_hashing_executor().arun(make_password, raw_password)
+    user._password = raw_password
+    await user.asave(update_fields=['password'])
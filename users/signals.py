@@ -0,0 +1,32 @@
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+from .services import sync_email_verified
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    """Any saved change (deactivation, password change, e-mail, ...) evicts the cached user."""
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def sync_verified_on_user_save(sender, instance, created, update_fields, **kwargs):
+    """The flag depends on user.email, so re-check it unless the save provably left email alone."""
+    if created or (update_fields is not None and 'email' not in update_fields):
+        # New users have no EmailAddress rows yet; last_login-only saves (every login) skip this.
+        return
+    sync_email_verified(instance.pk)
+
+
+@receiver(post_save, sender=EmailAddress)
+@receiver(post_delete, sender=EmailAddress)
+def sync_verified_on_email_address_change(sender, instance, **kwargs):
+    """Covers confirmation, adding/removing addresses and primary changes made through allauth."""
+    sync_email_verified(instance.user_id)
@@ -1,9 +1,26 @@
+import io
+import socketserver
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from django.core import mail
 from allauth.account.models import EmailAddress
+from listings.models import Listing
+from users import mail_queue
+from users import authentication
+from users.authentication import local_user_cache
+from users.hashers import HashingExecutor, get_hashing_stats
+from users.models import QueuedEmail
 
 User = get_user_model()
 
@@ -144,7 +161,10 @@ class AuthenticationTests(APITestCase):
         response = self.client.post(self.password_reset_url, reset_data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
-        # 2. Verify email was sent
+        # 2. Verify email was queued, then delivered by the worker
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(QueuedEmail.objects.filter(status=QueuedEmail.Status.PENDING).count(), 1)
+        call_command('send_queued_mail', stdout=io.StringIO())
         self.assertEqual(len(mail.outbox), 1)
         self.assertIn('Password Reset', mail.outbox[0].subject)
         email_body = mail.outbox[0].body
@@ -261,3 +281,319 @@ class AuthenticationTests(APITestCase):
         # Unauth should redirect to login
         self.assertEqual(res.status_code, 302)
         self.assertIn(reverse('account_login'), res.url)
+
+class UserProfileAPITests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='profile@example.com', password='StrongPassword123!')
+
+    def test_async_profile_matches_sync(self):
+        """The async profile endpoint returns the same payload as UserProfileAPIView."""
+        Listing.objects.create(seller=self.user, title='Mine', price='4.20')
+        self.client.force_authenticate(user=self.user)
+        sync_res = self.client.get(reverse('users_api:api_profile'))
+        async_res = self.client.get(reverse('users_async_api:api_profile'))
+        self.assertEqual(async_res.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_res.json(), sync_res.json())
+        self.assertEqual(async_res.json()['listings'][0]['title'], 'Mine')
+
+    def test_async_profile_requires_authentication(self):
+        response = self.client.get(reverse('users_async_api:api_profile'))
+        self.assertIn(response.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
+
+    def test_profile_listings_are_keyset_paginated(self):
+        for i in range(3):
+            Listing.objects.create(seller=self.user, title=f'Item {i}', price='1.00')
+        self.client.force_authenticate(user=self.user)
+        url = reverse('users_api:api_profile')
+
+        with self.assertNumQueries(1):
+            first = self.client.get(url, {'page_size': 2}).json()
+        self.assertEqual([item['title'] for item in first['listings']], ['Item 2', 'Item 1'])
+        self.assertEqual(set(first['listings'][0]), {'id', 'title', 'price', 'created_at'})
+        self.assertIsNone(first['listings_previous'])
+
+        second = self.client.get(first['listings_next']).json()
+        self.assertEqual([item['title'] for item in second['listings']], ['Item 0'])
+        self.assertIsNone(second['listings_next'])
+        self.assertEqual(self.client.get(second['listings_previous']).json()['listings'], first['listings'])
+
+        self.assertEqual(self.client.get(url, {'cursor': 'garbage'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_listing_counters_follow_listing_services(self):
+        """The listing services keep the counters current, so the profile never counts rows."""
+        from listings import services as listing_services
+        first = listing_services.create_listing(self.user, 'One', '', '1.00')
+        created, _ = listing_services.bulk_create_listings(
+            self.user, [{'title': t, 'description': '', 'price': '2.00'} for t in ('Two', 'Three', 'Four')]
+        )
+        listing_services.delete_listing(self.user, created[0].pk)
+        listing_services.bulk_delete_listings(self.user, [created[1].pk])
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.listing_count, self.user.active_listing_count), (2, 2))
+
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('users_api:api_profile'))
+        self.assertEqual((response.data['listing_count'], response.data['active_listing_count']), (2, 2))
+        self.assertFalse([q for q in ctx.captured_queries if 'COUNT(' in q['sql'].upper()])
+        self.assertEqual({item['id'] for item in response.data['listings']}, {first.pk, created[2].pk})
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for Django's backend: counts connections and delivered messages."""
+    def handle(self):
+        self.server.connections += 1
+        self.wfile.write(b'220 localhost\r\n')
+        in_data = False
+        while line := self.rfile.readline():
+            if in_data:
+                if line == b'.\r\n':
+                    in_data = False
+                    self.server.messages += 1
+                    self.wfile.write(b'250 OK\r\n')
+                continue
+            command = line[:4].upper()
+            if command == b'DATA':
+                in_data = True
+                self.wfile.write(b'354 End data with <CR><LF>.<CR><LF>\r\n')
+            elif command == b'QUIT':
+                self.wfile.write(b'221 Bye\r\n')
+                return
+            else:
+                self.wfile.write(b'250 OK\r\n')
+
+
+class MailQueueTests(TestCase):
+
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _SMTPHandler)
+        self.server.daemon_threads = True
+        self.server.connections = self.server.messages = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.smtp = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=self.server.server_address[1],
+        )
+
+    def queue(self, count):
+        for i in range(count):
+            mail_queue.enqueue(mail.EmailMessage(f'Subject {i}', 'Body', 'noreply@example.com', [f'user{i}@example.com']))
+
+    def test_batch_reuses_one_smtp_connection(self):
+        """A batch is delivered over a single SMTP connection and marked sent."""
+        self.queue(3)
+        with self.smtp:
+            self.assertEqual(mail_queue.send_queued_mail(), (3, 0))
+        self.assertEqual((self.server.connections, self.server.messages), (1, 3))
+        self.assertEqual(QueuedEmail.objects.filter(status=QueuedEmail.Status.SENT).count(), 3)
+        self.assertEqual(mail_queue.send_queued_mail(), (0, 0))
+
+    def test_failed_delivery_backs_off_then_gives_up(self):
+        """Unreachable SMTP reschedules with exponential backoff until the attempt limit."""
+        self.queue(1)
+        self.server.server_close()
+        with self.smtp, self.settings(EMAIL_QUEUE_MAX_ATTEMPTS=2, EMAIL_QUEUE_RETRY_BACKOFF=60):
+            self.assertEqual(mail_queue.send_queued_mail(), (0, 1))
+            queued = QueuedEmail.objects.get()
+            self.assertEqual((queued.status, queued.attempts), (QueuedEmail.Status.PENDING, 1))
+            self.assertGreater(queued.next_attempt_at, timezone.now() + timedelta(seconds=50))
+            self.assertTrue(queued.last_error)
+
+            # Not due yet, so nothing is retried early.
+            self.assertEqual(mail_queue.send_queued_mail(), (0, 0))
+
+            QueuedEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(mail_queue.send_queued_mail(), (0, 1))
+        self.assertEqual(QueuedEmail.objects.get().status, QueuedEmail.Status.FAILED)
+
+    def test_unbuildable_message_fails_without_blocking_the_batch(self):
+        """A message that raises something other than a delivery error is failed; the rest are sent."""
+        self.queue(2)
+        QueuedEmail.objects.filter(subject='Subject 0').update(subject='Broken\nSubject')
+        with self.smtp:
+            self.assertEqual(mail_queue.send_queued_mail(), (1, 1))
+        broken = QueuedEmail.objects.get(subject='Broken\nSubject')
+        self.assertEqual((broken.status, broken.attempts), (QueuedEmail.Status.FAILED, 1))
+        self.assertEqual(QueuedEmail.objects.get(subject='Subject 1').status, QueuedEmail.Status.SENT)
+
+    def test_claimed_rows_are_not_claimed_again(self):
+        """A batch leased by one worker is invisible to the next claim."""
+        self.queue(2)
+        self.assertEqual(len(mail_queue._claim_batch(10)), 2)
+        self.assertEqual(mail_queue._claim_batch(10), [])
+
+    def test_allauth_mail_is_queued_not_sent(self):
+        """Signup verification mail is stored instead of sent inside the request."""
+        response = self.client.post(reverse('rest_register'), {
+            'email': 'queued@example.com', 'password1': 'StrongPassword123!', 'password2': 'StrongPassword123!',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(QueuedEmail.objects.get().to, ['queued@example.com'])
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='cached@example.com', password='StrongPassword123!')
+        EmailAddress.objects.create(user=self.user, email=self.user.email, primary=True, verified=True)
+        login_res = self.client.post(reverse('rest_login'), {'email': self.user.email, 'password': 'StrongPassword123!'})
+        self.client.cookies.clear()
+        self.client.cookies['jwt-auth'] = login_res.cookies.get('jwt-auth').value
+        self.profile_url = reverse('users_api:api_profile')
+
+    def user_selects(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.profile_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        table = User._meta.db_table
+        return [q['sql'] for q in ctx.captured_queries if f'FROM "{table}"' in q['sql']]
+
+    def test_user_is_resolved_from_cache(self):
+        """After the first request, the JWT user comes from the cache, saving one SELECT per request."""
+        self.assertEqual(len(self.user_selects()), 1)
+        self.assertEqual(self.user_selects(), [])
+
+        # The shared cache serves processes whose local LRU is cold.
+        local_user_cache.clear()
+        self.assertEqual(self.user_selects(), [])
+
+    def test_token_user_id_hits_the_local_cache(self):
+        """The token's string user id finds the entry cached under the int pk, without the shared cache."""
+        self.user_selects()
+        with mock.patch.object(authentication, 'cache') as shared:
+            self.assertEqual(self.user_selects(), [])
+        shared.get.assert_not_called()
+
+    def test_shared_cache_holds_no_password_hash(self):
+        self.user_selects()
+        user, fingerprint = authentication.cache.get(f'users:auth:{self.user.pk}')
+        self.assertNotIn('password', user.__dict__)
+        self.assertNotIn(self.user.password, fingerprint)
+        # The field is deferred, not blank: reading it loads the hash.
+        self.assertEqual(user.password, self.user.password)
+
+    def test_saving_the_user_invalidates_the_cache(self):
+        """Deactivation (or any other save) is seen by the next request."""
+        self.user_selects()
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.profile_url)
+        self.assertIn(response.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
+
+
+class EmailVerifiedFlagTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='flag@example.com', password='StrongPassword123!')
+
+    def test_flag_follows_email_addresses(self):
+        """Verifying, unverifying and removing the address keeps the flag in sync."""
+        address = EmailAddress.objects.create(user=self.user, email=self.user.email, primary=True, verified=False)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.email_verified)
+
+        address.verified = True
+        address.save()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.email_verified)
+
+        # Switching to an address with no verified EmailAddress clears it again.
+        self.user.email = 'other@example.com'
+        self.user.save()
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.email_verified)
+
+        self.user.email = 'flag@example.com'
+        self.user.save()
+        address.delete()
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.email_verified)
+
+    def test_login_checks_verification_in_the_user_lookup(self):
+        """Login reads the user and the verified flag with a single lookup query."""
+        EmailAddress.objects.create(user=self.user, email=self.user.email, primary=True, verified=True)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('rest_login'), {'email': self.user.email, 'password': 'StrongPassword123!'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lookups = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT') and 'django_session' not in q['sql']]
+        self.assertEqual(len(lookups), 1)
+
+
+class PasswordHashingTests(SimpleTestCase):
+
+    def test_executor_caps_concurrency_and_reports_queue_depth(self):
+        executor = HashingExecutor(max_workers=2)
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def work():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        futures = [executor.submit(work) for _ in range(6)]
+        stats = executor.stats()
+        self.assertEqual(stats['queued'] + stats['running'], 6 - stats['completed'])
+        self.assertGreater(stats['queued'], 0)
+        for future in futures:
+            future.result()
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(executor.stats(), {'queued': 0, 'running': 0, 'completed': 6, 'max_workers': 2})
+
+    def test_existing_pbkdf2_hashes_still_verify(self):
+        """Hashes made by Django's stock PBKDF2 hasher verify through the bounded one."""
+        from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password
+        encoded = PBKDF2PasswordHasher().encode('StrongPassword123!', 'somesalt')
+        completed = get_hashing_stats()['completed']
+        self.assertTrue(check_password('StrongPassword123!', encoded))
+        self.assertEqual(get_hashing_stats()['completed'], completed + 1)
+
+
+class AsyncAuthTests(APITestCase):
+    """The async /api/async/auth/ endpoints await the hashing executor instead of blocking a thread."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='async_auth@example.com', password='StrongPassword123!')
+        EmailAddress.objects.create(user=self.user, email=self.user.email, primary=True, verified=True)
+
+    def test_login_issues_the_sync_views_cookies(self):
+        completed = get_hashing_stats()['completed']
+        response = self.client.post(
+            reverse('async_auth:rest_login'), {'email': self.user.email, 'password': 'StrongPassword123!'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['user']['email'], self.user.email)
+        for cookie in ('jwt-auth', 'jwt-refresh-token', 'sessionid'):
+            self.assertIn(cookie, response.cookies)
+        self.assertGreater(get_hashing_stats()['completed'], completed)
+
+    def test_login_rejects_bad_credentials_and_unverified_users(self):
+        url = reverse('async_auth:rest_login')
+        wrong = self.client.post(url, {'email': self.user.email, 'password': 'WrongPassword123!'})
+        self.assertEqual(wrong.status_code, status.HTTP_400_BAD_REQUEST)
+        unknown = self.client.post(url, {'email': 'nobody@example.com', 'password': 'StrongPassword123!'})
+        self.assertEqual(unknown.json(), wrong.json())
+
+        EmailAddress.objects.filter(user=self.user).update(verified=False)
+        User.objects.filter(pk=self.user.pk).update(email_verified=False)
+        unverified = self.client.post(url, {'email': self.user.email, 'password': 'StrongPassword123!'})
+        self.assertEqual(unverified.json(), {'non_field_errors': ['E-mail is not verified.']})
+
+    def test_password_change(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse('async_auth:rest_password_change')
+        mismatch = self.client.post(url, {'new_password1': 'Changed-Password-456', 'new_password2': 'Other-456'})
+        self.assertEqual(mismatch.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('new_password2', mismatch.json())
+
+        response = self.client.post(url, {'new_password1': 'Changed-Password-456', 'new_password2': 'Changed-Password-456'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('Changed-Password-456'))
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views, api_views
+from . import views, api_views, async_api_views
 
 app_name = 'users'
 
@@ -13,5 +13,16 @@ api_urlpatterns = [
     path('', api_views.UserProfileAPIView.as_view(), name='api_profile'),
 ]
 
+# Async (ASGI) versions of the JSON API
+async_api_urlpatterns = [
+    path('', async_api_views.user_profile, name='api_profile'),
+]
+
+# Async (ASGI) versions of the /auth/ endpoints that hash passwords
+async_auth_urlpatterns = [
+    path('login/', async_api_views.login, name='rest_login'),
+    path('password/change/', async_api_views.password_change, name='rest_password_change'),
+]
+
 # Legacy combined pattern
 urlpatterns = web_urlpatterns + api_urlpatterns
@@ -2,11 +2,20 @@ from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from . import services
 
+# The web card also shows the description; updated_at keys its cached fragment.
+PROFILE_CARD_FIELDS = services.PROFILE_LISTING_FIELDS + ('description', 'updated_at')
+
 @login_required
 def profile_view(request):
-    """View to display the user's profile and their listings."""
-    profile_data = services.get_user_profile_data(request.user)
-    
+    """View to display the user's profile and one keyset page of their listings."""
+    try:
+        profile_data = services.get_user_profile_data(
+            request.user, cursor=request.GET.get("cursor"), fields=PROFILE_CARD_FIELDS
+        )
+    except ValueError:
+        # A stale or malformed cursor falls back to the first page.
+        profile_data = services.get_user_profile_data(request.user, fields=PROFILE_CARD_FIELDS)
+
     context = {
         'user_listings': profile_data['listings']
     }